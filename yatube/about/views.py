@@ -1,9 +1,18 @@
+from django.conf import settings
+from django.utils.decorators import method_decorator
 from django.views.generic.base import TemplateView
 
+from core.decorators import public_for_anonymous
 
+about_cache = method_decorator(
+    public_for_anonymous(settings.ABOUT_CACHE_MAX_AGE), name='dispatch')
+
+
+@about_cache
 class AboutAuthorView(TemplateView):
     template_name = 'about/author.html'
 
 
+@about_cache
 class AboutTechView(TemplateView):
     template_name = 'about/tech.html'
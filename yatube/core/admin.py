@@ -0,0 +1,62 @@
+import os
+
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import BulkJob, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'name')
+    readonly_fields = ('last_error',)
+
+
+class BulkJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'action', 'status', 'progress_display', 'total',
+                    'user', 'created', 'finished', 'download')
+    list_filter = ('status', 'action')
+    list_select_related = ('user',)
+    exclude = ('result_size', 'query', 'last_pk', 'max_pk')
+    readonly_fields = ('action', 'model', 'params', 'total', 'done', 'status',
+                       'result', 'last_error', 'user', 'finished',
+                       'download')
+
+    def has_add_permission(self, request):
+        return False
+
+    def progress_display(self, job):
+        return f'{job.progress}%'
+    progress_display.short_description = 'Прогресс'
+
+    def download(self, job):
+        if job.status != BulkJob.DONE or not job.result:
+            return '-'
+        return format_html('<a href="{}">{}</a>', reverse(
+            'admin:core_bulkjob_download', args=[job.pk]),
+            os.path.basename(job.result))
+    download.short_description = 'Результат'
+
+    def get_urls(self):
+        return [
+            path('<int:job_id>/download/',
+                 self.admin_site.admin_view(self.download_view),
+                 name='core_bulkjob_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, job_id):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        job = get_object_or_404(BulkJob, pk=job_id)
+        if not job.result or not os.path.exists(job.result):
+            raise Http404
+        return FileResponse(open(job.result, 'rb'), as_attachment=True,
+                            filename=os.path.basename(job.result))
+
+
+admin.site.register(Task, TaskAdmin)
+admin.site.register(BulkJob, BulkJobAdmin)
@@ -0,0 +1,33 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import MemcachedCache
+
+from core import metrics
+
+_missing = object()
+
+
+class InstrumentedCacheMixin:
+    """
+    Считает попадания и промахи чтений кэша по семействам ключей
+    (get_many и get_or_set тоже идут через get). Метка кэша - параметр
+    METRICS_LABEL, иначе LOCATION.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.location = params.get('METRICS_LABEL') or name or 'default'
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version)
+        metrics.inc('yatube_cache_requests_total', cache=self.location,
+                    key=metrics.cache_key_family(key),
+                    result='miss' if value is _missing else 'hit')
+        return default if value is _missing else value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """LocMem: свой у каждого процесса."""
+
+
+class InstrumentedMemcachedCache(InstrumentedCacheMixin, MemcachedCache):
+    """memcached: общий для всех процессов и серверов."""
@@ -0,0 +1,8 @@
+from posts.inbox import unread_count
+
+
+def unread_notifications(request):
+    """Добавляет число непрочитанных уведомлений для шапки сайта."""
+    if not request.user.is_authenticated:
+        return {}
+    return {'unread_notifications': unread_count(request.user.id)}
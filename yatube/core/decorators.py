@@ -0,0 +1,70 @@
+from functools import wraps
+from http import HTTPStatus
+
+from django.shortcuts import render
+from django.utils.cache import (add_never_cache_headers, patch_cache_control,
+                                patch_vary_headers)
+from django.views.decorators.cache import cache_control
+
+from core import metrics, ratelimit
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+# Страницы только для авторизованных: браузер хранит копию у себя,
+# но перепроверяет её по ETag при каждом переходе.
+private_page = cache_control(private=True, no_cache=True)
+
+
+def public_for_anonymous(max_age, stale_while_revalidate=None):
+    """
+    Политика кэширования страницы, одинаковой для всех гостей.
+
+    Гостю страница отдается как public на max_age секунд (с окном
+    stale-while-revalidate, если оно задано), авторизованному
+    пользователю - как private, ведь в шапке его имя и ссылки.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            if (request.method not in CACHEABLE_METHODS
+                    or response.status_code != HTTPStatus.OK):
+                return response
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                directives = {'public': True, 'max_age': max_age}
+                if stale_while_revalidate:
+                    directives['stale_while_revalidate'] = (
+                        stale_while_revalidate)
+                patch_cache_control(response, **directives)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return _wrapped_view
+    return decorator
+
+
+def rate_limit(name, methods=None):
+    """
+    Ограничивает частоту запросов к виду по RATE_LIMITS[name]
+    (см. core.ratelimit). Если задан methods, считаются только запросы
+    этими методами. Сверх лимита отвечает 429 с Retry-After, не
+    вызывая вид.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                retry_after = ratelimit.check(request, name)
+                if retry_after:
+                    metrics.inc('yatube_rate_limited_total', limit=name)
+                    response = render(
+                        request, 'core/429.html',
+                        {'retry_after': retry_after},
+                        status=HTTPStatus.TOO_MANY_REQUESTS)
+                    response['Retry-After'] = str(retry_after)
+                    add_never_cache_headers(response)
+                    return response
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
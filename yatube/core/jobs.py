@@ -0,0 +1,156 @@
+"""
+Массовые операции над большими выборками в фоне.
+
+Задание BulkJob хранит не список id, а саму выборку (модель и условие
+запроса) и выполняется порциями по BULK_JOB_CHUNK_SIZE: каждая порция -
+отдельная задача core.tasks, которая берет следующие по id объекты
+выборки после BulkJob.last_pk, обрабатывает их в своей короткой
+транзакции и ставит задачу на следующую. Запрос админки только создает
+задание, а операция над миллионом строк не держит блокировку базы и не
+мешает другим задачам очереди; BulkJob.done показывает прогресс.
+
+Операции регистрируются декоратором и получают id своей порции:
+
+    @jobs.register('posts.move_to_group')
+    def move_to_group(job, ids, group_id):
+        ...
+
+    jobs.start('posts.move_to_group', queryset, request.user, group_id=1)
+"""
+import csv
+import json
+import os
+import pickle
+import traceback
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import tasks
+from .models import BulkJob
+
+_actions = {}
+
+
+def register(name):
+    def decorator(func):
+        _actions[name] = func
+        return func
+    return decorator
+
+
+def start(name, queryset, user=None, **params):
+    """
+    Создает задание над объектами queryset и ставит первую порцию.
+
+    Сохраняется только условие выборки: объекты перебирает фон.
+    """
+    with transaction.atomic():
+        job = BulkJob.objects.create(
+            action=name, params=json.dumps(params), user=user,
+            model=queryset.model._meta.label_lower,
+            query=pickle.dumps(queryset.order_by().query))
+        tasks.enqueue('core.run_bulk_job', job_id=job.pk)
+    return job
+
+
+def selection(job):
+    """Выборка задания, восстановленная из сохраненного условия."""
+    queryset = apps.get_model(job.model)._default_manager.all()
+    queryset.query = pickle.loads(bytes(job.query))
+    return queryset
+
+
+def _count(job, queryset):
+    """
+    Первая порция фиксирует размер задания и верхнюю границу id:
+    объекты, созданные после запуска, в задание не попадают.
+    """
+    found = queryset.aggregate(total=Count('pk'), max_pk=Max('pk'))
+    job.total, job.max_pk = found['total'], found['max_pk'] or 0
+    BulkJob.objects.filter(pk=job.pk).update(total=job.total,
+                                             max_pk=job.max_pk)
+
+
+@tasks.register('core.run_bulk_job')
+def run_chunk(job_id):
+    job = BulkJob.objects.filter(pk=job_id).first()
+    if job is None or job.status == BulkJob.DONE:
+        return
+    queryset = selection(job)
+    if job.max_pk is None:
+        _count(job, queryset)
+    # Порция - следующие по id объекты выборки: чтение одной страницы
+    # индекса по pk, а не всего списка задания.
+    ids = list(queryset.filter(pk__gt=job.last_pk, pk__lte=job.max_pk)
+               .order_by('pk').values_list('pk', flat=True)
+               [:settings.BULK_JOB_CHUNK_SIZE])
+    done = job.done + len(ids)
+    finished = len(ids) < settings.BULK_JOB_CHUNK_SIZE or (
+        ids[-1] >= job.max_pk)
+    try:
+        with transaction.atomic():
+            if ids:
+                _actions[job.action](job, ids, **json.loads(job.params))
+            BulkJob.objects.filter(pk=job.pk).update(
+                done=done,
+                # Выборка могла измениться после подсчета, готовое
+                # задание показывает фактически обработанное.
+                total=done if finished else job.total,
+                last_pk=ids[-1] if ids else job.last_pk,
+                status=BulkJob.DONE if finished else BulkJob.RUNNING,
+                finished=timezone.now() if finished else None)
+    except Exception:
+        # Порцию повторит очередь задач, здесь только отметка для админки.
+        BulkJob.objects.filter(pk=job.pk).update(
+            status=BulkJob.FAILED, last_error=traceback.format_exc())
+        raise
+    if not finished:
+        tasks.enqueue('core.run_bulk_job', job_id=job.pk)
+
+
+def result_path(job, extension):
+    return os.path.join(settings.EXPORT_ROOT,
+                        f'{job.action}-{job.pk}.{extension}')
+
+
+def delete_rows(model, field, values):
+    """
+    Удаляет строки model, у которых field входит в values, одним DELETE.
+
+    Сборщик каскада QuerySet.delete() сначала выбирает строки, чтобы
+    найти зависимые и вызвать обработчики удаления; операция порции
+    удаляет зависимые и обновляет сводки сама, запросами по набору.
+    """
+    if not values:
+        return
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} '
+            f'WHERE {column} IN ({placeholders})', list(values))
+
+
+def append_csv(job, header, rows):
+    """
+    Дописывает строки порции в CSV-файл задания; первая порция
+    создает файл с заголовком.
+
+    Файл пишется вне транзакции порции, поэтому сначала обрезается до
+    размера после последней завершенной порции: повтор упавшей порции
+    не дублирует строки.
+    """
+    path = result_path(job, 'csv')
+    os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+    with open(path, 'a', newline='', encoding='utf-8') as output:
+        output.truncate(job.result_size)
+        writer = csv.writer(output)
+        if job.done == 0:
+            writer.writerow(header)
+        writer.writerows(rows)
+        size = output.tell()
+    BulkJob.objects.filter(pk=job.pk).update(result=path, result_size=size)
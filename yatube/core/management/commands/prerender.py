@@ -0,0 +1,22 @@
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import prerender
+
+
+class Command(BaseCommand):
+    help = ('Выгружает страницы about и первые страницы лент '
+            'в статические HTML-файлы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить ранее выгруженные страницы перед выгрузкой.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            shutil.rmtree(settings.PRERENDER_ROOT, ignore_errors=True)
+        for url in prerender.export():
+            self.stdout.write(url)
@@ -0,0 +1,68 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+
+from core import profiler
+
+
+class Command(BaseCommand):
+    help = ('Сводка по профилям запросов из PROFILER_ROOT: самые '
+            'медленные виды, функции и SQL-запросы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10,
+                            help='Строк в каждой таблице.')
+        parser.add_argument('--view', help='Только профили этого вида.')
+
+    def handle(self, *args, **options):
+        self.durations = defaultdict(list)
+        self.functions = Counter()
+        self.samples = Counter()
+        self.total_samples = 0
+        self.sql_time = Counter()
+        self.sql_count = Counter()
+        for data in profiler.read_profiles():
+            if not options['view'] or data['view'] == options['view']:
+                self.collect(data)
+        if not self.durations:
+            self.stdout.write('Профилей нет.')
+            return
+        self.report(options['limit'])
+
+    def collect(self, data):
+        self.durations[data['view']].append(data['duration'])
+        for sql, duration in data['queries']:
+            self.sql_time[sql] += duration
+            self.sql_count[sql] += 1
+        for row in data.get('functions', ()):
+            self.functions[row['function']] += row['own']
+        for stack, count in data.get('stacks', {}).items():
+            self.total_samples += count
+            # Каждую функцию стека считаем один раз: рекурсия не должна
+            # давать больше 100%.
+            for name in set(stack.split(';')):
+                self.samples[name] += count
+
+    def report(self, limit):
+        self.stdout.write('Виды (профилей, среднее, максимум, мс):')
+        views = sorted(self.durations.items(),
+                       key=lambda item: sum(item[1]), reverse=True)
+        for view, values in views[:limit]:
+            self.stdout.write('  {:<40} {:>5} {:>9.1f} {:>9.1f}'.format(
+                view, len(values), sum(values) / len(values) * 1000,
+                max(values) * 1000))
+        if self.functions:
+            self.stdout.write('Функции по собственному времени '
+                              '(cProfile, мс):')
+            for name, own in self.functions.most_common(limit):
+                self.stdout.write(f'  {own * 1000:>9.1f}  {name}')
+        if self.samples:
+            self.stdout.write('Функции по доле выборок стека:')
+            for name, count in self.samples.most_common(limit):
+                self.stdout.write('  {:>6.1%}  {}'.format(
+                    count / self.total_samples, name))
+        if self.sql_time:
+            self.stdout.write('SQL по суммарному времени (раз, мс):')
+            for sql, duration in self.sql_time.most_common(limit):
+                self.stdout.write('  {:>5} {:>9.1f}  {}'.format(
+                    self.sql_count[sql], duration * 1000, sql[:200]))
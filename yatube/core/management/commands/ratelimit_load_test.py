@@ -0,0 +1,70 @@
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+ABUSER_IP = '203.0.113.1'
+REGULAR_IP = '203.0.113.2'
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест лимитов: несколько потоков с одного адреса '
+            'долбят страницу, а обычный клиент изредка заходит на нее '
+            'с другого. Печатает ответы и задержки обоих.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path',
+                            default=reverse('posts:search') + '?text=post',
+                            help='Адрес, который нагружаем.')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Число запросов с адреса-нарушителя.')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Число параллельных потоков нарушителя.')
+        parser.add_argument('--regular-every', type=int, default=25,
+                            help='Обычный клиент делает запрос на каждые '
+                                 'столько запросов нарушителя.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+
+        def hit(address):
+            start = time.perf_counter()
+            status = Client(REMOTE_ADDR=address).get(path).status_code
+            return status, time.perf_counter() - start
+
+        def hit_in_thread(_):
+            try:
+                return hit(ABUSER_IP)
+            finally:
+                connection.close()
+
+        regular_count = max(options['requests'] // options['regular_every'],
+                            1)
+        if options['threads'] > 1:
+            with ThreadPoolExecutor(options['threads']) as pool:
+                abusive = pool.map(hit_in_thread, range(options['requests']))
+                normal = [hit(REGULAR_IP) for _ in range(regular_count)]
+                abusive = list(abusive)
+        else:
+            # В одном потоке: запросы видят транзакцию вызывающего кода.
+            abusive = [hit(ABUSER_IP) for _ in range(options['requests'])]
+            normal = [hit(REGULAR_IP) for _ in range(regular_count)]
+        self.report('abuser', abusive)
+        self.report('regular', normal)
+
+    def report(self, name, results):
+        statuses = Counter(status for status, _ in results)
+        durations = sorted(duration for _, duration in results)
+        p95 = durations[max(int(len(durations) * 0.95) - 1, 0)]
+        self.stdout.write('{}: {} requests, {}, median {:.1f} ms, '
+                          'p95 {:.1f} ms'.format(
+                              name, len(results),
+                              ', '.join(f'{status}: {count}' for status, count
+                                        in sorted(statuses.items())),
+                              statistics.median(durations) * 1000,
+                              p95 * 1000))
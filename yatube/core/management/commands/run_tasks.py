@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди core.Task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить задачи, которым пора, и выйти.')
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунды.')
+
+    def handle(self, *args, **options):
+        while True:
+            done = tasks.run_pending()
+            if done:
+                self.stdout.write(f'Выполнено задач: {done}')
+            if options['once']:
+                return
+            if not done:
+                time.sleep(options['sleep'])
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+SESSION_TABLE = 'django_session'
+
+
+class Command(BaseCommand):
+    help = ('Считает запросы к базе на авторизованный запрос при разных '
+            'хранилищах сессий. Данные откатываются после замера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', action='append', dest='modes',
+                            choices=sorted(settings.SESSION_ENGINES),
+                            help='Хранилище сессий; можно несколько раз. '
+                                 'По умолчанию все.')
+        parser.add_argument('--requests', type=int, default=10,
+                            help='Число запросов на каждую страницу.')
+
+    def handle(self, *args, **options):
+        urls = [reverse('posts:follow_index'), reverse('posts:post_create'),
+                reverse('posts:notifications')]
+        for mode in options['modes'] or sorted(settings.SESSION_ENGINES):
+            total, session = self.measure(mode, urls, options['requests'])
+            count = len(urls) * options['requests']
+            self.stdout.write(
+                '{}: {:.2f} queries per request, {:.2f} to {}'.format(
+                    mode, total / count, session / count, SESSION_TABLE))
+
+    def measure(self, mode, urls, repeat):
+        with override_settings(
+                SESSION_ENGINE=settings.SESSION_ENGINES[mode]), \
+                transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username='session_benchmark')
+            client = Client()
+            client.force_login(user)
+            # Первый запрос прогревает кэши, в замер он не идет.
+            client.get(urls[0])
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(repeat):
+                    for url in urls:
+                        client.get(url)
+            transaction.set_rollback(True)
+        return len(queries), sum(SESSION_TABLE in query['sql']
+                                 for query in queries)
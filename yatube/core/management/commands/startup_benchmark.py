@@ -0,0 +1,72 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе: замер холодного старта воркера.
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from yatube.wsgi import application
+imported = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda *args: status.append(args[0]))
+b''.join(response)
+response.close()
+done = time.perf_counter()
+print(json.dumps({'import': imported - start,
+                  'first_response': done - start,
+                  'status': status[0],
+                  'modules': len(sys.modules)}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Замеряет холодный старт: импорт yatube.wsgi и время до '
+            'первого ответа в новом процессе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--env', action='append', dest='envs',
+                            choices=('dev', 'test', 'prod'),
+                            help='Профиль настроек; можно несколько раз. '
+                                 'По умолчанию dev и prod.')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Число запусков на профиль.')
+        parser.add_argument('--path', default='/about/author/',
+                            help='Адрес первого запроса.')
+        parser.add_argument('--db-name', default=':memory:',
+                            help='База процесса (DJANGO_DB_NAME). По '
+                                 'умолчанию пустая в памяти: рабочая '
+                                 'база не открывается.')
+
+    def handle(self, *args, **options):
+        for env in options['envs'] or ['dev', 'prod']:
+            results = [self.probe(env, options['path'], options['db_name'])
+                       for _ in range(options['runs'])]
+            self.stdout.write(
+                '{}: import {:.1f} ms, first response {:.1f} ms, '
+                '{} modules, {} (median of {})'.format(
+                    env,
+                    statistics.median(r['import'] for r in results) * 1000,
+                    statistics.median(r['first_response']
+                                      for r in results) * 1000,
+                    results[0]['modules'], results[0]['status'],
+                    len(results)))
+
+    def probe(self, env, path, db_name):
+        environ = dict(os.environ, DJANGO_ENV=env, DJANGO_DB_NAME=db_name,
+                       DJANGO_SETTINGS_MODULE='yatube.settings')
+        environ.setdefault('DJANGO_SECRET_KEY', settings.SECRET_KEY)
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE, path], cwd=settings.BASE_DIR,
+            env=environ, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(completed.stderr)
+        return json.loads(completed.stdout.splitlines()[-1])
@@ -0,0 +1,141 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Счетчики и гистограммы живут в памяти процесса; каждый воркер отдает
+свои значения на /metrics/, а суммирует их по воркерам сборщик по
+метке instance. Имена меток ограничены: вид (view_name), семейство
+ключа кэша, а не сам ключ.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_lock = threading.Lock()
+_help = {}
+_counters = defaultdict(float)
+_histograms = {}
+
+
+def describe(name, text, kind, buckets=DEFAULT_BUCKETS):
+    _help[name] = (text, kind, buckets)
+
+
+def inc(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] += amount
+
+
+def observe(name, value, **labels):
+    """Добавляет значение в гистограмму name."""
+    key = (name, tuple(sorted(labels.items())))
+    buckets = _help[name][2]
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * len(buckets), 0, 0.0]
+        index = bisect_left(buckets, value)
+        if index < len(buckets):
+            histogram[0][index] += 1
+        histogram[1] += 1
+        histogram[2] += value
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\')
+                     .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs)
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render():
+    """Все метрики процесса в формате text exposition 0.0.4."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: ([*buckets], count, total)
+                      for key, (buckets, count, total)
+                      in _histograms.items()}
+    lines = []
+    for name in sorted(_help):
+        text, kind, buckets = _help[name]
+        lines.append(f'# HELP {name} {text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(name + _format_labels(labels) + ' '
+                                 + _format_value(value))
+            continue
+        for (metric, labels), (counts, count, total) in sorted(
+                histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket'
+                             + _format_labels(labels, [('le', bound)])
+                             + f' {cumulative}')
+            lines.append(f'{name}_bucket'
+                         + _format_labels(labels, [('le', '+Inf')])
+                         + f' {count}')
+            lines.append(f'{name}_sum' + _format_labels(labels)
+                         + ' ' + repr(total))
+            lines.append(f'{name}_count' + _format_labels(labels)
+                         + f' {count}')
+    return '\n'.join(lines) + '\n'
+
+
+SESSION_KEY_PREFIX = 'django.contrib.sessions.'
+# Разделители частей ключа: двоеточие у ключей проекта, || у
+# sorl-thumbnail (sorl-thumbnail||image||<md5>)
+KEY_SEPARATOR = re.compile(r':|\|\|')
+# Семейство - имя из букв, точек, дефисов и подчеркиваний; все прочее
+# (цифры, хеши) сводится к OTHER_FAMILY, чтобы число меток не росло.
+KEY_FAMILY = re.compile(r'[A-Za-z_.-]{1,64}')
+OTHER_FAMILY = 'other'
+
+
+def cache_key_family(key):
+    """
+    Семейство ключа кэша для метки: без id и хешей. Ключи сессий
+    (префикс движка и сразу ключ сессии, без двоеточия) сводятся к
+    одному семейству: ключ сессии в метриках - готовый угон сессии.
+    """
+    if key.startswith(SESSION_KEY_PREFIX):
+        return 'django.contrib.sessions'
+    if key.startswith('template.cache.'):
+        family = '.'.join(key.split('.')[:3])
+    else:
+        family = KEY_SEPARATOR.split(key, 1)[0]
+    return family if KEY_FAMILY.fullmatch(family) else OTHER_FAMILY
+
+
+describe('yatube_http_requests_total', 'Обработанные запросы.', 'counter')
+describe('yatube_http_request_duration_seconds',
+         'Время обработки запроса.', 'histogram')
+describe('yatube_db_queries_total', 'Запросы к базе данных.', 'counter')
+describe('yatube_db_query_duration_seconds_total',
+         'Суммарное время запросов к базе данных.', 'counter')
+describe('yatube_cache_requests_total',
+         'Чтения кэша: result="hit" или "miss".', 'counter')
+describe('yatube_thumbnail_duration_seconds',
+         'Время создания миниатюры картинки.', 'histogram')
+describe('yatube_rate_limited_total',
+         'Запросы, отклоненные ограничением частоты.', 'counter')
@@ -0,0 +1,225 @@
+import cProfile
+import random
+import threading
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.sessions.middleware import (
+    SessionMiddleware as BaseSessionMiddleware)
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from core import metrics, prerender, profiler, profiling
+
+
+class PrerenderedPageMiddleware:
+    """
+    Отдает гостям заранее отрисованные страницы из PRERENDER_ROOT.
+
+    Годятся только GET/HEAD без параметров и без cookie сессии: такие
+    запросы видят ту же страницу, что была выгружена командой prerender.
+    Файл считается свежим, пока страницу можно держать в кэше
+    (max-age ее политики). Если свежего файла нет, страница
+    отрисовывается как обычно и заново выгружается.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        view_name = self.prerendered_view(request)
+        if view_name is None:
+            return self.get_response(request)
+        directives = prerender.cache_directives(view_name)
+        content, age = prerender.read_fresh_page(
+            request.path_info, directives['max_age'])
+        if content is not None:
+            response = HttpResponse(content)
+            patch_cache_control(response, **directives)
+            patch_vary_headers(response, ('Cookie',))
+            response['X-Prerendered-Age'] = int(age)
+            return response
+        response = self.get_response(request)
+        if (request.method == 'GET'
+                and response.status_code == HTTPStatus.OK
+                and not response.streaming and not response.cookies):
+            prerender.write_page(request.path_info, response.content)
+        return response
+
+    def prerendered_view(self, request):
+        if (request.method not in ('GET', 'HEAD')
+                or request.META.get('QUERY_STRING')
+                or settings.SESSION_COOKIE_NAME in request.COOKIES
+                or not prerender.has_pages()):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        # Для метрик: до разбора URL самим Django запрос не дойдет.
+        request.resolver_match = match
+        view_name = match.view_name
+        if view_name in prerender.PRERENDERED_VIEWS:
+            return view_name
+        return None
+
+
+class TemplateProfilingMiddleware:
+    """
+    Замеряет отрисовку шаблонов в каждом запросе (см. core.profiling)
+    и пишет в лог, какие шаблоны сколько раз и как долго рисовались.
+    Без TEMPLATE_PROFILING не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        profiling.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profiling.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            rows = profiling.stop()
+        profiling.log(request.path, rows)
+        return response
+
+
+class SessionMiddleware(BaseSessionMiddleware):
+    """
+    SessionMiddleware с политикой записи SESSION_WRITE_POLICY.
+
+    При refresh сессия, которую запрос прочитал, сохраняется не чаще
+    раза в SESSION_REFRESH_INTERVAL секунд: срок продлевается, но
+    запись в хранилище сессий не идет на каждом запросе.
+    """
+    REFRESHED_KEY = '_refreshed'
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if (settings.SESSION_WRITE_POLICY == 'refresh'
+                and session is not None and session.accessed
+                and not session.is_empty()):
+            now = int(time.time())
+            if (now - session.get(self.REFRESHED_KEY, 0)
+                    >= settings.SESSION_REFRESH_INTERVAL):
+                session[self.REFRESHED_KEY] = now
+        return super().process_response(request, response)
+
+
+class MetricsMiddleware:
+    """
+    Считает для каждого вида (view_name) запросы, время ответа и
+    запросы к базе с их суммарным временем (см. core.metrics).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0, 0.0]
+
+        def count_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                queries[1] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        metrics.inc('yatube_http_requests_total', view=view,
+                    method=request.method, status=response.status_code)
+        metrics.observe('yatube_http_request_duration_seconds', elapsed,
+                        view=view)
+        metrics.inc('yatube_db_queries_total', queries[0], view=view)
+        metrics.inc('yatube_db_query_duration_seconds_total', queries[1],
+                    view=view)
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Сохраняет профиль доли PROFILER_SAMPLE_RATE запросов (cProfile и SQL)
+    и всех запросов медленнее PROFILER_SLOW_THRESHOLD (выборка стеков,
+    см. core.profiler). Поток каждого запроса регистрируется у выборки
+    стеков, а обертка SQL и cProfile включаются только для доли,
+    выбранной до запроса. Если ни доля, ни порог не заданы, не
+    подключается.
+    """
+
+    def __init__(self, get_response):
+        if (not settings.PROFILER_SAMPLE_RATE
+                and settings.PROFILER_SLOW_THRESHOLD is None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() < settings.PROFILER_SAMPLE_RATE:
+            return self.record(request)
+        if settings.PROFILER_SLOW_THRESHOLD is None:
+            return self.get_response(request)
+        return self.watch(request)
+
+    def watch(self, request):
+        """Запрос под выборкой стеков; сохраняется, только если медленный."""
+        thread_id = threading.get_ident()
+        stacks = profiler.sampler.watch(thread_id)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            profiler.sampler.unwatch(thread_id)
+        if duration >= settings.PROFILER_SLOW_THRESHOLD:
+            self.write(request, response, duration, sampled=False,
+                       queries=[], stacks=dict(stacks))
+        return response
+
+    def record(self, request):
+        """Запрос с записью SQL и cProfile."""
+        queries = []
+
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append((sql, time.perf_counter() - start))
+
+        profile = cProfile.Profile()
+        profile.enable()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(record_query):
+                response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start
+            profile.disable()
+        self.write(request, response, duration, sampled=True,
+                   queries=queries,
+                   functions=profiler.profile_functions(profile))
+        return response
+
+    @staticmethod
+    def write(request, response, duration, **data):
+        match = getattr(request, 'resolver_match', None)
+        profiler.write_profile({
+            'view': match.view_name if match else 'unresolved',
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'duration': duration,
+            **data,
+        })
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('action', models.CharField(max_length=100, verbose_name='Операция')),
+                ('params', models.TextField(default='{}', verbose_name='Параметры')),
+                ('object_ids', models.TextField(default='[]', verbose_name='id объектов')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего объектов')),
+                ('done', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('result', models.CharField(blank=True, max_length=255, verbose_name='Файл результата')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Запустил')),
+            ],
+            options={
+                'verbose_name': 'Массовая операция',
+                'verbose_name_plural': 'Массовые операции',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_bulkjob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='bulkjob',
+            name='object_ids',
+        ),
+        migrations.CreateModel(
+            name='BulkJobItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(verbose_name='id объекта')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.BulkJob', verbose_name='Задание')),
+            ],
+            options={
+                'verbose_name': 'Объект задания',
+                'verbose_name_plural': 'Объекты заданий',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bulkjobitem',
+            constraint=models.UniqueConstraint(fields=('job', 'object_id'), name='unique_bulk_job_item'),
+        ),
+    ]
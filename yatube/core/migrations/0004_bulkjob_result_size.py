@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_bulkjobitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkjob',
+            name='result_size',
+            field=models.BigIntegerField(default=0, verbose_name='Размер файла после порции'),
+        ),
+    ]
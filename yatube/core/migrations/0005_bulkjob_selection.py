@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+def fail_unfinished(apps, schema_editor):
+    # Незавершенные задания хранили список id, продолжить их нельзя.
+    apps.get_model('core', 'BulkJob').objects.exclude(status='done').update(
+        status='failed', last_error='Задание прервано обновлением.')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_bulkjob_result_size'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='BulkJobItem',
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='last_pk',
+            field=models.PositiveIntegerField(default=0, verbose_name='Последний обработанный id'),
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='max_pk',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Наибольший id выборки'),
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='model',
+            field=models.CharField(default='', max_length=100, verbose_name='Модель'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='query',
+            field=models.BinaryField(default=b'', verbose_name='Условие выборки'),
+            preserve_default=False,
+        ),
+    ]
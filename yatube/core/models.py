@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -11,3 +12,87 @@ class CreatedModel(models.Model):
     class Meta:
         # Это абстрактная модель:
         abstract = True
+
+
+class Task(CreatedModel):
+    """Отложенная задача для обработчика из core.tasks."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField('Обработчик', max_length=100)
+    payload = models.TextField('Параметры', default='{}')
+    status = models.CharField('Статус', max_length=10,
+                              choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    run_at = models.DateTimeField('Запустить после')
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [models.Index(fields=['status', 'run_at'])]
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+
+class BulkJob(CreatedModel):
+    """Массовая операция над выбранными объектами (см. core.jobs)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    action = models.CharField('Операция', max_length=100)
+    params = models.TextField('Параметры', default='{}')
+    model = models.CharField('Модель', max_length=100)
+    query = models.BinaryField('Условие выборки')
+    last_pk = models.PositiveIntegerField('Последний обработанный id',
+                                          default=0)
+    max_pk = models.PositiveIntegerField('Наибольший id выборки',
+                                         null=True, blank=True)
+    total = models.PositiveIntegerField('Всего объектов', default=0)
+    done = models.PositiveIntegerField('Обработано', default=0)
+    status = models.CharField('Статус', max_length=10,
+                              choices=STATUSES, default=PENDING)
+    result = models.CharField('Файл результата', max_length=255,
+                              blank=True)
+    result_size = models.BigIntegerField('Размер файла после порции',
+                                         default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Запустил',
+    )
+    finished = models.DateTimeField('Завершено', null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Массовая операция'
+        verbose_name_plural = 'Массовые операции'
+
+    def __str__(self):
+        return f'{self.action}: {self.done}/{self.total}'
+
+    @property
+    def progress(self):
+        if self.status == self.DONE:
+            return 100
+        return 0 if not self.total else self.done * 100 // self.total
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_rows(model, using='default'):
+    """
+    Оценка числа строк таблицы без COUNT(*) или None, если СУБД ее не
+    дает. В SQLite это MAX(rowid): верхняя граница, после удалений
+    завышенная.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        'postgresql': ('SELECT reltuples::bigint FROM pg_class '
+                       'WHERE oid = %s::regclass', [table]),
+        'mysql': ('SELECT table_rows FROM information_schema.tables '
+                  'WHERE table_schema = DATABASE() AND table_name = %s',
+                  [table]),
+        'sqlite': ('SELECT MAX(rowid) FROM %s'
+                   % connection.ops.quote_name(table), []),
+    }
+    if connection.vendor not in queries:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(*queries[connection.vendor])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки для больших таблиц.
+
+    Для всей таблицы берется оценка СУБД, если строк не меньше
+    ADMIN_COUNT_LIMIT; отфильтрованный список считается точно, но не
+    дальше ADMIN_COUNT_LIMIT строк.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = settings.ADMIN_COUNT_LIMIT
+        if not queryset.query.where:
+            estimate = estimate_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate >= limit:
+                return estimate
+        return queryset.order_by()[:limit].count()
@@ -0,0 +1,137 @@
+"""
+Выгрузка страниц для гостей в статические HTML-файлы.
+
+Страницы about и первые страницы общей ленты и лент групп одинаковы
+для всех гостей, поэтому их можно отрисовать заранее и отдавать из
+PrerenderedPageMiddleware, минуя шаблоны и базу данных.
+"""
+import os
+import tempfile
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpRequest
+from django.urls import Resolver404, resolve, reverse
+from django.utils._os import safe_join
+
+PAGE_FILENAME = 'index.html'
+ABOUT_PAGES = ('about:author', 'about:tech')
+FEED_PAGES = ('posts:index', 'posts:group_list')
+PRERENDERED_VIEWS = ABOUT_PAGES + FEED_PAGES
+
+
+def has_pages():
+    """Выгрузка включена: команда prerender уже создала каталог."""
+    return os.path.isdir(settings.PRERENDER_ROOT)
+
+
+def page_path(url):
+    """Путь к файлу страницы или None, если url вне каталога выгрузки."""
+    try:
+        return safe_join(settings.PRERENDER_ROOT, url.lstrip('/'),
+                         PAGE_FILENAME)
+    except SuspiciousFileOperation:
+        return None
+
+
+def prerendered_urls():
+    from posts.models import Group
+
+    urls = [reverse(name) for name in ABOUT_PAGES]
+    urls.append(reverse('posts:index'))
+    urls.extend(group.get_absolute_url()
+                for group in Group.objects.only('slug'))
+    return urls
+
+
+def cache_directives(view_name):
+    """Заголовки кэширования, с которыми страницу отдает ее view."""
+    if view_name in ABOUT_PAGES:
+        return {'public': True, 'max_age': settings.ABOUT_CACHE_MAX_AGE}
+    return {'public': True, 'max_age': settings.FEED_CACHE_MAX_AGE,
+            'stale_while_revalidate': settings.FEED_STALE_WHILE_REVALIDATE}
+
+
+def render_page(url):
+    """Отрисовывает страницу так, как ее увидит гость."""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = url
+    request.META = {
+        'SERVER_NAME': settings.ALLOWED_HOSTS[0],
+        'SERVER_PORT': '80',
+    }
+    request.user = AnonymousUser()
+    try:
+        request.resolver_match = resolve(url)
+        response = request.resolver_match.func(
+            request, *request.resolver_match.args,
+            **request.resolver_match.kwargs)
+    except (Http404, Resolver404):
+        return None
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != HTTPStatus.OK:
+        return None
+    return response.content
+
+
+def write_page(url, content):
+    """Атомарно заменяет файл страницы."""
+    path = page_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as tmp:
+        tmp.write(content)
+    os.replace(tmp_path, path)
+
+
+def remove_page(url):
+    path = page_path(url)
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def export(urls=None):
+    """Отрисовывает страницы и возвращает url выгруженных."""
+    written = []
+    for url in prerendered_urls() if urls is None else urls:
+        content = render_page(url)
+        if content is None:
+            remove_page(url)
+            continue
+        write_page(url, content)
+        written.append(url)
+    return written
+
+
+def invalidate(urls):
+    """
+    Удаляет устаревшие файлы и возвращает url, которые были выгружены:
+    их нужно отрисовать заново, остальные не выгружались вовсе.
+    """
+    stale = []
+    for url in urls:
+        path = page_path(url)
+        if path and os.path.exists(path):
+            os.remove(path)
+            stale.append(url)
+    return stale
+
+
+def read_fresh_page(url, max_age):
+    """Содержимое и возраст файла страницы, если он моложе max_age."""
+    path = page_path(url)
+    if path is None:
+        return None, None
+    try:
+        with open(path, 'rb') as page:
+            age = time.time() - os.fstat(page.fileno()).st_mtime
+            if age > max_age:
+                return None, None
+            return page.read(), age
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None, None
@@ -0,0 +1,131 @@
+"""
+Профили медленных запросов.
+
+ProfilerMiddleware профилирует долю PROFILER_SAMPLE_RATE запросов
+через cProfile и с записью SQL, а поток каждого остального запроса
+только регистрирует у StackSampler (одна запись в словарь): фоновый
+поток раз в PROFILER_SAMPLE_INTERVAL секунд снимает стеки
+зарегистрированных потоков. Если запрос шел дольше
+PROFILER_SLOW_THRESHOLD, собранные стеки сохраняются; иначе
+выбрасываются. Так медленный запрос не теряется, а дорогие cProfile и
+обертка SQL достаются только доле, выбранной до запроса.
+
+Профиль - сжатый JSON в PROFILER_ROOT: вид, время, SQL-запросы и
+свернутые стеки (корень;...;лист -> число срабатываний) или функции
+cProfile. Старые файлы удаляются сверх PROFILER_MAX_FILES.
+Сводку строит команда manage.py profile_report.
+"""
+import gzip
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+MAX_STACK_DEPTH = 60
+TOP_FUNCTIONS = 50
+
+
+def frame_name(code, lineno):
+    return f'{os.path.basename(code.co_filename)}:{lineno}:{code.co_name}'
+
+
+class StackSampler:
+    def __init__(self):
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def watch(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._watched[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return stacks
+
+    def unwatch(self, thread_id):
+        with self._lock:
+            self._watched.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                watched = dict(self._watched)
+                if not watched:
+                    self._wakeup.clear()
+                    continue
+            frames = sys._current_frames()
+            for thread_id, stacks in watched.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    stacks[self.stack(frame)] += 1
+            time.sleep(settings.PROFILER_SAMPLE_INTERVAL)
+
+    @staticmethod
+    def stack(frame):
+        names = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            names.append(frame_name(frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+sampler = StackSampler()
+
+
+def profile_functions(profile):
+    """Самые дорогие функции cProfile по собственному времени."""
+    stats = pstats.Stats(profile).stats
+    rows = [
+        {'function': f'{os.path.basename(filename)}:{lineno}:{name}',
+         'calls': calls, 'own': own, 'cumulative': cumulative}
+        for (filename, lineno, name), (_, calls, own, cumulative, _)
+        in stats.items()]
+    rows.sort(key=lambda row: row['own'], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def write_profile(data):
+    """Сохраняет профиль и удаляет самые старые сверх лимита."""
+    root = settings.PROFILER_ROOT
+    os.makedirs(root, exist_ok=True)
+    name = '{:.6f}-{}-{}ms.json.gz'.format(
+        time.time(), data['view'].replace(':', '.'),
+        int(data['duration'] * 1000))
+    path = os.path.join(root, name)
+    with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as output:
+        json.dump(data, output, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+    rotate(root, settings.PROFILER_MAX_FILES)
+    return path
+
+
+def rotate(root, keep):
+    names = sorted(name for name in os.listdir(root)
+                   if name.endswith('.json.gz'))
+    for name in names[:max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(root, name))
+        except FileNotFoundError:
+            pass
+
+
+def read_profiles(root=None):
+    root = root or settings.PROFILER_ROOT
+    if not os.path.isdir(root):
+        return
+    for name in sorted(os.listdir(root)):
+        if name.endswith('.json.gz'):
+            with gzip.open(os.path.join(root, name), 'rt',
+                           encoding='utf-8') as source:
+                yield json.load(source)
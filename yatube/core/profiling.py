@@ -0,0 +1,104 @@
+"""
+Профилирование отрисовки шаблонов.
+
+При TEMPLATE_PROFILING Template._render оборачивается замером времени,
+и для каждого шаблона, включая подключенные через {% include %} и
+{% extends %}, копятся число отрисовок, полное время и собственное
+время без вложенных шаблонов. Замер идет только внутри запроса, который
+пропустил TemplateProfilingMiddleware; итоги запроса пишутся в лог, а
+накопленные по процессу отдает страница debug/templates/.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = defaultdict(lambda: [0, 0.0, 0.0])
+_original_render = None
+
+
+def install():
+    """Подменяет Template._render; повторный вызов ничего не делает."""
+    global _original_render
+    if _original_render is not None:
+        return
+    _original_render = Template._render
+    Template._render = _profiled_render
+
+
+def _profiled_render(self, context):
+    frames = getattr(_local, 'frames', None)
+    if frames is None:
+        return _original_render(self, context)
+    frames.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = frames.pop()
+        if frames:
+            frames[-1] += elapsed
+        stats = _local.stats[template_name(self)]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - children
+
+
+def template_name(template):
+    origin = template.origin
+    return origin.template_name or origin.name
+
+
+def start():
+    _local.frames = []
+    _local.stats = defaultdict(lambda: [0, 0.0, 0.0])
+
+
+def stop():
+    """
+    Завершает замер запроса: добавляет его к итогам процесса и
+    возвращает строки (шаблон, отрисовок, всего, собственное время)
+    по убыванию собственного времени.
+    """
+    stats = getattr(_local, 'stats', None)
+    _local.frames = _local.stats = None
+    if not stats:
+        return []
+    with _lock:
+        for name, (calls, total, own) in stats.items():
+            line = _totals[name]
+            line[0] += calls
+            line[1] += total
+            line[2] += own
+    return _sorted(stats)
+
+
+def log(path, rows):
+    if rows:
+        logger.info(
+            'Шаблоны %s:\n%s', path,
+            '\n'.join('%6d %8.2f ms %8.2f ms  %s'
+                      % (calls, total * 1000, own * 1000, name)
+                      for name, calls, total, own in rows))
+
+
+def totals():
+    with _lock:
+        return _sorted(_totals)
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+def _sorted(stats):
+    return sorted(((name,) + tuple(line) for name, line in stats.items()),
+                  key=lambda row: row[3], reverse=True)
@@ -0,0 +1,163 @@
+"""
+Кэширующий обратный прокси, работающий в одном процессе с приложением.
+
+Оборачивает WSGI-приложение и ведет себя как промежуточный кэш:
+соблюдает Cache-Control (public, private, no-store, no-cache, max-age,
+s-maxage, stale-while-revalidate) и Vary ответов. Нужен тестам и
+локальным замерам, чтобы показать, сколько запросов снимается с
+приложения при заданной политике кэширования.
+"""
+import threading
+import time
+from io import BytesIO
+
+FORWARDED_METHODS = ('GET', 'HEAD')
+NOT_STORABLE = ('private', 'no-store', 'no-cache')
+
+
+def run_in_thread(func):
+    threading.Thread(target=func, daemon=True).start()
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in value.split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+class CachedResponse:
+    __slots__ = ('status', 'headers', 'body', 'stored_at', 'ttl', 'swr')
+
+    def __init__(self, status, headers, body, stored_at, ttl, swr):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.ttl = ttl
+        self.swr = swr
+
+
+class CachingProxy:
+    """
+    WSGI-обертка с общим кэшем ответов.
+
+    clock и background подменяются в тестах: первый задает текущее
+    время, второй запускает фоновое обновление устаревшей записи.
+    """
+
+    def __init__(self, app, clock=time.monotonic, background=run_in_thread):
+        self.app = app
+        self.clock = clock
+        self.background = background
+        self.stats = {'hit': 0, 'stale': 0, 'miss': 0, 'pass': 0,
+                      'origin': 0}
+        self._store = {}
+        self._vary = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if environ['REQUEST_METHOD'] not in FORWARDED_METHODS:
+            self.stats['pass'] += 1
+            status, headers, body = self._fetch(environ)
+            start_response(status, headers)
+            return [body]
+        base_key = self._base_key(environ)
+        key = self._key(base_key, environ)
+        entry = self._store.get(key)
+        if entry is not None:
+            age = self.clock() - entry.stored_at
+            if age < entry.ttl:
+                self.stats['hit'] += 1
+                return self._replay(entry, age, start_response)
+            if age < entry.ttl + entry.swr:
+                self.stats['stale'] += 1
+                self._revalidate(key, base_key, environ)
+                return self._replay(entry, age, start_response)
+        self.stats['miss'] += 1
+        status, headers, body = self._fetch(environ)
+        self._store_response(base_key, environ, status, headers, body)
+        start_response(status, headers)
+        return [body]
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self._vary.clear()
+
+    def _base_key(self, environ):
+        return (environ['REQUEST_METHOD'], environ.get('PATH_INFO', '/'),
+                environ.get('QUERY_STRING', ''))
+
+    def _key(self, base_key, environ):
+        vary = self._vary.get(base_key, ())
+        return base_key + tuple(
+            environ.get('HTTP_' + name.upper().replace('-', '_'), '')
+            for name in vary)
+
+    def _fetch(self, environ):
+        self.stats['origin'] += 1
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+
+        result = self.app(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return captured['status'], captured['headers'], body
+
+    def _store_response(self, base_key, environ, status, headers, body):
+        if not status.startswith('200'):
+            return
+        names = {name.lower(): value for name, value in headers}
+        if 'set-cookie' in names:
+            return
+        directives = parse_cache_control(names.get('cache-control', ''))
+        if any(name in directives for name in NOT_STORABLE):
+            return
+        ttl = directives.get('s-maxage') or directives.get('max-age')
+        if 'public' not in directives or not ttl or int(ttl) <= 0:
+            return
+        vary = tuple(name.strip() for name in
+                     names.get('vary', '').split(',') if name.strip())
+        if '*' in vary:
+            return
+        entry = CachedResponse(
+            status, headers, body, self.clock(), int(ttl),
+            int(directives.get('stale-while-revalidate') or 0))
+        with self._lock:
+            self._vary[base_key] = vary
+            self._store[self._key(base_key, environ)] = entry
+
+    def _revalidate(self, key, base_key, environ):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        environ = dict(environ, **{'wsgi.input': BytesIO()})
+
+        def refresh():
+            try:
+                status, headers, body = self._fetch(environ)
+                self._store_response(base_key, environ, status, headers,
+                                     body)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.background(refresh)
+
+    def _replay(self, entry, age, start_response):
+        headers = [(name, value) for name, value in entry.headers
+                   if name.lower() != 'age']
+        headers.append(('Age', str(int(age))))
+        start_response(entry.status, headers)
+        return [entry.body]
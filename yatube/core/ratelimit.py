@@ -0,0 +1,105 @@
+"""
+Ограничение частоты запросов.
+
+Лимит вида - RATE_LIMITS[name] = (число запросов, период в секундах):
+ведро на столько запросов, которое полностью пополняется за период.
+Ведро приближено скользящим окном из двух счетчиков в кэше (текущий и
+прошлый период): оба меняются атомарными add/incr, без чтения и
+записи состояния целиком. Общим для воркеров лимит становится только
+на общем кэше RATE_LIMIT_CACHE (memcached, DJANGO_CACHE_LOCATION): на
+LocMem у каждого процесса свои счетчики, и клиент получает лимит,
+умноженный на число процессов. Заполненность ведра - текущий счетчик
+плюс прошлый, взятый с весом оставшейся доли периода.
+
+Ведро заводится на пользователя и на IP-адрес: войти под другим
+аккаунтом с того же адреса недостаточно, чтобы обойти лимит. За
+обратным прокси адрес клиента берется из X-Forwarded-For (см.
+client_ip и TRUSTED_PROXY_HOPS).
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY = 'ratelimit:{}:{}:{}'
+
+
+def client_ip(request):
+    """
+    Адрес клиента. За TRUSTED_PROXY_HOPS доверенными прокси это адрес,
+    который дописал в X-Forwarded-For первый из них: адреса левее
+    клиент может подставить сам.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops:
+        forwarded = [address.strip() for address in
+                     request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+                     if address.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def identities(request):
+    keys = ['ip:' + client_ip(request)]
+    if request.user.is_authenticated:
+        keys.append(f'user:{request.user.pk}')
+    return keys
+
+
+def _release(cache, key):
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+
+
+def _take(cache, name, identity, limit, period, now):
+    """
+    Берет из ведра один запрос; возвращает 0 или через сколько секунд
+    повторить.
+    """
+    window, elapsed = divmod(now, period)
+    current = KEY.format(name, identity, int(window))
+    cache.add(current, 0, period * 2)
+    try:
+        used = cache.incr(current)
+    except ValueError:
+        # Счетчик вытеснен между add и incr: запрос пропускаем.
+        return 0
+    previous = cache.get(KEY.format(name, identity, int(window) - 1), 0)
+    weight = 1 - elapsed / period
+    if previous * weight + used <= limit:
+        return 0
+    _release(cache, current)
+    used -= 1
+    if used >= limit or not previous:
+        return period - elapsed
+    # Прошлый счетчик затухает линейно: ждем, пока освободится место
+    # для этого запроса, то есть вес прошлого окна не опустится до
+    # (limit - used - 1) / previous.
+    return period * (1 - (limit - used - 1) / previous) - elapsed
+
+
+def check(request, name):
+    """
+    Учитывает запрос в лимите name; возвращает 0, если запрос можно
+    выполнить, иначе число секунд для Retry-After.
+    """
+    rate = settings.RATE_LIMITS.get(name)
+    if rate is None:
+        return 0
+    limit, period = rate
+    cache = caches[settings.RATE_LIMIT_CACHE]
+    now = time.time()
+    taken = []
+    for identity in identities(request):
+        wait = _take(cache, name, identity, limit, period, now)
+        if wait:
+            # Запрос не выполнится: возвращаем взятое из других ведер.
+            for key in taken:
+                _release(cache, key)
+            return max(1, math.ceil(wait))
+        taken.append(KEY.format(name, identity, int(now // period)))
+    return 0
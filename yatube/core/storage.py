@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+
+@deconstructible
+class InMemoryStorage(Storage):
+    """
+    Файлы в памяти процесса вместо MEDIA_ROOT - для тестов: загрузки
+    картинок не пишут на диск и не оставляют мусора. У каждого
+    MEDIA_ROOT (override_settings в тестах) свой набор файлов.
+    """
+    roots = {}
+
+    @property
+    def files(self):
+        return self.roots.setdefault(settings.MEDIA_ROOT, {})
+
+    def _open(self, name, mode='rb'):
+        return ContentFile(self.files[name], name=name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = content.read()
+        self.files[name] = data if isinstance(data, bytes) else data.encode()
+        return name
+
+    def delete(self, name):
+        self.files.pop(name, None)
+
+    def exists(self, name):
+        return name in self.files
+
+    def size(self, name):
+        return len(self.files[name])
+
+    def listdir(self, path):
+        prefix = path.rstrip('/') + '/' if path else ''
+        directories, files = set(), set()
+        for name in self.files:
+            if not name.startswith(prefix):
+                continue
+            head, _, tail = name[len(prefix):].partition('/')
+            (directories if tail else files).add(head)
+        return sorted(directories), sorted(files)
+
+    def url(self, name):
+        return settings.MEDIA_URL + filepath_to_uri(name)
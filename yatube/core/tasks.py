@@ -0,0 +1,100 @@
+"""
+Очередь отложенных задач в базе данных.
+
+Задача - строка таблицы Task с именем обработчика и JSON-параметрами,
+поэтому она переживает перезапуск и ставится в той же транзакции, что и
+данные, которые ее породили. Выполняет задачи команда run_tasks.
+
+Обработчики регистрируются декоратором:
+
+    @tasks.register('posts.notify_new_post')
+    def notify_new_post(post_id):
+        ...
+
+    tasks.enqueue('posts.notify_new_post', post_id=post.id)
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register(name):
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, delay=0, **payload):
+    return Task.objects.create(
+        name=name,
+        payload=json.dumps(payload),
+        run_at=timezone.now() + timedelta(seconds=delay))
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повтором: 1x, 2x, 4x ..."""
+    return settings.TASK_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def claim(limit):
+    """
+    Забирает до limit задач, которым пора выполняться.
+
+    Зависшие задачи (воркер упал, не дойдя до конца) снова становятся
+    доступны через TASK_TIMEOUT секунд. Смена run_at служит
+    compare-and-swap: одну задачу заберет только один воркер.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.TASK_TIMEOUT)
+    candidates = (Task.objects
+                  .filter(Q(status=Task.PENDING) | Q(status=Task.RUNNING),
+                          run_at__lte=now)
+                  .values_list('pk', 'run_at')[:limit])
+    claimed = []
+    for pk, run_at in candidates:
+        if Task.objects.filter(pk=pk, run_at=run_at).update(
+                status=Task.RUNNING, run_at=lease):
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def run(task):
+    """Выполняет задачу; возвращает True, если она завершилась успешно."""
+    try:
+        handler = _handlers[task.name]
+        handler(**json.loads(task.payload))
+    except Exception:
+        task.attempts += 1
+        task.last_error = traceback.format_exc()
+        if task.attempts >= settings.TASK_MAX_ATTEMPTS:
+            task.status = Task.FAILED
+            logger.exception('Задача %s не выполнена', task)
+        else:
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + timedelta(
+                seconds=retry_delay(task.attempts))
+        task.save(update_fields=['attempts', 'last_error', 'status',
+                                 'run_at'])
+        return False
+    task.delete()
+    return True
+
+
+def run_pending(limit=None):
+    """Выполняет задачи, которым пора; возвращает число выполненных."""
+    done = 0
+    for task in claim(limit or settings.TASK_BATCH_SIZE):
+        done += run(task)
+    return done
@@ -0,0 +1,24 @@
+import sys
+import time
+
+from django.test.runner import DiscoverRunner, default_test_processes
+
+
+class TimedTestRunner(DiscoverRunner):
+    """
+    Запускает тесты во всех процессорах (у каждого процесса своя копия
+    базы в памяти) и сообщает полное время прогона.
+    """
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=default_test_processes())
+
+    def run_tests(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().run_tests(*args, **kwargs)
+        finally:
+            sys.stderr.write('Тесты заняли {:.2f} с (процессов: {})\n'.format(
+                time.perf_counter() - start, self.parallel))
@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core.proxy import CachingProxy
+from posts.models import Group, Post, User
+
+ABOUT_AUTHOR = reverse('about:author')
+MAIN_PAGE = reverse('posts:index')
+FOLLOW_INDEX = reverse('posts:follow_index')
+
+LOAD = 200
+
+
+class CacheControlHeadersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='group', slug='slug')
+        Post.objects.create(author=cls.user, group=cls.group, text='text')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_about_pages_are_public_for_guests(self):
+        """Страницы about кэшируются надолго для гостей."""
+        for name in ('about:author', 'about:tech'):
+            with self.subTest(name=name):
+                response = self.guest_client.get(reverse(name))
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn(f'max-age={settings.ABOUT_CACHE_MAX_AGE}',
+                              response['Cache-Control'])
+                self.assertIn('Cookie', response['Vary'])
+
+    def test_feeds_are_short_lived_with_stale_while_revalidate(self):
+        """Ленты для гостей кэшируются коротко и с stale-while-revalidate."""
+        pages = (
+            MAIN_PAGE,
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                cache_control = self.guest_client.get(page)['Cache-Control']
+                self.assertIn('public', cache_control)
+                self.assertIn(
+                    'stale-while-revalidate='
+                    f'{settings.FEED_STALE_WHILE_REVALIDATE}',
+                    cache_control)
+
+    def test_authenticated_pages_are_private(self):
+        """Страницы авторизованного пользователя не попадают в общий кэш."""
+        for page in (ABOUT_AUTHOR, MAIN_PAGE, FOLLOW_INDEX):
+            with self.subTest(page=page):
+                response = self.authorized_client.get(page)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertNotIn('public', response['Cache-Control'])
+
+    def test_pages_have_validators(self):
+        """Ответы содержат ETag и отвечают 304 на If-None-Match."""
+        response = self.guest_client.get(ABOUT_AUTHOR)
+        self.assertTrue(response.has_header('ETag'))
+        response = self.guest_client.get(
+            ABOUT_AUTHOR, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class CachingProxyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='text')
+
+    def setUp(self):
+        cache.clear()
+        # Как и тестовый клиент, не закрываем соединение с тестовой БД
+        # по окончании запроса.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        self.now = 0
+        self.proxy = CachingProxy(WSGIHandler(), clock=lambda: self.now,
+                                  background=lambda refresh: refresh())
+        self.factory = RequestFactory()
+
+    def request(self, path, **extra):
+        environ = self.factory.get(path, **extra).environ
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured['status'] = status
+
+        body = b''.join(self.proxy(environ, start_response))
+        return captured['status'], body
+
+    def test_guest_load_is_absorbed_by_proxy(self):
+        """Под нагрузкой гостей до приложения доходит один запрос."""
+        for path in (ABOUT_AUTHOR, MAIN_PAGE):
+            for _ in range(LOAD):
+                status, _ = self.request(path)
+                self.assertTrue(status.startswith('200'))
+        self.assertEqual(self.proxy.stats['origin'], 2)
+        self.assertEqual(self.proxy.stats['hit'], 2 * (LOAD - 1))
+
+    def test_authenticated_requests_reach_origin(self):
+        """Запросы авторизованного пользователя не кэшируются прокси."""
+        client = Client()
+        client.force_login(self.user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}=' + (
+            client.cookies[settings.SESSION_COOKIE_NAME].value)
+        for _ in range(10):
+            self.request(MAIN_PAGE, HTTP_COOKIE=cookie)
+        self.assertEqual(self.proxy.stats['origin'], 10)
+
+    def test_stale_response_is_served_while_revalidating(self):
+        """Устаревшая лента отдается сразу и обновляется в фоне."""
+        _, first_body = self.request(MAIN_PAGE)
+        self.now = settings.FEED_CACHE_MAX_AGE + 1
+        _, stale_body = self.request(MAIN_PAGE)
+        self.assertEqual(stale_body, first_body)
+        self.assertEqual(self.proxy.stats['stale'], 1)
+        self.assertEqual(self.proxy.stats['origin'], 2)
+        self.request(MAIN_PAGE)
+        self.assertEqual(self.proxy.stats['hit'], 1)
@@ -0,0 +1,102 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post, User
+from posts.tests.utils import image_for_test
+
+METRICS = reverse('metrics')
+TOKEN = 'metrics-token'
+
+
+@override_settings(METRICS_TOKEN=TOKEN)
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='post',
+                                       image=image_for_test('metrics.bmp'))
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.client = Client()
+
+    def scrape(self):
+        response = self.client.get(METRICS,
+                                   HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; version=0.0.4')
+        return response.content.decode()
+
+    def test_requests_queries_and_cache_by_view(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        text = self.scrape()
+        self.assertIn('yatube_http_requests_total{method="GET",status="200",'
+                      'view="posts:index"} 2', text)
+        self.assertIn('yatube_http_request_duration_seconds_count'
+                      '{view="posts:index"} 2', text)
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', text)
+        self.assertIn('yatube_cache_requests_total{cache="default",'
+                      'key="template.cache.index_page",result="hit"} 1', text)
+        self.assertIn('yatube_cache_requests_total{cache="default",'
+                      'key="template.cache.index_page",result="miss"} 1',
+                      text)
+
+    def test_thumbnail_generation_is_timed(self):
+        self.client.get(reverse('posts:post_detail', args=[self.post.pk]))
+        text = self.scrape()
+        self.assertIn('yatube_thumbnail_duration_seconds_count 1', text)
+        self.assertIn('key="sorl-thumbnail"', text)
+        self.assertNotIn('||', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.003, 0.03, 20):
+            metrics.observe('yatube_http_request_duration_seconds', value,
+                            view='test')
+        text = metrics.render()
+        for line in ('{view="test",le="0.005"} 1', '{view="test",le="0.05"} 2',
+                     '{view="test",le="10"} 2', '{view="test",le="+Inf"} 3'):
+            self.assertIn('yatube_http_request_duration_seconds_bucket'
+                          + line, text)
+
+    def test_metrics_require_token_or_staff(self):
+        """Без токена метрики не видны даже с 127.0.0.1; персоналу видны."""
+        self.assertEqual(Client().get(METRICS).status_code, 404)
+        response = Client().get(METRICS, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 404)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        client = Client()
+        client.force_login(staff)
+        self.assertEqual(client.get(METRICS).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_disables_token_access(self):
+        response = Client().get(METRICS, HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_session_keys_not_exposed(self):
+        """Ключи сессий не попадают в метки метрик."""
+        self.client.force_login(self.user)
+        self.client.get(reverse('posts:follow_index'))
+        session_key = self.client.session.session_key
+        text = self.scrape()
+        self.assertNotIn(session_key, text)
+        self.assertIn('key="django.contrib.sessions"', text)
+
+    def test_key_families_are_bounded(self):
+        """Ключи с хешами и id сводятся к ограниченному числу семейств."""
+        cases = {
+            'sorl-thumbnail||image||0f3c9d2a6b1e4f5a8c7d': 'sorl-thumbnail',
+            'inbox:unread:42': 'inbox',
+            'template.cache.sidebar.0f3c9d2a': 'template.cache.sidebar',
+            'posts_list': 'posts_list',
+            '0f3c9d2a6b1e4f5a8c7d': metrics.OTHER_FAMILY,
+        }
+        for key, family in cases.items():
+            with self.subTest(key=key):
+                self.assertEqual(metrics.cache_key_family(key), family)
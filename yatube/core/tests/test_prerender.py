@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import prerender
+from posts.models import Group, Post, User
+
+TEMP_PRERENDER_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+MAIN_PAGE = reverse('posts:index')
+ABOUT_AUTHOR = reverse('about:author')
+
+
+@override_settings(PRERENDER_ROOT=TEMP_PRERENDER_ROOT)
+class PrerenderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='group', slug='slug')
+        cls.post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text='prerendered_post')
+        cls.group_list = reverse('posts:group_list',
+                                 kwargs={'slug': cls.group.slug})
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PRERENDER_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        call_command('prerender', '--clear', stdout=StringIO())
+        self.guest_client = Client()
+
+    def test_command_exports_guest_pages(self):
+        """Команда prerender выгружает about, главную и ленты групп."""
+        for url in (ABOUT_AUTHOR, reverse('about:tech'), MAIN_PAGE,
+                    self.group_list):
+            with self.subTest(url=url):
+                self.assertTrue(os.path.exists(prerender.page_path(url)))
+
+    def test_guest_gets_prerendered_page(self):
+        """Гость получает выгруженный файл с политикой кэширования."""
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.group_list)
+        self.assertTrue(response.has_header('X-Prerendered-Age'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertContains(response, self.post.text)
+
+    def test_authenticated_user_bypasses_prerendered_page(self):
+        """Авторизованный пользователь и запросы с параметрами идут мимо."""
+        client = Client()
+        client.force_login(self.user)
+        responses = (
+            client.get(ABOUT_AUTHOR),
+            self.guest_client.get(MAIN_PAGE, {'page': 1}),
+        )
+        for response in responses:
+            with self.subTest(url=response.wsgi_request.get_full_path()):
+                self.assertFalse(response.has_header('X-Prerendered-Age'))
+
+    def test_content_change_invalidates_pages(self):
+        """Новая запись удаляет устаревшие файлы главной и группы."""
+        Post.objects.create(author=self.user, group=self.group, text='new')
+        for url in (MAIN_PAGE, self.group_list):
+            with self.subTest(url=url):
+                self.assertFalse(os.path.exists(prerender.page_path(url)))
+        self.assertTrue(os.path.exists(prerender.page_path(ABOUT_AUTHOR)))
+
+    def test_missing_page_is_rendered_and_exported_again(self):
+        """Без свежего файла страница отрисовывается и выгружается снова."""
+        prerender.remove_page(self.group_list)
+        response = self.guest_client.get(self.group_list)
+        self.assertFalse(response.has_header('X-Prerendered-Age'))
+        self.assertTrue(os.path.exists(prerender.page_path(self.group_list)))
+        response = self.guest_client.get(self.group_list)
+        self.assertTrue(response.has_header('X-Prerendered-Age'))
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import profiler
+from core.middleware import ProfilerMiddleware
+from posts.models import Post, User
+
+TEMP_PROFILER_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(PROFILER_ROOT=TEMP_PROFILER_ROOT)
+class ProfilerMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILER_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(TEMP_PROFILER_ROOT, ignore_errors=True)
+
+    def profiles(self):
+        return list(profiler.read_profiles())
+
+    @override_settings(PROFILER_SAMPLE_RATE=0, PROFILER_SLOW_THRESHOLD=60)
+    def test_fast_request_leaves_no_profile(self):
+        """Быстрый запрос вне выборки не сохраняется."""
+        Client().get(reverse('posts:index'))
+        self.assertEqual(self.profiles(), [])
+
+    @override_settings(PROFILER_SAMPLE_RATE=1)
+    def test_sampled_request_has_functions_and_sql(self):
+        """Запрос из выборки сохраняется с функциями cProfile и SQL."""
+        Client().get(reverse('posts:index'))
+        data, = self.profiles()
+        self.assertTrue(data['sampled'])
+        self.assertEqual(data['view'], 'posts:index')
+        self.assertEqual(data['status'], 200)
+        self.assertTrue(data['functions'])
+        self.assertTrue(any('posts_post' in sql
+                            for sql, _ in data['queries']))
+
+    @override_settings(PROFILER_SAMPLE_RATE=0, PROFILER_SLOW_THRESHOLD=0)
+    def test_slow_request_has_stacks(self):
+        """Медленный запрос сохраняется со стеками, без cProfile."""
+        Client().get(reverse('posts:index'))
+        data, = self.profiles()
+        self.assertFalse(data['sampled'])
+        self.assertIn('stacks', data)
+        self.assertNotIn('functions', data)
+
+    @override_settings(PROFILER_SAMPLE_RATE=0.05, PROFILER_SLOW_THRESHOLD=0)
+    def test_slow_unsampled_request_is_written(self):
+        """
+        Медленный запрос вне доли cProfile сохраняется со стеками, но
+        без обертки SQL.
+        """
+        with mock.patch('core.middleware.random.random', return_value=0.9), \
+                mock.patch.object(ProfilerMiddleware, 'record') as record:
+            response = Client().get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
+        record.assert_not_called()
+        data, = self.profiles()
+        self.assertFalse(data['sampled'])
+        self.assertEqual(data['queries'], [])
+        self.assertIn('stacks', data)
+
+    @override_settings(PROFILER_SAMPLE_RATE=1, PROFILER_MAX_FILES=2)
+    def test_old_profiles_are_rotated(self):
+        """Сверх PROFILER_MAX_FILES остаются только новые профили."""
+        client = Client()
+        for _ in range(3):
+            client.get(reverse('posts:index'))
+        self.assertEqual(len(os.listdir(TEMP_PROFILER_ROOT)), 2)
+
+    @override_settings(PROFILER_SAMPLE_RATE=1)
+    def test_report_lists_views_and_sql(self):
+        """profile_report показывает виды и самые дорогие запросы."""
+        Client().get(reverse('posts:index'))
+        out = StringIO()
+        call_command('profile_report', stdout=out)
+        report = out.getvalue()
+        self.assertIn('posts:index', report)
+        self.assertIn('posts_post', report)
+
+    def test_sampler_collects_stacks_of_watched_thread(self):
+        """Выборка стеков видит функцию, в которой стоит поток."""
+        stacks = profiler.sampler.watch(threading.get_ident())
+        try:
+            deadline = time.monotonic() + 0.2
+            while time.monotonic() < deadline:
+                pass
+        finally:
+            profiler.sampler.unwatch(threading.get_ident())
+        self.assertTrue(any(
+            'test_sampler_collects_stacks_of_watched_thread' in stack
+            for stack in stacks))
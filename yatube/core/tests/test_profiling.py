@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import profiling
+from posts.models import Post, User
+
+POSTS = 3
+
+TEMPLATE_PROFILE = reverse('template_profile')
+
+
+@override_settings(TEMPLATE_PROFILING=True)
+class TemplateProfilingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'post_{number}')
+            for number in range(POSTS))
+
+    def setUp(self):
+        cache.clear()
+        profiling.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_counts_includes_per_page(self):
+        """Учитывается каждая отрисовка шаблона, в том числе include."""
+        with self.assertLogs('core.profiling', 'INFO'):
+            Client().get(reverse('posts:index'))
+        stats = {row['name']: row for row in
+                 self.staff_client.get(TEMPLATE_PROFILE).json()['templates']}
+        self.assertEqual(stats['includes/single_post.html']['calls'], POSTS)
+        self.assertEqual(stats['posts/index.html']['calls'], 1)
+        self.assertEqual(stats['base.html']['calls'], 1)
+        index = stats['posts/index.html']
+        self.assertLessEqual(index['own_ms'], index['total_ms'])
+
+    def test_reset(self):
+        """POST на страницу профиля обнуляет итоги."""
+        Client().get(reverse('posts:index'))
+        response = self.staff_client.post(TEMPLATE_PROFILE)
+        self.assertEqual(response.json()['templates'], [])
+
+    def test_profile_hidden_from_users(self):
+        """Итоги видит только персонал."""
+        client = Client()
+        client.force_login(self.user)
+        self.assertEqual(client.get(TEMPLATE_PROFILE).status_code, 404)
+
+    @override_settings(TEMPLATE_PROFILING=False)
+    def test_profile_hidden_when_disabled(self):
+        """Без TEMPLATE_PROFILING страницы нет."""
+        self.assertEqual(
+            self.staff_client.get(TEMPLATE_PROFILE).status_code, 404)
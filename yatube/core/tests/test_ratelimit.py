@@ -0,0 +1,132 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+
+SEARCH = reverse('posts:search') + '?text=post'
+LIMIT = 5
+
+
+@override_settings(RATE_LIMITS={'search': (LIMIT, 60),
+                                'post_create': (LIMIT, 60),
+                                'profile_follow': (LIMIT, 60)})
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.author, text='post')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_search_is_limited_per_ip(self):
+        """Сверх лимита поиск отвечает 429 с Retry-After."""
+        client = Client(REMOTE_ADDR='10.0.0.1')
+        for _ in range(LIMIT):
+            self.assertEqual(client.get(SEARCH).status_code, HTTPStatus.OK)
+        response = client.get(SEARCH)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertIn('no-cache', response['Cache-Control'])
+        other = Client(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other.get(SEARCH).status_code, HTTPStatus.OK)
+
+    def get_at(self, client, now):
+        with mock.patch('core.ratelimit.time.time', return_value=now):
+            return client.get(SEARCH)
+
+    def test_retry_after_is_enough(self):
+        """Повтор ровно через Retry-After проходит, раньше - нет."""
+        client = Client(REMOTE_ADDR='10.0.0.3')
+        for _ in range(LIMIT):
+            self.get_at(client, 5990)
+        response = self.get_at(client, 6010.5)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        retry_at = 6010.5 + int(response['Retry-After'])
+        self.assertEqual(self.get_at(client, retry_at - 1).status_code,
+                         HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(self.get_at(client, retry_at).status_code,
+                         HTTPStatus.OK)
+
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_client_ip_from_trusted_proxy(self):
+        """
+        За прокси лимит считается по адресу, который дописал прокси,
+        а не по подставленному клиентом.
+        """
+        for number in range(LIMIT):
+            client = Client(REMOTE_ADDR='127.0.0.1',
+                            HTTP_X_FORWARDED_FOR=f'1.1.1.{number}, 10.0.3.1')
+            self.assertEqual(client.get(SEARCH).status_code, HTTPStatus.OK)
+        self.assertEqual(client.get(SEARCH).status_code,
+                         HTTPStatus.TOO_MANY_REQUESTS)
+        other = Client(REMOTE_ADDR='127.0.0.1',
+                       HTTP_X_FORWARDED_FOR='10.0.3.2')
+        self.assertEqual(other.get(SEARCH).status_code, HTTPStatus.OK)
+
+    def test_user_limit_survives_ip_change(self):
+        """Лимит пользователя не обходится сменой адреса."""
+        for number in range(LIMIT):
+            client = Client(REMOTE_ADDR=f'10.0.1.{number}')
+            client.force_login(self.user)
+            client.post(reverse('posts:post_create'), {'text': 'spam'})
+        client = Client(REMOTE_ADDR='10.0.2.1')
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'),
+                               {'text': 'spam'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(Post.objects.filter(author=self.user).count(), LIMIT)
+
+    def test_form_display_is_not_limited(self):
+        """Открытие формы не тратит лимит публикаций."""
+        client = Client()
+        client.force_login(self.user)
+        for _ in range(LIMIT + 1):
+            response = client.get(reverse('posts:post_create'))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_limited_requests_skip_database(self):
+        """Отклоненный запрос не доходит до базы."""
+        client = Client(REMOTE_ADDR='10.0.0.3')
+        client.force_login(self.user)
+        url = reverse('posts:profile_follow', args=[self.author.username])
+        for _ in range(LIMIT):
+            client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertFalse([query for query in queries
+                          if 'posts_' in query['sql']])
+
+    def test_abusive_client_does_not_affect_others(self):
+        """Нагрузка с одного адреса не мешает обычному клиенту."""
+        out = StringIO()
+        call_command('ratelimit_load_test', requests=100, threads=1,
+                     regular_every=20, stdout=out)
+        abuser, regular = out.getvalue().splitlines()
+        self.assertIn(f'200: {LIMIT},', abuser)
+        self.assertIn('429: 95', abuser)
+        self.assertIn('200: 5,', regular)
+        self.assertNotIn('429', regular)
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Найдите меня')
+
+    def test_search_finds_posts(self):
+        """Поиск показывает найденные записи."""
+        response = Client().get(reverse('posts:search'), {'text': 'Найдите'})
+        self.assertEqual(response.context['title'], 'Результаты поиска')
+        self.assertEqual(len(response.context['page_obj']), 1)
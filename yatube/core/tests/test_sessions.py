@@ -0,0 +1,97 @@
+import os
+import runpy
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import User
+
+FOLLOW_INDEX = reverse('posts:follow_index')
+BASE_SETTINGS = os.path.join(settings.BASE_DIR, 'yatube', 'settings',
+                             'base.py')
+
+
+def load_base_settings(**environ):
+    """Исполняет base.py заново с заданными переменными окружения."""
+    environ = {**{key: value for key, value in os.environ.items()
+                  if key not in ('DJANGO_SESSION_MODE',
+                                 'DJANGO_CACHE_LOCATION')},
+               **environ}
+    with mock.patch.dict(os.environ, environ, clear=True):
+        return runpy.run_path(BASE_SETTINGS)
+
+
+class SessionModesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+
+    def session_queries(self, requests=3):
+        client = Client()
+        client.force_login(self.user)
+        client.get(FOLLOW_INDEX)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                self.assertEqual(client.get(FOLLOW_INDEX).status_code, 200)
+        return [query['sql'] for query in queries
+                if 'django_session' in query['sql']]
+
+    def test_cached_and_signed_sessions_skip_database(self):
+        """cached_db и signed_cookies не ходят в django_session."""
+        for mode in ('cached_db', 'signed_cookies'):
+            with self.subTest(mode=mode), override_settings(
+                    SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+                self.assertEqual(self.session_queries(), [])
+
+    @override_settings(SESSION_ENGINE=settings.SESSION_ENGINES['db'])
+    def test_db_sessions_read_every_request(self):
+        self.assertEqual(len(self.session_queries(3)), 3)
+
+    @override_settings(SESSION_ENGINE=settings.SESSION_ENGINES['db'],
+                       SESSION_WRITE_POLICY='refresh',
+                       SESSION_REFRESH_INTERVAL=60 * 60)
+    def test_refresh_policy_writes_once_per_interval(self):
+        """При refresh сессия сохраняется раз в интервал, а не всегда."""
+        client = Client()
+        client.force_login(self.user)
+        writes = []
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as queries:
+                client.get(FOLLOW_INDEX)
+            writes.append(len([
+                query for query in queries
+                if query['sql'].startswith('UPDATE')
+                and 'django_session' in query['sql']]))
+        self.assertEqual(writes, [1, 0, 0])
+
+    def test_db_sessions_by_default(self):
+        base = load_base_settings()
+        self.assertEqual(base['SESSION_ENGINE'],
+                         settings.SESSION_ENGINES['db'])
+
+    def test_cached_db_requires_shared_cache(self):
+        """cached_db на LocMem не запускается, на memcached - да."""
+        with self.assertRaises(ImproperlyConfigured):
+            load_base_settings(DJANGO_SESSION_MODE='cached_db')
+        base = load_base_settings(DJANGO_SESSION_MODE='cached_db',
+                                  DJANGO_CACHE_LOCATION='127.0.0.1:11211')
+        self.assertEqual(base['SESSION_ENGINE'],
+                         settings.SESSION_ENGINES['cached_db'])
+        self.assertEqual(base['CACHES']['sessions']['KEY_PREFIX'],
+                         'sessions')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('session_benchmark', '--mode', 'db', '--mode',
+                     'cached_db', '--requests', '1', stdout=out)
+        self.assertIn('db: ', out.getvalue())
+        self.assertIn('cached_db: ', out.getvalue())
+        self.assertFalse(User.objects.filter(
+            username='session_benchmark').exists())
@@ -0,0 +1,57 @@
+import importlib
+import os
+import subprocess
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+def load_profile(name, **environ):
+    with mock.patch.dict(os.environ, environ):
+        return importlib.reload(
+            importlib.import_module(f'yatube.settings.{name}'))
+
+
+class SettingsProfilesTest(SimpleTestCase):
+    def test_prod_profile_is_lean(self):
+        """В prod нет отладочных приложений, шаблоны кэшируются."""
+        prod = load_profile('prod', DJANGO_SECRET_KEY='secret',
+                            DJANGO_ALLOWED_HOSTS='yatube.example')
+        self.assertFalse(prod.DEBUG)
+        self.assertEqual(prod.SECRET_KEY, 'secret')
+        self.assertEqual(prod.ALLOWED_HOSTS, ['yatube.example'])
+        self.assertNotIn('debug_toolbar', prod.INSTALLED_APPS)
+        self.assertFalse([middleware for middleware in prod.MIDDLEWARE
+                          if 'debug_toolbar' in middleware])
+        loaders = prod.TEMPLATES[0]['OPTIONS']['loaders']
+        self.assertEqual(loaders[0][0],
+                         'django.template.loaders.cached.Loader')
+
+    def test_prod_requires_secret_key(self):
+        """prod не стартует с ключом из репозитория."""
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DJANGO_SECRET_KEY', None)
+            with self.assertRaises(ImproperlyConfigured):
+                load_profile('prod')
+
+    def test_dev_profile_has_debug_toolbar(self):
+        dev = load_profile('dev')
+        self.assertTrue(dev.DEBUG)
+        self.assertIn('debug_toolbar', dev.INSTALLED_APPS)
+
+    def test_startup_benchmark(self):
+        """
+        Замер холодного старта получает ответ от нового процесса, не
+        трогая рабочую базу.
+        """
+        out = StringIO()
+        with mock.patch('subprocess.run', wraps=subprocess.run) as run:
+            call_command('startup_benchmark', '--env', 'prod', '--runs', '1',
+                         stdout=out)
+        self.assertIn('prod: import', out.getvalue())
+        self.assertIn('200 OK', out.getvalue())
+        self.assertEqual(run.call_args[1]['env']['DJANGO_DB_NAME'],
+                         ':memory:')
@@ -0,0 +1,29 @@
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+
+from core.storage import InMemoryStorage
+
+
+class InMemoryStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.storage = InMemoryStorage()
+
+    @override_settings(MEDIA_ROOT='/memory/first')
+    def test_save_open_delete(self):
+        """Файл сохраняется, читается и удаляется без диска."""
+        name = self.storage.save('posts/image.bmp', ContentFile(b'data'))
+        self.assertEqual(self.storage.open(name).read(), b'data')
+        self.assertEqual(self.storage.size(name), 4)
+        self.assertEqual(self.storage.listdir('posts'), ([], ['image.bmp']))
+        self.assertEqual(self.storage.listdir(''), (['posts'], []))
+        self.assertNotEqual(
+            self.storage.save('posts/image.bmp', ContentFile(b'x')), name)
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+
+    def test_media_roots_are_isolated(self):
+        """У разных MEDIA_ROOT свои файлы."""
+        with override_settings(MEDIA_ROOT='/memory/a'):
+            self.storage.save('file.txt', ContentFile(b'a'))
+        with override_settings(MEDIA_ROOT='/memory/b'):
+            self.assertFalse(self.storage.exists('file.txt'))
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+calls = []
+
+
+@tasks.register('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@tasks.register('tests.fail')
+def fail():
+    raise RuntimeError('boom')
+
+
+@override_settings(TASK_MAX_ATTEMPTS=2, TASK_RETRY_DELAY=10)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_task_runs_once_and_is_removed(self):
+        """Выполненная задача удаляется из очереди."""
+        tasks.enqueue('tests.record', value=1)
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(tasks.run_pending(), 0)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_delayed_task_waits(self):
+        """Отложенная задача не выполняется раньше срока."""
+        tasks.enqueue('tests.record', delay=60, value=1)
+        self.assertEqual(tasks.run_pending(), 0)
+        self.assertEqual(calls, [])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        """Упавшая задача повторяется с задержкой, затем помечается."""
+        task = tasks.enqueue('tests.fail')
+        before = timezone.now()
+        tasks.run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreaterEqual(task.run_at, before + timedelta(seconds=10))
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        tasks.run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertIn('boom', task.last_error)
+
+    def test_stuck_running_task_is_reclaimed(self):
+        """Задачу упавшего воркера забирает другой после таймаута."""
+        task = tasks.enqueue('tests.record', value=2)
+        self.assertEqual(len(tasks.claim(10)), 1)
+        self.assertEqual(tasks.claim(10), [])
+        Task.objects.filter(pk=task.pk).update(
+            run_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(calls, [2])
@@ -0,0 +1,17 @@
+import time
+
+from sorl.thumbnail.base import ThumbnailBackend
+
+from core import metrics
+
+
+class InstrumentedThumbnailBackend(ThumbnailBackend):
+    """Замеряет создание миниатюр: чтение, обработку и запись."""
+
+    def _create_thumbnail(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super()._create_thumbnail(*args, **kwargs)
+        finally:
+            metrics.observe('yatube_thumbnail_duration_seconds',
+                            time.perf_counter() - start)
@@ -1,5 +1,11 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render
 
+from core import metrics, profiling
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -7,3 +13,34 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def template_profile(request):
+    """Итоги профилирования шаблонов; только для персонала."""
+    if not (settings.TEMPLATE_PROFILING and request.user.is_staff):
+        raise Http404
+    if request.method == 'POST':
+        profiling.reset()
+    return JsonResponse({'templates': [
+        {'name': name, 'calls': calls, 'total_ms': total * 1000,
+         'own_ms': own * 1000}
+        for name, calls, total, own in profiling.totals()]})
+
+
+def has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, value = header.partition(' ')
+    return bool(token) and scheme == 'Bearer' and hmac.compare_digest(
+        value.encode(), token.encode())
+
+
+def metrics_view(request):
+    """
+    Метрики процесса для Prometheus: персоналу или по токену
+    METRICS_TOKEN в заголовке Authorization.
+    """
+    if not (request.user.is_staff or has_metrics_token(request)):
+        raise Http404
+    return HttpResponse(metrics.render(),
+                        content_type='text/plain; version=0.0.4')
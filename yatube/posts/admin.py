@@ -1,29 +1,169 @@
 from django.contrib import admin
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.db.models import Q
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import Comment, Group, Post, Follow
+from core import jobs
+from core.paginators import EstimatedCountPaginator
 
+from .forms import MoveToGroupForm
+from .models import Comment, Group, Post, PostTag, Follow
 
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    list_editable = ('group',)
-    search_fields = ('text',)
-    list_filter = ('pub_date',)
+
+class ScalableAdmin(admin.ModelAdmin):
+    """
+    Список без точного COUNT(*) по всей таблице и без выпадающих
+    списков по всем строкам связанных таблиц.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Число в строке поиска ищется по индексу этого поля, а не LIKE
+    numeric_search_field = 'pk'
+    # Максимальный символ: верхняя граница диапазона для поиска префикса
+    PREFIX_END = '\U0010ffff'
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск только по индексам. LIKE '%строка%' просматривает всю
+        таблицу, а '^поле' и '=поле' стандартного поиска на SQLite -
+        тоже LIKE, который индекс не использует. Поэтому '^поле' ищется
+        диапазоном, '=поле' - точным совпадением, а поле связи - через
+        id найденных по индексу связанных строк.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return (queryset.filter(
+                **{self.numeric_search_field: int(search_term)}), False)
+        condition = Q(pk__in=[])
+        for field in self.search_fields:
+            condition |= self.search_lookup(field, search_term)
+        return queryset.filter(condition), False
+
+    def search_lookup(self, field, search_term):
+        if field.startswith('^'):
+            return Q(**{f'{field[1:]}__gte': search_term,
+                        f'{field[1:]}__lt': search_term + self.PREFIX_END})
+        relation, _, column = field.lstrip('=').partition('__')
+        if not column:
+            return Q(**{relation: search_term})
+        related = self.model._meta.get_field(relation).related_model
+        return Q(**{f'{relation}__in': related._default_manager.filter(
+            **{column: search_term})})
+
+
+class BulkJobActionsMixin:
+    """
+    Массовые действия фоновыми заданиями core.jobs вместо стандартного
+    удаления, которое загружает все объекты и удаляет их по одному.
+    """
+    delete_job = None
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def start_job(self, request, queryset, name, **params):
+        job = jobs.start(name, queryset, request.user, **params)
+        self.message_user(request, format_html(
+            'Операция запущена, прогресс - <a href="{}">здесь</a>.',
+            reverse('admin:core_bulkjob_change', args=[job.pk])))
+
+    def delete_in_background(self, request, queryset):
+        self.start_job(request, queryset, self.delete_job)
+    delete_in_background.short_description = 'Удалить выбранные (в фоне)'
+    delete_in_background.allowed_permissions = ('delete',)
+
+
+class DuplicateFilter(admin.SimpleListFilter):
+    """Записи, опубликованные с отметкой почти повтора."""
+    title = 'повтор'
+    parameter_name = 'duplicate'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Да'), ('no', 'Нет'))
+
+    def queryset(self, request, queryset):
+        if self.value() in ('yes', 'no'):
+            return queryset.filter(duplicate_of__isnull=self.value() == 'no')
+        return queryset
+
+
+class PostAdmin(BulkJobActionsMixin, ScalableAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group', 'views')
+    list_select_related = ('author', 'group')
+    # Текст ищется не LIKE, а по индексу хештегов: строка 'кот' или
+    # '#кот' находит записи с тегом #кот
+    search_fields = ('text', '=author__username')
+    list_filter = ('pub_date', DuplicateFilter)
+    autocomplete_fields = ('author', 'group')
+    raw_id_fields = ('duplicate_of',)
     empty_value_display = '-пусто-'
+    actions = ('move_to_group', 'delete_in_background', 'export_csv')
+    delete_job = 'posts.delete_posts'
+
+    def search_lookup(self, field, search_term):
+        if field == 'text':
+            return Q(pk__in=PostTag.objects.filter(
+                tag__name=search_term.lstrip('#')).values('post_id'))
+        return super().search_lookup(field, search_term)
+
+    def move_to_group(self, request, queryset):
+        form = MoveToGroupForm(request.POST if 'apply' in request.POST
+                               else None)
+        if form.is_valid():
+            group = form.cleaned_data['group']
+            self.start_job(request, queryset, 'posts.move_to_group',
+                           group_id=group.pk if group else None)
+            return None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Перенос записей в группу',
+            'opts': self.model._meta,
+            'form': form,
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action': 'move_to_group',
+        }
+        return render(request, 'admin/posts/post/move_to_group.html',
+                      context)
+    move_to_group.short_description = 'Перенести в группу (в фоне)'
+    move_to_group.allowed_permissions = ('change',)
+
+    def export_csv(self, request, queryset):
+        self.start_job(request, queryset, 'posts.export_posts')
+    export_csv.short_description = 'Выгрузить в CSV (в фоне)'
+    export_csv.allowed_permissions = ('view',)
 
 
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(ScalableAdmin):
     list_display = ('pk', 'title', 'description', 'slug')
     prepopulated_fields = {'slug': ('title',)}
+    # У названия нет индекса, группа ищется по началу адреса
+    search_fields = ('^slug',)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BulkJobActionsMixin, ScalableAdmin):
     list_display = ('post', 'text', 'author', 'created')
-    search_fields = ('text', 'author', 'post')
-    list_filter = ('created', 'author')
+    list_select_related = ('post', 'author')
+    search_fields = ('=author__username',)
+    numeric_search_field = 'post_id'
+    list_filter = ('created',)
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    actions = ('delete_in_background',)
+    delete_job = 'posts.delete_comments'
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(ScalableAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('=user__username', '=author__username')
+    autocomplete_fields = ('user', 'author')
 
 
 admin.site.register(Post, PostAdmin)
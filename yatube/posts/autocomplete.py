@@ -0,0 +1,171 @@
+"""
+Подсказки имен пользователей и названий групп.
+
+Индекс - отсортированный список ключей (имя пользователя, полное имя,
+название группы и отдельные их слова в нижнем регистре) в памяти
+процесса; поиск по префиксу - bisect и проход вперед, без запросов к
+базе. Индекс строится в фоне при запуске воркера (yatube.wsgi), чтобы
+первый запрос подсказок не ждал чтения всех пользователей; если
+построение не успело закончиться, первое обращение его дожидается.
+Индекс меняется сигналами сохранения и удаления пользователей и групп
+и целиком перестраивается раз в AUTOCOMPLETE_REBUILD_INTERVAL секунд -
+так доходят изменения из других процессов. Перестройка идет в фоновом
+потоке, по одной за раз, а запросы тем временем обслуживает прежний
+индекс. Ключей не больше
+AUTOCOMPLETE_MAX_KEYS: лишние не добавляются.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+
+from .models import Group, User
+
+logger = logging.getLogger(__name__)
+
+USER = 'user'
+GROUP = 'group'
+# Проход по ключам префикса ограничен: у популярного префикса ключей
+# много, а нужно лишь несколько разных сущностей.
+SCAN_FACTOR = 5
+
+
+def user_entry(user):
+    full_name = user.get_full_name()
+    label = f'{full_name} (@{user.username})' if full_name else (
+        f'@{user.username}')
+    return (USER, user.pk), {
+        'type': USER, 'value': user.username, 'label': label,
+        'url': reverse('posts:profile', args=[user.username]),
+    }, (user.username, full_name)
+
+
+def group_entry(group):
+    return (GROUP, group.pk), {
+        'type': GROUP, 'value': group.title, 'label': group.title,
+        'url': group.get_absolute_url(),
+    }, (group.title,)
+
+
+def terms(names):
+    found = set()
+    for name in names:
+        name = name.lower().strip()
+        if name:
+            found.add(name)
+            found.update(name.split())
+    return found
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Держится все время построения: второй раз не начинаем.
+        self._build_lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._terms = {}
+        self._built = None
+
+    def build(self):
+        keys = []
+        entries = {}
+        term_map = {}
+        limit = settings.AUTOCOMPLETE_MAX_KEYS
+        sources = (
+            (group_entry, Group.objects.only('pk', 'slug', 'title')),
+            (user_entry, User.objects.filter(is_active=True)
+             .only('pk', 'username', 'first_name', 'last_name')
+             .order_by('-last_login')),
+        )
+        for make_entry, queryset in sources:
+            for obj in queryset.iterator():
+                key, entry, names = make_entry(obj)
+                found = terms(names)
+                if len(keys) + len(found) > limit:
+                    logger.warning('Индекс подсказок заполнен: %s ключей',
+                                   len(keys))
+                    break
+                entries[key] = entry
+                term_map[key] = found
+                keys.extend((term, key) for term in found)
+        keys.sort()
+        with self._lock:
+            self._keys, self._entries, self._terms = keys, entries, term_map
+            self._built = time.monotonic()
+
+    def _ensure_built(self):
+        if self._built is None:
+            # Первое построение ждут все: отвечать пока нечем.
+            with self._build_lock:
+                if self._built is None:
+                    self.build()
+        elif (time.monotonic() - self._built
+                >= settings.AUTOCOMPLETE_REBUILD_INTERVAL):
+            self.warm()
+
+    def warm(self):
+        """Строит индекс в фоновом потоке, если он уже не строится."""
+        if self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        except Exception:
+            logger.exception('Индекс подсказок не перестроен')
+        finally:
+            connection.close()
+            self._build_lock.release()
+
+    def update(self, key, entry, names):
+        self.remove(key)
+        found = terms(names)
+        with self._lock:
+            if self._built is None:
+                return
+            if len(self._keys) + len(found) > settings.AUTOCOMPLETE_MAX_KEYS:
+                return
+            self._entries[key] = entry
+            self._terms[key] = found
+            for term in found:
+                insort(self._keys, (term, key))
+
+    def remove(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            for term in self._terms.pop(key, ()):
+                index = bisect_left(self._keys, (term, key))
+                if (index < len(self._keys)
+                        and self._keys[index] == (term, key)):
+                    del self._keys[index]
+
+    def lookup(self, prefix, kind=None, limit=None):
+        """Подсказки для префикса: словари type, value, label, url."""
+        prefix = prefix.lower().strip()
+        if not prefix:
+            return []
+        self._ensure_built()
+        limit = limit or settings.AUTOCOMPLETE_LIMIT
+        found = {}
+        with self._lock:
+            index = bisect_left(self._keys, (prefix,))
+            stop = min(len(self._keys), index + limit * SCAN_FACTOR)
+            for term, key in self._keys[index:stop]:
+                if not term.startswith(prefix) or len(found) == limit:
+                    break
+                if kind is None or key[0] == kind:
+                    found.setdefault(key, self._entries[key])
+        return list(found.values())
+
+    def reset(self):
+        with self._lock:
+            self._keys, self._entries, self._terms = [], {}, {}
+            self._built = None
+
+
+index = PrefixIndex()
@@ -0,0 +1,79 @@
+"""
+Буферизованные счетчики просмотров записей.
+
+UPDATE на каждый просмотр упирался бы в блокировку записи SQLite,
+поэтому просмотры копятся в памяти процесса и раз в
+VIEW_COUNTER_FLUSH_INTERVAL секунд записываются в базу одним
+UPDATE ... CASE на пачку записей.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from . import trending
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 200
+
+
+class ViewCounter:
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, post_id):
+        """Учитывает просмотр и сбрасывает буфер, если подошел срок."""
+        with self._lock:
+            self._pending[post_id] += 1
+            due = (time.monotonic() - self._last_flush
+                   >= settings.VIEW_COUNTER_FLUSH_INTERVAL)
+        if due:
+            self.flush()
+
+    def pending(self, post_id):
+        """Просмотры записи, еще не записанные в базу."""
+        return self._pending.get(post_id, 0)
+
+    def flush(self):
+        """
+        Записывает накопленные просмотры в базу.
+
+        Если запись не удалась, просмотры возвращаются в буфер и уйдут
+        со следующим сбросом.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        items = list(pending.items())
+        try:
+            with transaction.atomic():
+                for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                    self._write(items[start:start + FLUSH_BATCH_SIZE])
+        except DatabaseError:
+            logger.exception('Не удалось записать просмотры записей')
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        trending.record_views(pending)
+        return len(items)
+
+    def _write(self, batch):
+        Post.objects.filter(pk__in=[post_id for post_id, _ in batch]).update(
+            views=F('views') + Case(
+                *[When(pk=post_id, then=Value(delta))
+                  for post_id, delta in batch],
+                default=Value(0),
+                output_field=IntegerField()))
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,113 @@
+"""
+Поиск повторов и почти повторов записей.
+
+Текст нормализуется (регистр, пунктуация, пробелы) и режется на
+шинглы - по DEDUP_SHINGLE_SIZE слов подряд. По шинглам считается
+MinHash-подпись из BANDS * ROWS значений, подпись делится на BANDS
+полос, и каждая полоса хешируется в корзину FingerprintBand. Тексты со
+сходством Жаккара s попадают хотя бы в одну общую корзину с
+вероятностью 1 - (1 - s^ROWS)^BANDS: при s = 0.8 это больше 0.99, при
+s = 0.3 - около 0.12. Поэтому кандидатов ищет один запрос по индексу
+корзин, а не просмотр всех записей; у MAX_CANDIDATES записей с
+наибольшим числом общих корзин сходство проверяется точно, по
+множествам шинглов.
+
+Короткие тексты (меньше DEDUP_MIN_WORDS слов) не проверяются:
+«Привет!» у разных авторов - не спам.
+"""
+import random
+import re
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import FingerprintBand, Post
+
+BANDS = 16
+ROWS = 4
+MAX_CANDIDATES = 50
+
+WORD = re.compile(r'\w+')
+PRIME = (1 << 61) - 1
+MASK = (1 << 32) - 1
+_random = random.Random(20260101)
+PERMUTATIONS = [(_random.randrange(1, PRIME), _random.randrange(PRIME))
+                for _ in range(BANDS * ROWS)]
+
+
+def _hash(data):
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little',
+                          signed=True)
+
+
+def shingles(text):
+    """Множество шинглов текста или None, если текст слишком короткий."""
+    words = WORD.findall(text.lower())
+    if len(words) < settings.DEDUP_MIN_WORDS:
+        return None
+    size = settings.DEDUP_SHINGLE_SIZE
+    return {' '.join(words[start:start + size])
+            for start in range(len(words) - size + 1)}
+
+
+def signature(shingle_set):
+    hashes = [_hash(shingle.encode()) & MASK for shingle in shingle_set]
+    return [min((a * value + b) % PRIME for value in hashes) & MASK
+            for a, b in PERMUTATIONS]
+
+
+def buckets(shingle_set):
+    """Корзины LSH: по одной на полосу подписи."""
+    values = signature(shingle_set)
+    return [_hash(bytes([band]) + b''.join(
+        value.to_bytes(4, 'little')
+        for value in values[band * ROWS:(band + 1) * ROWS]))
+        for band in range(BANDS)]
+
+
+def similarity(first, second):
+    return len(first & second) / len(first | second)
+
+
+def find_duplicate(text, exclude=None):
+    """
+    Самая похожая запись со сходством не ниже DEDUP_THRESHOLD или None.
+    """
+    shingle_set = shingles(text)
+    if shingle_set is None:
+        return None
+    candidates = FingerprintBand.objects.filter(
+        bucket__in=buckets(shingle_set))
+    if exclude is not None:
+        candidates = candidates.exclude(post_id=exclude)
+    # Чем больше общих корзин, тем вероятнее высокое сходство.
+    candidates = (candidates.values('post_id')
+                  .annotate(shared=Count('id'))
+                  .order_by('-shared', '-post_id')
+                  .values_list('post_id', flat=True))
+    best, best_score = None, settings.DEDUP_THRESHOLD
+    for post in Post.objects.filter(
+            pk__in=list(candidates[:MAX_CANDIDATES])).only('pk', 'text'):
+        other = shingles(post.text)
+        score = similarity(shingle_set, other) if other else 0
+        if score >= best_score:
+            best, best_score = post, score
+    return best
+
+
+def fingerprint(posts):
+    """Пересчитывает корзины записей posts (нужны pk и text)."""
+    posts = list(posts)
+    bands = []
+    for post in posts:
+        shingle_set = shingles(post.text)
+        if shingle_set is not None:
+            bands.extend(FingerprintBand(post_id=post.pk, bucket=bucket)
+                         for bucket in set(buckets(shingle_set)))
+    with transaction.atomic():
+        FingerprintBand.objects.filter(
+            post_id__in=[post.pk for post in posts]).delete()
+        FingerprintBand.objects.bulk_create(bands)
+    return len(bands)
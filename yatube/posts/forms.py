@@ -1,6 +1,8 @@
 from django import forms
+from django.conf import settings
 
-from .models import Post, Comment
+from . import dedup
+from .models import Group, Post, Comment
 
 
 class PostForm(forms.ModelForm):
@@ -14,8 +16,30 @@ class PostForm(forms.ModelForm):
             'group': 'Группа, к которой будет относится пост',
         }
 
+    def clean_text(self):
+        """
+        Новый или измененный текст сверяется с опубликованными (кроме
+        самой записи): почти повтор отклоняется или запоминается в
+        duplicate_of (DEDUP_ACTION).
+        """
+        text = self.cleaned_data['text']
+        self.duplicate_of = self.instance.duplicate_of
+        if self.instance.pk is None or text != self.instance.text:
+            self.duplicate_of = dedup.find_duplicate(
+                text, exclude=self.instance.pk)
+            if self.duplicate_of and settings.DEDUP_ACTION == 'block':
+                raise forms.ValidationError(
+                    'Такая запись уже опубликована')
+        return text
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class MoveToGroupForm(forms.Form):
+    """Группа для массового переноса записей в админке."""
+    group = forms.ModelChoiceField(Group.objects.all(), required=False,
+                                   label='Группа', empty_label='Без группы')
@@ -0,0 +1,107 @@
+"""
+Сводки групп для каталога: число записей, авторов и время последней
+записи.
+
+Сохранение и удаление записи меняют сводку своей группы несколькими
+короткими запросами; авторы - число строк GroupAuthor группы: сводка
+меняется на единицу, только когда строка автора создается с первой
+его записью в группе или удаляется с последней. Удаление пользователя
+убирает его строки раньше каскада записей (author_removed).
+Операции без сигналов (update() в массовых заданиях) пересчитывают
+затронутые группы целиком через refresh.
+"""
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, Max, Value
+from django.db.models.functions import Greatest
+
+from .models import Group, GroupAuthor, GroupStats, Post
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def ensure(group_id):
+    GroupStats.objects.get_or_create(group_id=group_id,
+                                     defaults={'latest_post': EPOCH})
+
+
+def post_added(group_id, author_id, pub_date):
+    with transaction.atomic():
+        ensure(group_id)
+        new_author = not GroupAuthor.objects.filter(
+            group_id=group_id, author_id=author_id).update(
+                posts_count=F('posts_count') + 1)
+        if new_author:
+            GroupAuthor.objects.create(group_id=group_id,
+                                       author_id=author_id, posts_count=1)
+        GroupStats.objects.filter(group_id=group_id).update(
+            posts_count=F('posts_count') + 1,
+            authors_count=F('authors_count') + int(new_author),
+            latest_post=Greatest(
+                'latest_post',
+                Value(pub_date, output_field=DateTimeField())))
+
+
+def post_removed(group_id, author_id, pub_date):
+    with transaction.atomic():
+        authors = GroupAuthor.objects.filter(group_id=group_id,
+                                             author_id=author_id)
+        authors.update(posts_count=F('posts_count') - 1)
+        gone, _ = authors.filter(posts_count=0).delete()
+        stats = GroupStats.objects.filter(group_id=group_id)
+        stats.update(posts_count=F('posts_count') - 1,
+                     authors_count=F('authors_count') - gone)
+        # Удалена последняя запись группы: ищем предыдущую по индексу
+        # (group, pub_date, id).
+        if stats.filter(latest_post__lte=pub_date).exists():
+            latest = (Post.objects.filter(group_id=group_id)
+                      .order_by('-pub_date')
+                      .values_list('pub_date', flat=True).first())
+            stats.update(latest_post=latest or EPOCH)
+
+
+def author_removed(author_id):
+    """
+    Убирает удаляемого пользователя из авторов его групп. Каскад
+    удалил бы строки GroupAuthor раньше записей, и post_removed уже не
+    узнал бы, что автор из группы ушел.
+    """
+    with transaction.atomic():
+        rows = GroupAuthor.objects.filter(author_id=author_id)
+        GroupStats.objects.filter(
+            group_id__in=rows.values('group_id')).update(
+                authors_count=F('authors_count') - 1)
+        rows.delete()
+
+
+def refresh(group_ids):
+    """Пересчитывает сводки групп group_ids по таблице записей."""
+    group_ids = set(group_ids)
+    group_ids.discard(None)
+    if not group_ids:
+        return
+    with transaction.atomic():
+        GroupAuthor.objects.filter(group_id__in=group_ids).delete()
+        GroupAuthor.objects.bulk_create(
+            GroupAuthor(group_id=group_id, author_id=author_id,
+                        posts_count=count)
+            for group_id, author_id, count in
+            Post.objects.filter(group_id__in=group_ids)
+            .values_list('group_id', 'author_id')
+            .annotate(count=Count('pk')).order_by())
+        totals = {
+            row['group_id']: row for row in
+            Post.objects.filter(group_id__in=group_ids).values('group_id')
+            .annotate(posts=Count('pk'),
+                      authors=Count('author', distinct=True),
+                      latest=Max('pub_date')).order_by()}
+        empty = {'posts': 0, 'authors': 0, 'latest': EPOCH}
+        GroupStats.objects.filter(group_id__in=group_ids).delete()
+        GroupStats.objects.bulk_create(
+            GroupStats(group_id=group_id,
+                       posts_count=totals.get(group_id, empty)['posts'],
+                       authors_count=totals.get(group_id, empty)['authors'],
+                       latest_post=totals.get(group_id, empty)['latest'])
+            for group_id in Group.objects.filter(pk__in=group_ids)
+            .values_list('pk', flat=True))
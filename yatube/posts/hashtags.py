@@ -0,0 +1,53 @@
+"""
+Хештеги записей.
+
+Теги разбираются из текста при сохранении записи и хранятся в Tag и
+PostTag; счетчик Tag.posts_count меняется на разницу старого и нового
+набора, без пересчета по всей таблице.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import PostTag, Tag, extract_tags
+
+
+def sync(post):
+    """Приводит теги записи в соответствие с ее текстом."""
+    names = extract_tags(post.text)
+    with transaction.atomic():
+        current = dict(PostTag.objects.filter(post=post)
+                       .values_list('tag__name', 'tag_id'))
+        removed = [tag_id for name, tag_id in current.items()
+                   if name not in names]
+        if removed:
+            PostTag.objects.filter(post=post, tag_id__in=removed).delete()
+            Tag.objects.filter(pk__in=removed).update(
+                posts_count=F('posts_count') - 1)
+        added = names - current.keys()
+        if added:
+            Tag.objects.bulk_create([Tag(name=name) for name in added],
+                                    ignore_conflicts=True)
+            tag_ids = list(Tag.objects.filter(name__in=added)
+                           .values_list('pk', flat=True))
+            PostTag.objects.bulk_create(
+                PostTag(tag_id=tag_id, post=post, pub_date=post.pub_date)
+                for tag_id in tag_ids)
+            Tag.objects.filter(pk__in=tag_ids).update(
+                posts_count=F('posts_count') + 1)
+
+
+def forget(post_ids):
+    """Уменьшает счетчики тегов удаляемых записей."""
+    counts = Counter(PostTag.objects.filter(post_id__in=post_ids)
+                     .values_list('tag_id', flat=True))
+    for tag_id, count in counts.items():
+        Tag.objects.filter(pk=tag_id).update(
+            posts_count=F('posts_count') - count)
+
+
+def leaders(limit):
+    """Самые популярные теги: проход по индексу posts_count."""
+    return list(Tag.objects.filter(posts_count__gt=0)
+                .order_by('-posts_count', '-pk')[:limit])
@@ -0,0 +1,199 @@
+"""
+Лента уведомлений пользователя.
+
+Строка на каждое уведомление каждого получателя быстро раздула бы
+таблицу, поэтому уведомления пользователя нумеруются подряд и
+хранятся отрезками по SEGMENT_SIZE штук: записи упакованы в bytes по
+ENTRY.size байт, прочитанные отмечены битовой картой отрезка. В Inbox
+лежат номер следующего уведомления (total), граница read_through, до
+которой прочитано все, и готовый счетчик unread для шапки сайта.
+«Прочитать все» - это сдвиг read_through, отрезки при этом не
+переписываются; открытое уведомление отмечается битом (mark_read).
+
+Счетчик для шапки кэшируется на INBOX_UNREAD_CACHE_TIMEOUT: на кэше
+процесса другие процессы увидят новое значение не позже этого срока.
+"""
+import struct
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import Comment, Inbox, InboxSegment, Post, User
+
+SEGMENT_SIZE = 128
+ENTRY = struct.Struct('<BIII')
+UNREAD_CACHE_KEY = 'inbox:unread:{}'
+
+NEW_POST = 1
+NEW_COMMENT = 2
+NEW_FOLLOWER = 3
+MENTION_IN_POST = 4
+MENTION_IN_COMMENT = 5
+POST_KINDS = (NEW_POST, MENTION_IN_POST)
+COMMENT_KINDS = (NEW_COMMENT, MENTION_IN_COMMENT)
+
+Notification = namedtuple(
+    'Notification', 'number kind actor post comment created read')
+
+
+def _cache_unread(inboxes):
+    cache.set_many({UNREAD_CACHE_KEY.format(inbox.user_id): inbox.unread
+                    for inbox in inboxes},
+                   settings.INBOX_UNREAD_CACHE_TIMEOUT)
+
+
+def deliver(user_ids, kind, object_id, actor_id, created=None):
+    """
+    Добавляет уведомление каждому из user_ids.
+
+    Пачка получателей записывается фиксированным числом запросов:
+    заголовки и последние отрезки читаются и сохраняются разом.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return
+    entry = ENTRY.pack(kind, object_id, actor_id,
+                       int(created or time.time()))
+    with transaction.atomic():
+        inboxes = Inbox.objects.select_for_update().in_bulk(user_ids)
+        missing = [Inbox(user_id=user_id) for user_id in user_ids
+                   if user_id not in inboxes]
+        Inbox.objects.bulk_create(missing)
+        inboxes.update((inbox.user_id, inbox) for inbox in missing)
+        segments = {
+            (segment.user_id, segment.number): segment
+            for segment in InboxSegment.objects.filter(
+                user_id__in=user_ids,
+                number__in={inbox.total // SEGMENT_SIZE
+                            for inbox in inboxes.values()})}
+        created_segments = []
+        changed_segments = []
+        for inbox in inboxes.values():
+            number = inbox.total // SEGMENT_SIZE
+            segment = segments.get((inbox.user_id, number))
+            if segment is None:
+                segment = InboxSegment(user_id=inbox.user_id, number=number,
+                                       entries=b'',
+                                       read=bytes(SEGMENT_SIZE // 8))
+                created_segments.append(segment)
+            else:
+                changed_segments.append(segment)
+            segment.entries = bytes(segment.entries) + entry
+            inbox.total += 1
+            inbox.unread += 1
+        InboxSegment.objects.bulk_create(created_segments)
+        InboxSegment.objects.bulk_update(changed_segments, ['entries'])
+        Inbox.objects.bulk_update(inboxes.values(), ['total', 'unread'])
+    _cache_unread(inboxes.values())
+
+
+def unread_count(user_id):
+    """Число непрочитанных: из кэша или одной строкой Inbox."""
+    key = UNREAD_CACHE_KEY.format(user_id)
+    unread = cache.get(key)
+    if unread is None:
+        unread = (Inbox.objects.filter(pk=user_id)
+                  .values_list('unread', flat=True).first() or 0)
+        cache.set(key, unread, settings.INBOX_UNREAD_CACHE_TIMEOUT)
+    return unread
+
+
+def mark_all_read(user_id):
+    Inbox.objects.filter(pk=user_id).update(read_through=F('total'),
+                                            unread=0)
+    cache.set(UNREAD_CACHE_KEY.format(user_id), 0,
+              settings.INBOX_UNREAD_CACHE_TIMEOUT)
+
+
+def mark_read(user_id, number):
+    """Отмечает прочитанным одно уведомление."""
+    with transaction.atomic():
+        inbox = Inbox.objects.select_for_update().filter(pk=user_id).first()
+        if inbox is None or not inbox.read_through <= number < inbox.total:
+            return
+        segment = InboxSegment.objects.select_for_update().get(
+            user_id=user_id, number=number // SEGMENT_SIZE)
+        read = bytearray(segment.read)
+        byte, bit = divmod(number % SEGMENT_SIZE, 8)
+        if read[byte] & 1 << bit:
+            return
+        read[byte] |= 1 << bit
+        segment.read = bytes(read)
+        segment.save(update_fields=['read'])
+        inbox.unread -= 1
+        inbox.save(update_fields=['unread'])
+    _cache_unread([inbox])
+
+
+def get(user_id, number):
+    """
+    Уведомление с номером number или None - одна строка отрезка;
+    read здесь только по битовой карте, без границы read_through.
+    """
+    segment = InboxSegment.objects.filter(
+        user_id=user_id, number=number // SEGMENT_SIZE).first()
+    offset = number % SEGMENT_SIZE * ENTRY.size
+    if segment is None or offset + ENTRY.size > len(segment.entries):
+        return None
+    byte, bit = divmod(number % SEGMENT_SIZE, 8)
+    is_read = bool(segment.read[byte] & 1 << bit)
+    fields = ENTRY.unpack_from(bytes(segment.entries), offset)
+    return _resolve([(number, is_read) + fields])[0]
+
+
+def latest(user_id, limit):
+    """Последние limit уведомлений, от новых к старым."""
+    inbox = Inbox.objects.filter(pk=user_id).first()
+    if inbox is None or not inbox.total:
+        return []
+    first = max(inbox.total - limit, 0)
+    segments = InboxSegment.objects.filter(
+        user_id=user_id,
+        number__range=(first // SEGMENT_SIZE,
+                       (inbox.total - 1) // SEGMENT_SIZE))
+    raw = []
+    for segment in segments:
+        entries = bytes(segment.entries)
+        read = bytes(segment.read)
+        for index, fields in enumerate(ENTRY.iter_unpack(entries)):
+            number = segment.number * SEGMENT_SIZE + index
+            if number < first:
+                continue
+            byte, bit = divmod(index, 8)
+            is_read = (number < inbox.read_through
+                       or bool(read[byte] & 1 << bit))
+            raw.append((number, is_read) + fields)
+    raw.sort(reverse=True)
+    return _resolve(raw)
+
+
+def _resolve(raw):
+    """Подставляет объекты вместо id: по одному запросу на модель."""
+    post_ids = set()
+    comment_ids = set()
+    actor_ids = set()
+    for _, _, kind, object_id, actor_id, _ in raw:
+        if kind in POST_KINDS:
+            post_ids.add(object_id)
+        elif kind in COMMENT_KINDS:
+            comment_ids.add(object_id)
+        actor_ids.add(actor_id)
+    posts = Post.objects.in_bulk(post_ids)
+    comments = Comment.objects.select_related('post').in_bulk(comment_ids)
+    actors = User.objects.in_bulk(actor_ids)
+    notifications = []
+    for number, is_read, kind, object_id, actor_id, created in raw:
+        comment = (comments.get(object_id) if kind in COMMENT_KINDS
+                   else None)
+        post = comment.post if comment else None
+        if kind in POST_KINDS:
+            post = posts.get(object_id)
+        notifications.append(Notification(
+            number, kind, actors.get(actor_id), post, comment,
+            datetime.fromtimestamp(created, tz=timezone.utc), is_read))
+    return notifications
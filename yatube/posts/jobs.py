@@ -0,0 +1,72 @@
+"""
+Массовые операции над записями и комментариями для админки.
+
+Каждая операция получает id одной порции и работает запросами по этим
+id, не загружая модели целиком и не вызывая сигналов (см. core.jobs).
+"""
+from django.urls import reverse
+
+from core import jobs
+
+from . import group_stats, hashtags, trending
+from .models import (Comment, FingerprintBand, Group, Mention, Post,
+                     PostTag)
+from .signals import refresh_prerendered
+
+EXPORT_FIELDS = ('id', 'pub_date', 'author__username', 'group__slug',
+                 'views', 'text')
+
+
+def refresh_groups(group_ids):
+    """
+    Сводки и выгруженные страницы групп после операции без сигналов
+    - по одному разу на порцию.
+    """
+    group_stats.refresh(group_ids)
+    refresh_prerendered(
+        [reverse('posts:index')]
+        + [group.get_absolute_url()
+           for group in Group.objects.filter(pk__in=group_ids)])
+
+
+@jobs.register('posts.move_to_group')
+def move_to_group(job, ids, group_id):
+    posts = Post.objects.filter(pk__in=ids)
+    group_ids = set(posts.values_list('group_id', flat=True).distinct())
+    posts.update(group_id=group_id)
+    group_ids.add(group_id)
+    refresh_groups(group_ids)
+
+
+@jobs.register('posts.delete_comments')
+def delete_comments(job, ids):
+    # У комментариев нет обработчиков удаления, а зависимые упоминания
+    # удаляются первыми, поэтому сами комментарии - один DELETE без
+    # загрузки объектов, который сборщик каскада сделал бы с SELECT.
+    Mention.objects.filter(comment_id__in=ids).delete()
+    jobs.delete_rows(Comment, 'id', ids)
+
+
+@jobs.register('posts.delete_posts')
+def delete_posts(job, ids):
+    # Вместо сборщика каскада с обработчиками на каждую запись -
+    # запросы по набору: зависимые строки, счетчики тегов, рейтинг и
+    # сводки групп, затем сами записи одним DELETE.
+    posts = Post.objects.filter(pk__in=ids)
+    group_ids = set(posts.values_list('group_id', flat=True).distinct())
+    hashtags.forget(ids)
+    PostTag.objects.filter(post_id__in=ids).delete()
+    FingerprintBand.objects.filter(post_id__in=ids).delete()
+    Mention.objects.filter(post_id__in=ids).delete()
+    jobs.delete_rows(Comment, 'post', ids)
+    Post.objects.filter(duplicate_of__in=ids).update(duplicate_of=None)
+    jobs.delete_rows(Post, 'id', ids)
+    trending.forget(ids)
+    refresh_groups(group_ids)
+
+
+@jobs.register('posts.export_posts')
+def export_posts(job, ids):
+    jobs.append_csv(job, EXPORT_FIELDS,
+                    Post.objects.filter(pk__in=ids).order_by('pk')
+                    .values_list(*EXPORT_FIELDS).iterator())
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts import dedup
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает отпечатки всех записей для поиска почти '
+            'повторов, пачками по возрастанию id.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Записей в одной пачке.')
+
+    def handle(self, *args, **options):
+        last_pk = 0
+        posts = bands = 0
+        while True:
+            chunk = list(Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                         .only('pk', 'text')[:options['chunk_size']])
+            if not chunk:
+                break
+            bands += dedup.fingerprint(chunk)
+            posts += len(chunk)
+            last_pk = chunk[-1].pk
+            self.stdout.write(f'Записей: {posts}', ending='\r')
+        self.stdout.write(f'Записей: {posts}, корзин: {bands}')
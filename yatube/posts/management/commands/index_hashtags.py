@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import (Comment, Post, PostTag, Tag, extract_tags,
+                          render_text, resolve_mentions)
+
+
+class Command(BaseCommand):
+    help = ('Заново разбирает хештеги всех записей пачками: теги, их '
+            'счетчики и ссылки в HTML текста записей и комментариев.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Записей в одной пачке.')
+
+    def chunks(self, queryset, size):
+        """Пачки объектов по возрастанию pk - проход по первичному ключу."""
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk).order_by('pk')
+                         [:size])
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1].pk
+
+    def handle(self, *args, **options):
+        posts = 0
+        for chunk in self.chunks(Post.objects.only('pk', 'text', 'pub_date'),
+                                 options['chunk_size']):
+            with transaction.atomic():
+                self.index(chunk)
+            posts += len(chunk)
+        comments = 0
+        for chunk in self.chunks(Comment.objects.only('pk', 'text'),
+                                 options['chunk_size']):
+            self.render(Comment, chunk)
+            comments += len(chunk)
+        # Счетчики пересчитываются один раз, после всех пачек.
+        Tag.objects.update(posts_count=Coalesce(Subquery(
+            PostTag.objects.filter(tag=OuterRef('pk'))
+            .values('tag').annotate(count=Count('pk')).values('count')[:1]),
+            0))
+        self.stdout.write(f'Записей: {posts}, комментариев: {comments}, '
+                          f'тегов: {Tag.objects.count()}')
+
+    def index(self, chunk):
+        """
+        Теги пачки заменяются в ее транзакции: остальные записи не
+        остаются без тегов, пока команда идет.
+        """
+        names = {post.pk: extract_tags(post.text) for post in chunk}
+        PostTag.objects.filter(post_id__in=names).delete()
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in set().union(*names.values())],
+            ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(
+            name__in=set().union(*names.values())).values_list('name', 'pk'))
+        PostTag.objects.bulk_create(
+            PostTag(tag_id=tag_ids[name], post_id=post.pk,
+                    pub_date=post.pub_date)
+            for post in chunk for name in names[post.pk])
+        self.render(Post, chunk)
+
+    def render(self, model, chunk):
+        """HTML текстов пачки: упомянутые ищутся одним запросом."""
+        mentioned = resolve_mentions(obj.text for obj in chunk)
+        for obj in chunk:
+            obj.text_html = render_text(obj.text, mentioned)
+        model.objects.bulk_update(chunk, ['text_html'])
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts import group_stats
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сводки всех групп для каталога по таблице '
+            'записей, пачками групп.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100,
+                            help='Групп в одной пачке.')
+
+    def handle(self, *args, **options):
+        group_ids = list(Group.objects.order_by('pk')
+                         .values_list('pk', flat=True))
+        size = options['chunk_size']
+        for start in range(0, len(group_ids), size):
+            group_stats.refresh(group_ids[start:start + size])
+        self.stdout.write(f'Групп: {len(group_ids)}')
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Post
+
+# Событиям старше этого числа периодов полураспада в рейтинге не место.
+HALF_LIVES_TO_KEEP = 10
+
+
+class Command(BaseCommand):
+    help = ('Пересобирает рейтинг популярных записей по комментариям '
+            'и просмотрам, например после смены весов событий.')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(
+            seconds=settings.TRENDING_HALF_LIFE * HALF_LIVES_TO_KEEP)
+        comment_weight = settings.TRENDING_WEIGHTS['comment']
+        view_weight = settings.TRENDING_WEIGHTS['view']
+        comments = (
+            (post_id, comment_weight, created.timestamp())
+            for post_id, created in Comment.objects.filter(
+                created__gte=since).values_list('post_id', 'created')
+            .iterator())
+        # Время просмотров не хранится, считаем их пришедшими
+        # в момент публикации.
+        views = (
+            (post_id, views * view_weight, pub_date.timestamp())
+            for post_id, views, pub_date in Post.objects.filter(
+                pub_date__gte=since, views__gt=0)
+            .values_list('pk', 'views', 'pub_date').iterator())
+        count = trending.rebuild(
+            event for events in (comments, views) for event in events)
+        self.stdout.write(f'В рейтинге записей: {count}')
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import FollowGraph, recompute_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов для всех пользователей.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        graph = FollowGraph.from_db()
+        loaded = time.perf_counter()
+        users = recompute_all(graph)
+        finished = time.perf_counter()
+        self.stdout.write(
+            f'Ребер: {len(graph.out_edges)}, пользователей: {users}. '
+            f'Загрузка графа: {loaded - started:.2f} с, '
+            f'расчет и запись: {finished - loaded:.2f} с')
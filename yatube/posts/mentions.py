@@ -0,0 +1,39 @@
+"""
+Упоминания @username в записях и комментариях.
+
+Имена разбираются и находятся одним запросом при сохранении текста
+(RenderedTextMixin), здесь по ним обновляются строки Mention: новые
+пишутся одним bulk_create, и новым упомянутым уходит одно пакетное
+уведомление (inbox.deliver). Поэтому число запросов не растет с числом
+упоминаний в тексте.
+"""
+from django.db import transaction
+
+from . import inbox
+from .models import Comment, Mention
+
+
+def sync(obj):
+    """Обновляет упоминания сохраненной записи или комментария."""
+    if obj.mentioned is None:
+        return
+    is_comment = isinstance(obj, Comment)
+    post_id = obj.post_id if is_comment else obj.pk
+    user_ids = set(obj.mentioned.values())
+    user_ids.discard(obj.author_id)
+    with transaction.atomic():
+        mentions = Mention.objects.filter(
+            post_id=post_id, comment_id=obj.pk if is_comment else None)
+        current = set(mentions.values_list('user_id', flat=True))
+        if current - user_ids:
+            mentions.filter(user_id__in=current - user_ids).delete()
+        added = user_ids - current
+        Mention.objects.bulk_create(
+            Mention(user_id=user_id, post_id=post_id,
+                    comment_id=obj.pk if is_comment else None)
+            for user_id in added)
+    if added:
+        inbox.deliver(
+            sorted(added),
+            inbox.MENTION_IN_COMMENT if is_comment else inbox.MENTION_IN_POST,
+            obj.pk, obj.author_id)
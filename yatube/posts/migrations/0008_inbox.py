@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0007_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Inbox',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего уведомлений')),
+                ('read_through', models.PositiveIntegerField(default=0, verbose_name='Прочитано до')),
+                ('unread', models.PositiveIntegerField(default=0, verbose_name='Непрочитанных')),
+            ],
+            options={
+                'verbose_name': 'Уведомления',
+                'verbose_name_plural': 'Уведомления',
+            },
+        ),
+        migrations.CreateModel(
+            name='InboxSegment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер отрезка')),
+                ('entries', models.BinaryField(default=bytes, verbose_name='Уведомления')),
+                ('read', models.BinaryField(default=bytes, verbose_name='Прочитанные')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_segments', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Отрезок уведомлений',
+                'verbose_name_plural': 'Отрезки уведомлений',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='inboxsegment',
+            constraint=models.UniqueConstraint(fields=('user', 'number'), name='unique_inbox_segment'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:11
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+
+BATCH_SIZE = 500
+
+
+def render_existing(apps, schema_editor):
+    for name in ('Post', 'Comment'):
+        model = apps.get_model('posts', name)
+        batch = []
+        for obj in model.objects.only('pk', 'text').iterator():
+            obj.text_html = str(linebreaksbr(obj.text, autoescape=True))
+            batch.append(obj)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, ['text_html'])
+                batch = []
+        model.objects.bulk_update(batch, ['text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
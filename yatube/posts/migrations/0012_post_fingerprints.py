@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_rendered_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='posts.Post', verbose_name='Повтор записи'),
+        ),
+        migrations.CreateModel(
+            name='FingerprintBand',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint_bands', to='posts.Post')),
+            ],
+            options={
+                'verbose_name': 'Корзина отпечатка',
+                'verbose_name_plural': 'Корзины отпечатков',
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:36
+
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def count_existing(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupAuthor = apps.get_model('posts', 'GroupAuthor')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupAuthor.objects.bulk_create(
+        GroupAuthor(group_id=group_id, author_id=author_id,
+                    posts_count=count)
+        for group_id, author_id, count in
+        Post.objects.exclude(group=None).values_list('group_id', 'author_id')
+        .annotate(count=Count('pk')).order_by())
+    totals = {
+        row['group_id']: row for row in
+        Post.objects.exclude(group=None).values('group_id')
+        .annotate(posts=Count('pk'), authors=Count('author', distinct=True),
+                  latest=Max('pub_date')).order_by()}
+    empty = {'posts': 0, 'authors': 0, 'latest': EPOCH}
+    GroupStats.objects.bulk_create(
+        GroupStats(group_id=group_id,
+                   posts_count=totals.get(group_id, empty)['posts'],
+                   authors_count=totals.get(group_id, empty)['authors'],
+                   latest_post=totals.get(group_id, empty)['latest'])
+        for group_id in Group.objects.values_list('pk', flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0014_mentions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupAuthor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+            ],
+            options={
+                'verbose_name': 'Автор группы',
+                'verbose_name_plural': 'Авторы групп',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+                ('authors_count', models.PositiveIntegerField(default=0, verbose_name='Авторов')),
+                ('latest_post', models.DateTimeField(verbose_name='Последняя запись')),
+            ],
+            options={
+                'verbose_name': 'Сводка группы',
+                'verbose_name_plural': 'Сводки групп',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['latest_post', 'group'], name='posts_group_latest__587a62_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['posts_count', 'group'], name='posts_group_posts_c_f5c23a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['authors_count', 'group'], name='posts_group_authors_1a24aa_idx'),
+        ),
+        migrations.AddField(
+            model_name='groupauthor',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_authors', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='groupauthor',
+            name='group',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_authors', to='posts.Group'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthor',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique_group_author'),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
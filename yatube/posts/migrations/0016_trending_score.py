@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('post_id', models.PositiveIntegerField(primary_key=True, serialize=False, verbose_name='id записи')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+            ],
+            options={
+                'verbose_name': 'Оценка популярности',
+                'verbose_name_plural': 'Оценки популярности',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingscore',
+            index=models.Index(fields=['score', 'post_id'], name='posts_trend_score_6cbdba_idx'),
+        ),
+    ]
@@ -1,13 +1,109 @@
+import re
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.db.models import CheckConstraint, F, Q
+from django.template.defaultfilters import linebreaksbr
 from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
 
 from core.models import CreatedModel
 
 User = get_user_model()
 
 
+# Хештег начинается с буквы и не продолжает слово, ссылку или
+# HTML-сущность вроде &#39;
+HASHTAG = re.compile(r'(?<![\w&#/])#([^\W\d]\w{0,49})(?!\w)')
+
+
+def extract_tags(text):
+    """Имена хештегов текста в нижнем регистре."""
+    return {name.lower() for name in HASHTAG.findall(text)}
+
+
+# Имя пользователя Django ([\w.@+-]), но без @ и без точки или дефиса
+# в конце: «спасибо, @ivan.» упоминает ivan
+MENTION = re.compile(r'(?<![\w@&/])@(\w(?:[\w.+-]{0,148}\w)?)')
+MAX_MENTIONS = 50
+
+
+def extract_mentions(text):
+    """Имена упомянутых пользователей, не больше MAX_MENTIONS."""
+    return set(list(dict.fromkeys(MENTION.findall(text)))[:MAX_MENTIONS])
+
+
+def resolve_mentions(texts):
+    """{имя: id} упомянутых в texts пользователей одним запросом."""
+    names = set().union(*map(extract_mentions, texts))
+    if not names:
+        return {}
+    return dict(User.objects.filter(username__in=names)
+                .values_list('username', 'pk'))
+
+
+# Хештеги и упоминания не пересекаются (в имени тега нет @, в имени
+# пользователя нет #), поэтому один проход находит те же совпадения,
+# что extract_tags и extract_mentions по отдельности.
+TEXT_LINK = re.compile(f'{HASHTAG.pattern}|{MENTION.pattern}')
+
+
+def render_text(text, mentioned=()):
+    """
+    HTML текста записи или комментария: экранирование, <br>, ссылки на
+    ленты хештегов и на профили mentioned - существующих упомянутых.
+
+    Ссылки ищутся в исходном тексте, как при разборе тегов и
+    упоминаний, а экранируется только текст между ними: в
+    экранированном тексте «&#тег» выглядел бы как «&amp;#тег».
+    """
+    parts = []
+    start = 0
+    for match in TEXT_LINK.finditer(text):
+        tag, username = match.groups()
+        if tag:
+            link = format_html('<a href="{}">#{}</a>',
+                               reverse('posts:tag', args=[tag.lower()]), tag)
+        elif username in mentioned:
+            link = format_html('<a href="{}">@{}</a>',
+                               reverse('posts:profile', args=[username]),
+                               username)
+        else:
+            continue
+        parts.extend((escape(text[start:match.start()]), link))
+        start = match.end()
+    parts.append(escape(text[start:]))
+    return str(linebreaksbr(mark_safe(''.join(parts)), autoescape=False))
+
+
+class RenderedTextMixin:
+    """
+    Готовый HTML текста в поле text_html.
+
+    Фильтры применяются один раз при сохранении, а не при каждой
+    отрисовке ленты. Упомянутые пользователи находятся одним запросом
+    и остаются в mentioned ({имя: id}) для записи упоминаний; если
+    текст не сохранялся, mentioned - None.
+    """
+    mentioned = None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.mentioned = resolve_mentions([self.text])
+            self.text_html = render_text(self.text, self.mentioned)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'text_html'}
+        else:
+            self.mentioned = None
+        super().save(*args, **kwargs)
+
+    @property
+    def body(self):
+        return mark_safe(self.text_html or render_text(self.text))
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=100, unique=True)
@@ -20,7 +116,7 @@ class Group(models.Model):
         return reverse('posts:group_list', kwargs={'slug': self.slug})
 
 
-class Post(CreatedModel):
+class Post(RenderedTextMixin, CreatedModel):
     text = models.TextField('Текст поста',
                             help_text='Введите текст поста')
     pub_date = models.DateTimeField('Дата публикации',
@@ -37,6 +133,17 @@ class Post(CreatedModel):
     image = models.ImageField('Картинка',
                               upload_to='posts/',
                               blank=True)
+    views = models.PositiveIntegerField('Просмотры',
+                                        default=0,
+                                        editable=False,
+                                        db_index=True)
+    text_html = models.TextField('HTML текста', default='', editable=False)
+    duplicate_of = models.ForeignKey('self',
+                                     blank=True,
+                                     null=True,
+                                     on_delete=models.SET_NULL,
+                                     related_name='duplicates',
+                                     verbose_name='Повтор записи')
 
     def __str__(self) -> str:
         return self.text[0:15]
@@ -44,6 +151,11 @@ class Post(CreatedModel):
     class Meta:
         ordering = ['-pub_date']
         default_related_name = 'posts'
+        indexes = [
+            models.Index(fields=['pub_date', 'id']),
+            models.Index(fields=['group', 'pub_date', 'id']),
+            models.Index(fields=['author', 'pub_date', 'id']),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -51,7 +163,7 @@ class Post(CreatedModel):
         return reverse('posts:post_detail', kwargs={'post_id': self.pk})
 
 
-class Comment(models.Model):
+class Comment(RenderedTextMixin, models.Model):
     post = models.ForeignKey(
         to='Post',
         on_delete=models.CASCADE,
@@ -69,6 +181,11 @@ class Comment(models.Model):
         verbose_name='Текст',
         help_text='Напишите комментарий'
     )
+    text_html = models.TextField(
+        verbose_name='HTML текста',
+        default='',
+        editable=False
+    )
     created = models.DateTimeField(
         verbose_name='Дата публикации',
         auto_now_add=True
@@ -77,6 +194,7 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [models.Index(fields=['post', 'created', 'id'])]
 
     def __str__(self):
         return self.text[:15]
@@ -105,3 +223,244 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} подписан на {self.author}'
+
+
+class Recommendation(models.Model):
+    """Автор, которого стоит почитать пользователю."""
+    user = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь',
+    )
+    author = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор',
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_recommendation')
+        ]
+
+    def __str__(self):
+        return f'{self.user} может почитать {self.author}'
+
+
+class Inbox(models.Model):
+    """
+    Заголовок ленты уведомлений пользователя.
+
+    total - номер, который получит следующее уведомление (high-water
+    mark), read_through - все уведомления с меньшими номерами прочитаны,
+    unread - готовый счетчик непрочитанных для шапки сайта.
+    """
+    user = models.OneToOneField(
+        to=User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='inbox',
+        verbose_name='Пользователь',
+    )
+    total = models.PositiveIntegerField('Всего уведомлений', default=0)
+    read_through = models.PositiveIntegerField('Прочитано до', default=0)
+    unread = models.PositiveIntegerField('Непрочитанных', default=0)
+
+    class Meta:
+        verbose_name = 'Уведомления'
+        verbose_name_plural = 'Уведомления'
+
+    def __str__(self):
+        return f'{self.user}: {self.unread} непрочитанных'
+
+
+class InboxSegment(models.Model):
+    """
+    Отрезок ленты уведомлений: упакованные записи и битовая карта
+    прочитанных (см. posts.inbox).
+    """
+    user = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='inbox_segments',
+        verbose_name='Пользователь',
+    )
+    number = models.PositiveIntegerField('Номер отрезка')
+    entries = models.BinaryField('Уведомления', default=bytes)
+    read = models.BinaryField('Прочитанные', default=bytes)
+
+    class Meta:
+        verbose_name = 'Отрезок уведомлений'
+        verbose_name_plural = 'Отрезки уведомлений'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'number'],
+                                    name='unique_inbox_segment')
+        ]
+
+    def __str__(self):
+        return f'{self.user}: отрезок {self.number}'
+
+
+class FingerprintBand(models.Model):
+    """Корзина LSH, в которую попала запись (см. posts.dedup)."""
+    post = models.ForeignKey(
+        to=Post,
+        on_delete=models.CASCADE,
+        related_name='fingerprint_bands',
+    )
+    bucket = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Корзина отпечатка'
+        verbose_name_plural = 'Корзины отпечатков'
+
+
+class Tag(models.Model):
+    """
+    Хештег. posts_count меняется вместе с привязками записей
+    (posts.hashtags), по нему строится список популярных тегов.
+    """
+    name = models.CharField('Имя', max_length=50, unique=True)
+    posts_count = models.PositiveIntegerField('Записей', default=0,
+                                              db_index=True)
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+    def get_absolute_url(self):
+        return reverse('posts:tag', args=[self.name])
+
+
+class PostTag(models.Model):
+    """
+    Хештег записи. Дата публикации повторена здесь, чтобы лента тега
+    была диапазонным проходом по индексу (tag, pub_date, id).
+    """
+    tag = models.ForeignKey(
+        to=Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+    post = models.ForeignKey(
+        to=Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'Тег записи'
+        verbose_name_plural = 'Теги записей'
+        indexes = [models.Index(fields=['tag', 'pub_date', 'id'])]
+        constraints = [
+            models.UniqueConstraint(fields=['tag', 'post'],
+                                    name='unique_post_tag')
+        ]
+
+
+class Mention(models.Model):
+    """
+    Упоминание пользователя в записи или в комментарии к ней. Лента
+    упоминаний - диапазонный проход по индексу (user, created, id).
+    """
+    user = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Упомянутый',
+    )
+    post = models.ForeignKey(
+        to=Post,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Запись',
+    )
+    comment = models.ForeignKey(
+        to=Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='mentions',
+        verbose_name='Комментарий',
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Упоминание'
+        verbose_name_plural = 'Упоминания'
+        indexes = [models.Index(fields=['user', 'created', 'id'])]
+
+
+class GroupStats(models.Model):
+    """
+    Сводка группы для каталога. Меняется вместе с записями
+    (posts.group_stats), а не считается GROUP BY на каждый запрос;
+    latest_post пустой группы - начало эпохи.
+    """
+    group = models.OneToOneField(
+        to=Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+    authors_count = models.PositiveIntegerField('Авторов', default=0)
+    latest_post = models.DateTimeField('Последняя запись')
+
+    class Meta:
+        verbose_name = 'Сводка группы'
+        verbose_name_plural = 'Сводки групп'
+        indexes = [
+            models.Index(fields=['latest_post', 'group']),
+            models.Index(fields=['posts_count', 'group']),
+            models.Index(fields=['authors_count', 'group']),
+        ]
+
+
+class GroupAuthor(models.Model):
+    """Число записей автора в группе; строки с нулем удаляются."""
+    group = models.ForeignKey(
+        to=Group,
+        on_delete=models.CASCADE,
+        related_name='group_authors',
+    )
+    author = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE,
+        related_name='group_authors',
+    )
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+
+    class Meta:
+        verbose_name = 'Автор группы'
+        verbose_name_plural = 'Авторы групп'
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'author'],
+                                    name='unique_group_author')
+        ]
+
+
+class TrendingScore(models.Model):
+    """
+    Оценка записи в рейтинге популярных (posts.trending). Ссылки на
+    запись нет: в рейтинг попадают id из событий, а удаленные записи
+    убирает trending.forget.
+    """
+    post_id = models.PositiveIntegerField('id записи', primary_key=True)
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Оценка популярности'
+        verbose_name_plural = 'Оценки популярности'
+        indexes = [models.Index(fields=['score', 'post_id'])]
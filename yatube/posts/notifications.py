@@ -0,0 +1,114 @@
+"""
+Уведомления о новых записях и комментариях: письма и лента уведомлений.
+
+Рассылка идет через очередь core.tasks в два шага: первая задача
+проходит по получателям порциями и ставит задачи на каждые
+NOTIFICATION_BATCH_SIZE человек, вторая обрабатывает свою пачку: письма
+уходят через одно соединение с почтовым сервером, записи в ленту -
+фиксированным числом запросов. Так сбой повторяет только одну пачку,
+а при сохранении записи ставится одна задача независимо от числа
+подписчиков.
+"""
+from django.conf import settings
+from django.core import mail
+
+from core import tasks
+
+from . import inbox
+from .models import Comment, Follow, Post, User
+
+ITERATION_CHUNK_SIZE = 2000
+
+
+def fan_out(names, user_ids, **payload):
+    """Ставит задачи names на каждую пачку получателей."""
+    batch = []
+    for user_id in user_ids:
+        batch.append(user_id)
+        if len(batch) == settings.NOTIFICATION_BATCH_SIZE:
+            for name in names:
+                tasks.enqueue(name, user_ids=batch, **payload)
+            batch = []
+    if batch:
+        for name in names:
+            tasks.enqueue(name, user_ids=batch, **payload)
+
+
+def send_batch(user_ids, subject, body):
+    emails = (User.objects.filter(pk__in=user_ids).exclude(email='')
+              .values_list('email', flat=True))
+    messages = [mail.EmailMessage(subject, body, to=[email])
+                for email in emails]
+    if messages:
+        with mail.get_connection() as connection:
+            connection.send_messages(messages)
+
+
+@tasks.register('posts.notify_new_post')
+def notify_new_post(post_id):
+    author_id = (Post.objects.filter(pk=post_id)
+                 .values_list('author_id', flat=True).first())
+    if author_id is None:
+        return
+    followers = (Follow.objects.filter(author_id=author_id)
+                 .values_list('user_id', flat=True)
+                 .iterator(chunk_size=ITERATION_CHUNK_SIZE))
+    fan_out(('posts.send_new_post', 'posts.inbox_new_post'), followers,
+            post_id=post_id)
+
+
+@tasks.register('posts.send_new_post')
+def send_new_post(post_id, user_ids):
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is None:
+        return
+    send_batch(
+        user_ids,
+        f'Новая запись от {post.author.username}',
+        f'{post.text[:200]}\n\nЧитать: {post.get_absolute_url()}')
+
+
+@tasks.register('posts.inbox_new_post')
+def inbox_new_post(post_id, user_ids):
+    post = (Post.objects.filter(pk=post_id)
+            .values('author_id', 'pub_date').first())
+    if post is None:
+        return
+    inbox.deliver(user_ids, inbox.NEW_POST, post_id, post['author_id'],
+                  post['pub_date'].timestamp())
+
+
+@tasks.register('posts.notify_new_comment')
+def notify_new_comment(comment_id):
+    """Сообщает автору записи и другим комментаторам о комментарии."""
+    comment = (Comment.objects.filter(pk=comment_id)
+               .values('post_id', 'post__author_id', 'author_id').first())
+    if comment is None:
+        return
+    commenters = (Comment.objects.filter(post_id=comment['post_id'])
+                  .values_list('author_id', flat=True).distinct()
+                  .iterator(chunk_size=ITERATION_CHUNK_SIZE))
+    recipients = (
+        user_id for user_id in _unique(comment['post__author_id'],
+                                       commenters)
+        if user_id != comment['author_id'])
+    fan_out(('posts.send_new_comment',), recipients, comment_id=comment_id)
+
+
+@tasks.register('posts.send_new_comment')
+def send_new_comment(comment_id, user_ids):
+    comment = (Comment.objects.select_related('author', 'post')
+               .filter(pk=comment_id).first())
+    if comment is None:
+        return
+    send_batch(
+        user_ids,
+        f'Новый комментарий от {comment.author.username}',
+        f'{comment.text}\n\nЗапись: {comment.post.get_absolute_url()}')
+
+
+def _unique(first, rest):
+    yield first
+    for user_id in rest:
+        if user_id != first:
+            yield user_id
@@ -0,0 +1,193 @@
+"""
+Рекомендации «кого почитать» по графу подписок.
+
+Граф подписок загружается в компактные массивы CSR (по одному для
+исходящих и входящих ребер), без ORM-объектов и JOIN. Кандидаты для
+пользователя u:
+
+* друзья друзей - авторы, на которых подписаны авторы u;
+* совместные подписки - авторы, на которых подписаны другие
+  подписчики авторов u.
+
+Обход каждого уровня ограничен FANOUT/COFOLLOW_FANOUT соседями, так что
+работа на пользователя не зависит от размера графа.
+"""
+import heapq
+from array import array
+from collections import defaultdict
+from itertools import accumulate
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, Recommendation
+
+FANOUT = 20
+COFOLLOW_FANOUT = 5
+FRIEND_OF_FRIEND_WEIGHT = 1.0
+COFOLLOW_WEIGHT = 0.2
+WRITE_BATCH_SIZE = 1000
+
+
+def build_csr(size, sources, targets):
+    """Смещения и соседи CSR для ребер sources[i] -> targets[i]."""
+    counts = array('l', bytes(array('l').itemsize * size))
+    for source in sources:
+        counts[source] += 1
+    offsets = array('l', [0])
+    offsets.extend(accumulate(counts))
+    neighbours = array('l', bytes(array('l').itemsize * len(sources)))
+    position = array('l', offsets[:-1])
+    for source, target in zip(sources, targets):
+        neighbours[position[source]] = target
+        position[source] += 1
+    return offsets, neighbours
+
+
+class FollowGraph:
+    def __init__(self, edges):
+        """edges - пары (id подписчика, id автора)."""
+        self.index = {}
+        self.ids = array('q')
+        sources = array('l')
+        targets = array('l')
+        index = self.index
+        for user_id, author_id in edges:
+            for node_id in (user_id, author_id):
+                if node_id not in index:
+                    index[node_id] = len(self.ids)
+                    self.ids.append(node_id)
+            sources.append(index[user_id])
+            targets.append(index[author_id])
+        size = len(self.ids)
+        self.out_offsets, self.out_edges = build_csr(size, sources, targets)
+        self.in_offsets, self.in_edges = build_csr(size, targets, sources)
+        self._contributions = {}
+
+    @classmethod
+    def from_db(cls, queryset=None):
+        queryset = Follow.objects.all() if queryset is None else queryset
+        return cls(queryset.values_list('user_id', 'author_id')
+                   .iterator(chunk_size=10000))
+
+    def following(self, node, limit):
+        start = self.out_offsets[node]
+        return self.out_edges[start:min(self.out_offsets[node + 1],
+                                        start + limit)]
+
+    def followers(self, node, limit):
+        start = self.in_offsets[node]
+        return self.in_edges[start:min(self.in_offsets[node + 1],
+                                       start + limit)]
+
+    def users(self):
+        """id пользователей, у которых есть подписки."""
+        for node, node_id in enumerate(self.ids):
+            if self.out_offsets[node + 1] > self.out_offsets[node]:
+                yield node_id
+
+    def contributions(self, author):
+        """
+        Кандидаты, которых приносит подписка на автора, с весами.
+
+        Считаются один раз на автора: у популярных авторов много
+        подписчиков, и пересчитывать их окрестность для каждого дорого.
+        """
+        found = self._contributions.get(author)
+        if found is None:
+            scores = defaultdict(float)
+            for candidate in self.following(author, FANOUT):
+                scores[candidate] += FRIEND_OF_FRIEND_WEIGHT
+            for follower in self.followers(author, COFOLLOW_FANOUT):
+                for candidate in self.following(follower, COFOLLOW_FANOUT):
+                    scores[candidate] += COFOLLOW_WEIGHT
+            found = self._contributions[author] = list(scores.items())
+        return found
+
+    def suggest(self, user_id, limit):
+        """Лучшие кандидаты для пользователя: пары (id автора, оценка)."""
+        node = self.index.get(user_id)
+        if node is None:
+            return []
+        start, end = self.out_offsets[node], self.out_offsets[node + 1]
+        followed = set(self.out_edges[start:end])
+        followed.add(node)
+        scores = defaultdict(float)
+        for author in self.out_edges[start:min(end, start + FANOUT)]:
+            for candidate, weight in self.contributions(author):
+                scores[candidate] += weight
+        best = heapq.nlargest(
+            limit,
+            ((candidate, score) for candidate, score in scores.items()
+             if candidate not in followed),
+            key=itemgetter(1))
+        return [(self.ids[candidate], score) for candidate, score in best]
+
+
+def save_recommendations(user_ids, suggestions):
+    """Заменяет сохраненные рекомендации пользователей user_ids."""
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id__in=user_ids).delete()
+        Recommendation.objects.bulk_create(
+            (Recommendation(user_id=user_id, author_id=author_id,
+                            score=score)
+             for user_id in user_ids
+             for author_id, score in suggestions.get(user_id, ())),
+            batch_size=WRITE_BATCH_SIZE)
+
+
+def recompute_all(graph=None):
+    """Пересчитывает рекомендации всех подписчиков пачками."""
+    graph = FollowGraph.from_db() if graph is None else graph
+    limit = settings.RECOMMENDATIONS_PER_USER
+    Recommendation.objects.exclude(
+        user_id__in=Follow.objects.values('user_id')).delete()
+    batch = []
+    total = 0
+    for user_id in graph.users():
+        batch.append(user_id)
+        if len(batch) == WRITE_BATCH_SIZE:
+            total += _save_batch(graph, batch, limit)
+            batch = []
+    if batch:
+        total += _save_batch(graph, batch, limit)
+    return total
+
+
+def _save_batch(graph, user_ids, limit):
+    save_recommendations(
+        user_ids,
+        {user_id: graph.suggest(user_id, limit) for user_id in user_ids})
+    return len(user_ids)
+
+
+def refresh_for(user_id):
+    """
+    Пересчитывает рекомендации одного пользователя после изменения его
+    подписок по ограниченной окрестности графа.
+    """
+    followees = list(Follow.objects.filter(user_id=user_id)
+                     .values_list('author_id', flat=True)[:FANOUT])
+    followers = list(
+        Follow.objects.filter(author_id__in=followees)
+        .exclude(user_id=user_id)
+        .values_list('user_id', flat=True)[:FANOUT * COFOLLOW_FANOUT])
+    neighbours = set(followees) | set(followers)
+    edges = [(user_id, author_id) for author_id in followees]
+    edges.extend(Follow.objects.filter(user_id__in=neighbours)
+                 .values_list('user_id', 'author_id')
+                 [:len(neighbours) * FANOUT])
+    graph = FollowGraph(edges)
+    save_recommendations(
+        [user_id],
+        {user_id: graph.suggest(user_id,
+                                settings.RECOMMENDATIONS_PER_USER)})
+
+
+def recommended_authors(user, limit=None):
+    if not user.is_authenticated:
+        return []
+    limit = limit or settings.RECOMMENDATIONS_SHOWN
+    return [recommendation.author for recommendation in
+            user.recommendations.select_related('author')[:limit]]
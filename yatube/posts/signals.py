@@ -0,0 +1,173 @@
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.urls import reverse
+
+from core import prerender, tasks
+
+from . import (autocomplete, dedup, group_stats, hashtags, inbox,
+               mentions, recommendations, trending)
+from .models import Comment, Follow, Group, Post, User
+from .utils import bump_follow_version
+
+
+def refresh_prerendered(urls):
+    """Убирает устаревшие выгруженные страницы и перерисовывает их."""
+    stale = prerender.invalidate(urls)
+    if stale:
+        transaction.on_commit(lambda: prerender.export(stale))
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, update_fields=None, **kwargs):
+    """Прежняя группа нужна выгруженным страницам и сводкам групп."""
+    instance._old_group_id = None
+    if instance.pk and (update_fields is None or 'group' in update_fields):
+        instance._old_group_id = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group_id', flat=True).first())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    if not prerender.has_pages():
+        return
+    group_ids = {instance.group_id, getattr(instance, '_old_group_id', None)}
+    group_ids.discard(None)
+    urls = [reverse('posts:index')]
+    urls.extend(group.get_absolute_url()
+                for group in Group.objects.filter(pk__in=group_ids))
+    refresh_prerendered(urls)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    refresh_prerendered([reverse('posts:index'),
+                         instance.get_absolute_url()])
+
+
+@receiver(post_delete, sender=Post)
+def forget_trending_post(sender, instance, **kwargs):
+    trending.forget([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        tasks.enqueue('posts.notify_new_post', post_id=instance.id)
+
+
+@receiver(post_save, sender=Post)
+def fingerprint_post(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields is None or 'text' in update_fields:
+        dedup.fingerprint([instance])
+
+
+@receiver(post_save, sender=Post)
+def tag_post(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields is None or 'text' in update_fields:
+        hashtags.sync(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def record_mentions(sender, instance, **kwargs):
+    mentions.sync(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def untag_post(sender, instance, **kwargs):
+    hashtags.forget([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    trending.record_event(instance.post_id, 'comment')
+    tasks.enqueue('posts.notify_new_comment', comment_id=instance.id)
+    post_author_id = instance.post.author_id
+    if post_author_id != instance.author_id:
+        inbox.deliver([post_author_id], inbox.NEW_COMMENT, instance.id,
+                      instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    """Автор узнает о подписчике, его последняя запись поднимается."""
+    if not created:
+        return
+    inbox.deliver([instance.author_id], inbox.NEW_FOLLOWER, instance.id,
+                  instance.user_id)
+    post_id = (Post.objects.filter(author_id=instance.author_id)
+               .values_list('pk', flat=True).first())
+    if post_id is not None:
+        trending.record_event(post_id, 'follow')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follows_changed(sender, instance, **kwargs):
+    bump_follow_version(instance.user_id)
+    recommendations.refresh_for(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    if instance.is_active:
+        autocomplete.index.update(*autocomplete.user_entry(instance))
+    else:
+        autocomplete.index.remove((autocomplete.USER, instance.pk))
+
+
+@receiver(pre_delete, sender=User)
+def uncount_group_author(sender, instance, **kwargs):
+    group_stats.author_removed(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    autocomplete.index.remove((autocomplete.USER, instance.pk))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    autocomplete.index.update(*autocomplete.group_entry(instance))
+    if created:
+        group_stats.ensure(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_group_post(sender, instance, created, update_fields, **kwargs):
+    if created:
+        if instance.group_id:
+            group_stats.post_added(instance.group_id, instance.author_id,
+                                   instance.pub_date)
+        return
+    if update_fields is not None and 'group' not in update_fields:
+        return
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id != instance.group_id:
+        if old_group_id:
+            group_stats.post_removed(old_group_id, instance.author_id,
+                                     instance.pub_date)
+        if instance.group_id:
+            group_stats.post_added(instance.group_id, instance.author_id,
+                                   instance.pub_date)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.group_id:
+        group_stats.post_removed(instance.group_id, instance.author_id,
+                                 instance.pub_date)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    autocomplete.index.remove((autocomplete.GROUP, instance.pk))
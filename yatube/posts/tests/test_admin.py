@@ -0,0 +1,118 @@
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, PostTag, Tag, User
+
+POST_CHANGELIST = reverse('admin:posts_post_changelist')
+COMMENT_CHANGELIST = reverse('admin:posts_comment_changelist')
+FOLLOW_CHANGELIST = reverse('admin:posts_follow_changelist')
+GROUP_CHANGELIST = reverse('admin:posts_group_changelist')
+
+
+class ScalableAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='group', slug='slug')
+        cls.posts = [
+            Post.objects.create(author=cls.user, group=cls.group,
+                                text=f'post_{number}')
+            for number in range(10)]
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        """Число запросов списка не зависит от числа строк."""
+        post = Post.objects.create(author=self.user, text='post')
+        Comment.objects.create(post=post, author=self.user, text='comment')
+        urls = (POST_CHANGELIST, COMMENT_CHANGELIST, FOLLOW_CHANGELIST)
+        # Первый запрос заполняет кэши шапки сайта.
+        self.client.get(POST_CHANGELIST)
+        before = [self.changelist_queries(url) for url in urls]
+        other = User.objects.create_user(username='other')
+        group = Group.objects.create(title='other', slug='other')
+        for number in range(5):
+            post = Post.objects.create(author=other, group=group,
+                                       text=f'more_{number}')
+            Comment.objects.create(post=post, author=other, text='comment')
+        self.assertEqual([self.changelist_queries(url) for url in urls],
+                         before)
+
+    @override_settings(ADMIN_COUNT_LIMIT=5)
+    def test_full_table_count_is_estimated(self):
+        """Для всей таблицы берется оценка СУБД, а не COUNT(*)."""
+        Post.objects.filter(pk=self.posts[0].pk).delete()
+        response = self.client.get(POST_CHANGELIST)
+        self.assertEqual(response.context['cl'].result_count,
+                         Post.objects.order_by('-pk').first().pk)
+
+    @override_settings(ADMIN_COUNT_LIMIT=5)
+    def test_filtered_count_is_bounded(self):
+        """Отфильтрованный список считается не дальше предела."""
+        response = self.client.get(POST_CHANGELIST, {'q': 'auth'})
+        self.assertEqual(response.context['cl'].result_count, 5)
+
+    def test_numeric_search_uses_primary_key(self):
+        """Число ищется как id, без LIKE по тексту."""
+        post = self.posts[3]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(POST_CHANGELIST, {'q': str(post.pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [post])
+        self.assertFalse([query for query in queries
+                          if 'LIKE' in query['sql']])
+
+    def search(self, url, term):
+        """Результаты поиска и запросы, которые сравнивали через LIKE."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'q': term})
+        return (list(response.context['cl'].result_list),
+                [query['sql'] for query in queries
+                 if 'LIKE' in query['sql']])
+
+    def test_username_search_is_exact(self):
+        comment = Comment.objects.create(post=self.posts[0],
+                                         author=self.user, text='comment')
+        self.assertEqual(self.search(COMMENT_CHANGELIST, 'auth'),
+                         ([comment], []))
+        self.assertEqual(self.search(COMMENT_CHANGELIST, 'aut'), ([], []))
+
+    def test_follow_search_matches_either_user(self):
+        follow = Follow.objects.create(user=self.admin, author=self.user)
+        self.assertEqual(self.search(FOLLOW_CHANGELIST, 'admin'),
+                         ([follow], []))
+        self.assertEqual(self.search(FOLLOW_CHANGELIST, 'auth'),
+                         ([follow], []))
+
+    def test_post_search_by_tag(self):
+        """Текст ищется по индексу тегов, а не LIKE."""
+        tag = Tag.objects.create(name='cats')
+        PostTag.objects.create(post=self.posts[2], tag=tag,
+                               pub_date=self.posts[2].pub_date)
+        self.assertEqual(self.search(POST_CHANGELIST, '#cats'),
+                         ([self.posts[2]], []))
+        self.assertEqual(self.search(POST_CHANGELIST, 'cats'),
+                         ([self.posts[2]], []))
+        self.assertEqual(self.search(POST_CHANGELIST, 'post_2'), ([], []))
+
+    def test_group_search_is_slug_prefix_range(self):
+        self.assertEqual(self.search(GROUP_CHANGELIST, 'sl'),
+                         ([self.group], []))
+        self.assertEqual(self.search(GROUP_CHANGELIST, 'lug'), ([], []))
+
+    def test_comment_changelist_has_no_author_filter(self):
+        """Фильтр по автору строился бы по всем пользователям."""
+        response = self.client.get(COMMENT_CHANGELIST)
+        self.assertNotIn('author',
+                         [spec.field.name for spec in
+                          response.context['cl'].filter_specs])
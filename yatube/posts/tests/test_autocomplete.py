@@ -0,0 +1,99 @@
+import time
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import autocomplete
+from posts.models import Group, User
+
+AUTOCOMPLETE = reverse('posts:autocomplete')
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ivan = User.objects.create_user(
+            username='ivan', first_name='Иван', last_name='Петров')
+        User.objects.create_user(username='ivanova')
+        Group.objects.create(title='Иваново', slug='ivanovo')
+
+    def setUp(self):
+        autocomplete.index.reset()
+
+    def values(self, prefix, **params):
+        response = Client().get(AUTOCOMPLETE, {'q': prefix, **params})
+        return [result['value'] for result in response.json()['results']]
+
+    def test_prefix_of_username_name_and_title(self):
+        """Префикс ищется в имени пользователя, полном имени и
+        названии группы."""
+        self.assertEqual(self.values('Ivan'), ['ivan', 'ivanova'])
+        self.assertEqual(self.values('пет'), ['ivan'])
+        self.assertEqual(self.values('иван'), ['ivan', 'Иваново'])
+        self.assertEqual(self.values('иван', type='group'), ['Иваново'])
+
+    def test_warm_builds_in_background(self):
+        with mock.patch.object(autocomplete.index, 'build') as build:
+            autocomplete.index.warm()
+            # Блокировку построения фоновый поток отпускает по окончании.
+            self.assertTrue(
+                autocomplete.index._build_lock.acquire(timeout=5))
+            autocomplete.index._build_lock.release()
+        build.assert_called_once_with()
+
+    def test_lookup_without_queries(self):
+        """Построенный индекс отвечает без запросов к базе."""
+        autocomplete.index.build()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.values('ivan', type='user'),
+                             ['ivan', 'ivanova'])
+
+    def test_signals_update_index(self):
+        """Новые, измененные и удаленные записи сразу видны в подсказках."""
+        autocomplete.index.build()
+        User.objects.create_user(username='ivashka')
+        self.assertIn('ivashka', self.values('iva'))
+        self.ivan.username = 'vanya'
+        self.ivan.save()
+        self.assertNotIn('ivan', self.values('iva'))
+        self.assertEqual(self.values('vany'), ['vanya'])
+        Group.objects.get(slug='ivanovo').delete()
+        self.assertEqual(self.values('иван', type='group'), [])
+
+    def test_stale_index_rebuilds_in_background(self):
+        """
+        Устаревший индекс отвечает сразу, перестройку начинает один
+        фоновый поток.
+        """
+        autocomplete.index.build()
+        autocomplete.index._built -= 2 * 60 * 60
+        with mock.patch('posts.autocomplete.threading.Thread') as thread, \
+                self.assertNumQueries(0):
+            self.assertEqual(self.values('ivan', type='user'),
+                             ['ivan', 'ivanova'])
+            self.values('ivan')
+        thread.assert_called_once_with(
+            target=autocomplete.index._rebuild, daemon=True)
+        autocomplete.index._rebuild()
+        self.assertFalse(autocomplete.index._build_lock.locked())
+
+    @override_settings(AUTOCOMPLETE_MAX_KEYS=3)
+    def test_index_size_is_bounded(self):
+        """Ключей в индексе не больше AUTOCOMPLETE_MAX_KEYS."""
+        with self.assertLogs('posts.autocomplete', 'WARNING'):
+            autocomplete.index.build()
+        self.assertLessEqual(len(autocomplete.index._keys), 3)
+
+    def test_lookup_is_fast(self):
+        """Поиск по индексу из десятков тысяч ключей быстрее
+        миллисекунды."""
+        index = autocomplete.PrefixIndex()
+        index._keys = sorted((f'user{number}', (autocomplete.USER, number))
+                             for number in range(50000))
+        index._entries = {key: {'value': term} for term, key in index._keys}
+        index._built = time.monotonic()
+        start = time.perf_counter()
+        for _ in range(100):
+            index.lookup('user4999')
+        self.assertLess((time.perf_counter() - start) / 100, 0.001)
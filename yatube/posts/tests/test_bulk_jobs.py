@@ -0,0 +1,189 @@
+import csv
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import jobs, tasks
+from core.models import BulkJob, Task
+from posts.models import (Comment, Group, GroupStats, Mention, Post,
+                          PostTag, Tag, User)
+
+TEMP_EXPORT_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+POST_CHANGELIST = reverse('admin:posts_post_changelist')
+COMMENT_CHANGELIST = reverse('admin:posts_comment_changelist')
+POSTS = 5
+
+
+@override_settings(BULK_JOB_CHUNK_SIZE=2, EXPORT_ROOT=TEMP_EXPORT_ROOT)
+class BulkJobActionsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='group', slug='group')
+        cls.target = Group.objects.create(title='target', slug='target')
+        cls.posts = [Post.objects.create(author=cls.user, group=cls.group,
+                                         text=f'post_{number}')
+                     for number in range(POSTS)]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_EXPORT_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        Task.objects.all().delete()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def run_action(self, url, action, objects, **data):
+        return self.client.post(url, {
+            'action': action, 'index': 0,
+            ACTION_CHECKBOX_NAME: [obj.pk for obj in objects], **data})
+
+    def run_job(self):
+        """Выполняет задание до конца; возвращает число порций."""
+        chunks = 0
+        while tasks.run_pending():
+            chunks += 1
+        return chunks
+
+    def test_move_to_group_in_chunks(self):
+        """Перенос идет порциями, прогресс доходит до 100%."""
+        response = self.run_action(POST_CHANGELIST, 'move_to_group',
+                                   self.posts)
+        self.assertContains(response, 'name="apply"')
+        self.assertFalse(BulkJob.objects.exists())
+        self.run_action(POST_CHANGELIST, 'move_to_group', self.posts,
+                        apply='1', group=self.target.pk)
+        job = BulkJob.objects.get()
+        self.assertEqual((job.status, job.progress), (BulkJob.PENDING, 0))
+        tasks.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.total, job.done), (POSTS, 2))
+        self.assertEqual(self.run_job(), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), (BulkJob.DONE, 100))
+        self.assertEqual(self.target.posts.count(), POSTS)
+
+    def test_start_does_not_read_selection(self):
+        """Запрос админки только создает задание, не перебирая выборку."""
+        with CaptureQueriesContext(connection) as queries:
+            self.run_action(POST_CHANGELIST, 'export_csv', self.posts)
+        selection_reads = [query['sql'] for query in queries
+                           if query['sql'].startswith('SELECT')
+                           and 'WHERE "posts_post"."id" IN' in query['sql']]
+        self.assertEqual(selection_reads, [])
+        self.assertEqual(BulkJob.objects.get().done, 0)
+
+    def test_objects_created_after_start_are_skipped(self):
+        self.run_action(POST_CHANGELIST, 'delete_in_background', self.posts)
+        tasks.run_pending()
+        late = Post.objects.create(author=self.user, group=self.group,
+                                   text='late')
+        self.run_job()
+        self.assertEqual(list(Post.objects.all()), [late])
+
+    def test_chunk_reads_only_its_items(self):
+        """Порция выбирает из выборки не больше BULK_JOB_CHUNK_SIZE id."""
+        self.run_action(POST_CHANGELIST, 'export_csv', self.posts)
+        tasks.run_pending()
+        with CaptureQueriesContext(connection) as queries:
+            tasks.run_pending()
+        id_reads = [query['sql'] for query in queries
+                    if '"posts_post"."id" > ' in query['sql']]
+        self.assertEqual(len(id_reads), 1)
+        self.assertIn('LIMIT 2', id_reads[0])
+        self.assertEqual(BulkJob.objects.get().last_pk, self.posts[3].pk)
+
+    def test_delete_comments_without_loading_them(self):
+        """Комментарии удаляются одним DELETE, без загрузки строк."""
+        comments = [Comment.objects.create(post=self.posts[0],
+                                           author=self.user, text='spam')
+                    for _ in range(3)]
+        Task.objects.all().delete()
+        self.run_action(COMMENT_CHANGELIST, 'delete_in_background',
+                        comments[:2])
+        with CaptureQueriesContext(connection) as queries:
+            self.run_job()
+        comment_queries = [query['sql'] for query in queries
+                           if 'posts_comment' in query['sql']]
+        self.assertEqual(len([sql for sql in comment_queries
+                              if sql.startswith('DELETE')]), 1)
+        self.assertFalse([sql for sql in comment_queries
+                          if '"posts_comment"."text"' in sql])
+        self.assertEqual(list(Comment.objects.all()), comments[2:])
+
+    def test_delete_posts_with_comments(self):
+        Comment.objects.create(post=self.posts[0], author=self.user,
+                               text='comment')
+        self.run_action(POST_CHANGELIST, 'delete_in_background',
+                        self.posts[:3])
+        self.run_job()
+        self.assertEqual(Post.objects.count(), POSTS - 3)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_delete_posts_cleans_up_in_bulk(self):
+        """
+        Удаление записей убирает зависимые строки и пересчитывает
+        счетчики без загрузки записей и комментариев.
+        """
+        tagged = Post.objects.create(author=self.user, group=self.group,
+                                     text='#cats @admin')
+        Comment.objects.create(post=tagged, author=self.admin,
+                               text='@auth')
+        Task.objects.all().delete()
+        self.run_action(POST_CHANGELIST, 'delete_in_background',
+                        [tagged, *self.posts[:2]])
+        with CaptureQueriesContext(connection) as queries:
+            self.run_job()
+        loads = [query['sql'] for query in queries
+                 if query['sql'].startswith('SELECT')
+                 and ('"posts_post"."text"' in query['sql']
+                      or '"posts_comment"."text"' in query['sql'])]
+        self.assertEqual(loads, [])
+        self.assertFalse(Mention.objects.exists())
+        self.assertFalse(PostTag.objects.exists())
+        self.assertEqual(Tag.objects.get(name='cats').posts_count, 0)
+        self.assertEqual(GroupStats.objects.get(group=self.group)
+                         .posts_count, POSTS - 2)
+
+    def test_append_csv_retry_does_not_duplicate(self):
+        """Повтор порции после отката перезаписывает ее строки."""
+        job = BulkJob.objects.create(action='posts.export_posts')
+        jobs.append_csv(job, ('id',), [(1,)])
+        jobs.append_csv(job, ('id',), [(1,)])
+        job.refresh_from_db()
+        job.done = 1
+        jobs.append_csv(job, ('id',), [(2,)])
+        with open(job.result, newline='', encoding='utf-8') as result:
+            self.assertEqual(list(csv.reader(result)),
+                             [['id'], ['1'], ['2']])
+
+    def test_export_csv(self):
+        """Выгрузка собирается по порциям в один CSV-файл."""
+        self.run_action(POST_CHANGELIST, 'export_csv', self.posts)
+        self.run_job()
+        job = BulkJob.objects.get()
+        download = reverse('admin:core_bulkjob_download', args=[job.pk])
+        response = self.client.get(download)
+        rows = list(csv.reader(
+            b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual([row[-1] for row in rows[1:]],
+                         [post.text for post in self.posts])
+
+    def test_default_delete_action_is_replaced(self):
+        response = self.client.get(POST_CHANGELIST)
+        actions = dict(response.context['action_form']
+                       .fields['action'].choices)
+        self.assertNotIn('delete_selected', actions)
+        self.assertIn('delete_in_background', actions)
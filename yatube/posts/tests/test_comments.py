@@ -0,0 +1,54 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post, get_user_model
+from posts.utils import make_cursor, parse_cursor
+
+User = get_user_model()
+
+COMMENTS = 7
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='post')
+        cls.comments = [
+            Comment.objects.create(post=cls.post, author=cls.user,
+                                   text=f'comment_{i}')
+            for i in range(COMMENTS)]
+        cls.post_detail = reverse('posts:post_detail',
+                                  kwargs={'post_id': cls.post.id})
+        cls.post_comments = reverse('posts:post_comments',
+                                    kwargs={'post_id': cls.post.id})
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_cursor_round_trip(self):
+        """Курсор однозначно восстанавливает (created, id)."""
+        comment = self.comments[0]
+        self.assertEqual(parse_cursor(make_cursor(comment.created,
+                                                  comment.id)),
+                         (comment.created, comment.id))
+        self.assertIsNone(parse_cursor('broken'))
+
+    def test_post_detail_renders_first_page_only(self):
+        """На странице записи только первая порция комментариев."""
+        response = self.client.get(self.post_detail)
+        self.assertEqual(response.context['comments'], self.comments[:3])
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_fragments_continue_after_cursor(self):
+        """Фрагменты по курсору отдают все комментарии по порядку."""
+        response = self.client.get(self.post_detail)
+        seen = list(response.context['comments'])
+        cursor = response.context['next_cursor']
+        while cursor:
+            response = self.client.get(self.post_comments, {'after': cursor})
+            self.assertNotContains(response, '<html')
+            seen.extend(response.context['comments'])
+            cursor = response.context['next_cursor']
+        self.assertEqual(seen, self.comments)
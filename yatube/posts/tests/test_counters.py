@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.counters import ViewCounter, view_counter
+from posts.models import Post, get_user_model
+
+User = get_user_model()
+
+MAIN_PAGE = reverse('posts:index')
+
+
+class ViewCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='post')
+        cls.other_post = Post.objects.create(author=cls.user, text='other')
+
+    def setUp(self):
+        self.counter = ViewCounter()
+        self.addCleanup(view_counter.flush)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=60)
+    def test_views_are_buffered_until_flush(self):
+        """Просмотры копятся в памяти и не пишутся в базу сразу."""
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.counter.record(self.post.id)
+        self.assertEqual(self.counter.pending(self.post.id), 5)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=60)
+    def test_flush_writes_all_deltas_with_one_update(self):
+        """Сброс записывает просмотры всех записей одним UPDATE."""
+        for post, views in ((self.post, 3), (self.other_post, 2)):
+            for _ in range(views):
+                self.counter.record(post.id)
+        with CaptureQueriesContext(connection) as queries:
+            self.counter.flush()
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.post.refresh_from_db()
+        self.other_post.refresh_from_db()
+        self.assertEqual((self.post.views, self.other_post.views), (3, 2))
+        self.assertEqual(self.counter.pending(self.post.id), 0)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=60)
+    def test_post_detail_shows_buffered_views(self):
+        """На странице записи видны еще не записанные просмотры."""
+        view_counter.flush()
+        post_detail = reverse('posts:post_detail',
+                              kwargs={'post_id': self.post.id})
+        client = Client()
+        client.get(post_detail)
+        response = client.get(post_detail)
+        self.assertEqual(response.context['post'].views, 2)
+
+    def test_index_sorts_by_popularity(self):
+        """Главная страница сортируется по числу просмотров."""
+        Post.objects.filter(pk=self.post.pk).update(views=10)
+        response = Client().get(MAIN_PAGE, {'sort': 'popular'})
+        self.assertEqual(response.context['page_obj'][0], self.post)
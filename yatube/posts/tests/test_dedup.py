@@ -0,0 +1,98 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import dedup
+from posts.models import FingerprintBand, Post, User
+
+SPAM = ('Лучшие цены на волшебные таблетки только сегодня, пишите '
+        'в личные сообщения и получите скидку для первых покупателей')
+SPAM_VARIANT = ('Лучшие цены на волшебные таблетки только сегодня! Пишите '
+                'в личные сообщения и получите скидку для первых покупателей!')
+OTHER = ('Сегодня гуляли в парке с собакой, погода была отличная, '
+         'а вечером пили чай с малиновым вареньем у бабушки')
+
+
+class DedupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.other = User.objects.create_user(username='other')
+        cls.original = Post.objects.create(author=cls.spammer, text=SPAM)
+        Post.objects.create(author=cls.spammer, text=OTHER)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.other)
+
+    def test_near_duplicate_found(self):
+        """Текст с другой пунктуацией находится как повтор."""
+        self.assertEqual(dedup.find_duplicate(SPAM_VARIANT), self.original)
+        self.assertIsNone(dedup.find_duplicate(
+            'Совсем другой текст о путешествии на поезде через всю '
+            'страну до самого океана'))
+
+    @mock.patch('posts.dedup.MAX_CANDIDATES', 1)
+    def test_candidates_ranked_by_shared_buckets(self):
+        """Первыми проверяются записи с наибольшим числом общих корзин."""
+        FingerprintBand.objects.filter(post=self.original).delete()
+        noise = Post.objects.create(author=self.other, text=OTHER + ' 2')
+        FingerprintBand.objects.create(
+            post=noise,
+            bucket=min(dedup.buckets(dedup.shingles(SPAM_VARIANT))))
+        original = Post.objects.create(author=self.spammer, text=SPAM)
+        self.assertEqual(dedup.find_duplicate(SPAM_VARIANT), original)
+
+    def test_short_texts_are_not_checked(self):
+        """Короткие тексты не считаются повторами."""
+        Post.objects.create(author=self.spammer, text='Всем привет!')
+        self.assertIsNone(dedup.find_duplicate('Всем привет!'))
+
+    def test_create_blocks_duplicate(self):
+        """Почти повтор не публикуется, форма сообщает об ошибке."""
+        count = Post.objects.count()
+        response = self.client.post(reverse('posts:post_create'),
+                                    {'text': SPAM_VARIANT})
+        self.assertFormError(response, 'form', 'text',
+                             'Такая запись уже опубликована')
+        self.assertEqual(Post.objects.count(), count)
+
+    @override_settings(DEDUP_ACTION='flag')
+    def test_create_flags_duplicate(self):
+        """В режиме flag повтор публикуется с отметкой."""
+        self.client.post(reverse('posts:post_create'),
+                         {'text': SPAM_VARIANT})
+        post = Post.objects.get(author=self.other)
+        self.assertEqual(post.duplicate_of, self.original)
+
+    def test_edit_does_not_match_itself(self):
+        """Правка записи не считается повтором ее самой."""
+        client = Client()
+        client.force_login(self.spammer)
+        response = client.post(
+            reverse('posts:post_edit', args=[self.original.pk]),
+            {'text': SPAM_VARIANT})
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=[self.original.pk]))
+
+    def test_edit_blocks_duplicate_of_other_post(self):
+        """Правкой нельзя превратить запись в повтор чужой."""
+        post = Post.objects.create(author=self.other, text=OTHER + ' 3')
+        response = self.client.post(
+            reverse('posts:post_edit', args=[post.pk]),
+            {'text': SPAM_VARIANT})
+        self.assertFormError(response, 'form', 'text',
+                             'Такая запись уже опубликована')
+        post.refresh_from_db()
+        self.assertEqual(post.text, OTHER + ' 3')
+
+    def test_command_fingerprints_existing_posts(self):
+        """Команда заново заполняет корзины всех записей."""
+        FingerprintBand.objects.all().delete()
+        out = StringIO()
+        call_command('fingerprint_posts', chunk_size=1, stdout=out)
+        self.assertIn(f'Записей: {Post.objects.count()}', out.getvalue())
+        self.assertEqual(dedup.find_duplicate(SPAM_VARIANT), self.original)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, get_user_model
+
+User = get_user_model()
+
+EXTRA_POSTS = 3
+
+
+class FeedFragmentsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='group', slug='slug',
+                                         description='description')
+        for number in range(settings.POSTS_PER_PAGE + EXTRA_POSTS):
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'post_{number}')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.newest_first = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_fragments_continue_feeds(self):
+        """Фрагменты продолжают ленту с места, где кончилась страница."""
+        feeds = {
+            reverse('posts:index'): reverse('posts:index_more'),
+            reverse('posts:group_list', args=[self.group.slug]):
+                reverse('posts:group_list_more', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]):
+                reverse('posts:profile_more', args=[self.author.username]),
+            reverse('posts:follow_index'):
+                reverse('posts:follow_index_more'),
+        }
+        for page, more_url in feeds.items():
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertEqual(response.context['more_url'], more_url)
+                seen = list(response.context['page_obj'])
+                cursor = response.context['next_cursor']
+                while cursor:
+                    response = self.client.get(more_url, {'after': cursor})
+                    self.assertNotContains(response, '<html')
+                    self.assertNotContains(response, 'data-paginator')
+                    seen.extend(response.context['posts'])
+                    cursor = response.context['next_cursor']
+                self.assertEqual(seen, self.newest_first)
+
+    def test_popular_sort_has_no_fragments(self):
+        """Сортировка по популярности листается только страницами."""
+        response = self.client.get(reverse('posts:index'),
+                                   {'sort': 'popular'})
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_follow_fragment_requires_login(self):
+        """Фрагмент ленты подписок недоступен анониму."""
+        response = Client().get(reverse('posts:follow_index_more'))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,87 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, get_user_model
+
+User = get_user_model()
+
+MAIN_PAGE = reverse('posts:index')
+FOLLOW_INDEX = reverse('posts:follow_index')
+
+
+def follow_queries(queries):
+    return [query for query in queries.captured_queries
+            if 'FROM "posts_follow"' in query['sql']]
+
+
+class FollowStateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user')
+        cls.followed = User.objects.create_user(username='followed')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(title='group', slug='slug')
+        for author in (cls.followed, cls.other):
+            for i in range(3):
+                Post.objects.create(author=author, group=cls.group,
+                                    text=f'{author.username}_{i}')
+        Follow.objects.create(user=cls.user, author=cls.followed)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_feeds_render_follow_state_of_each_author(self):
+        """Кнопки подписки на лентах соответствуют подпискам читателя."""
+        pages = (MAIN_PAGE,
+                 reverse('posts:group_list', kwargs={'slug': 'slug'}))
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertEqual(response.context['followed_authors'],
+                                 {self.followed.id})
+                content = response.content.decode()
+                self.assertEqual(content.count('Отписаться'), 3)
+                self.assertEqual(content.count('Подписаться'), 3)
+
+    def test_follow_state_costs_one_query_and_is_cached(self):
+        """Состояние подписок страницы - один запрос, затем кэш."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(MAIN_PAGE)
+        self.assertEqual(len(follow_queries(queries)), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(MAIN_PAGE)
+        self.assertEqual(follow_queries(queries), [])
+
+    def test_follow_change_invalidates_state(self):
+        """Новая подписка сразу меняет кнопки на странице."""
+        self.client.get(FOLLOW_INDEX)
+        Follow.objects.create(user=self.user, author=self.other)
+        response = self.client.get(MAIN_PAGE)
+        self.assertEqual(response.context['followed_authors'],
+                         {self.followed.id, self.other.id})
+
+    def test_change_from_other_process_expires(self):
+        """
+        Подписку, записанную другим процессом (без сигнала в этом),
+        страница покажет не позже FOLLOW_STATE_CACHE_TIMEOUT.
+        """
+        self.client.get(MAIN_PAGE)
+        Follow.objects.bulk_create([Follow(user=self.user,
+                                           author=self.other)])
+        response = self.client.get(MAIN_PAGE)
+        self.assertEqual(response.context['followed_authors'],
+                         {self.followed.id})
+        later = time.time() + settings.FOLLOW_STATE_CACHE_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            response = self.client.get(MAIN_PAGE)
+        self.assertEqual(response.context['followed_authors'],
+                         {self.followed.id, self.other.id})
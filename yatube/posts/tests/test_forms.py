@@ -1,14 +1,13 @@
 import shutil
 import tempfile
-from io import BytesIO
 
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
-from PIL import Image
 from django.conf import settings
 
 from posts.models import Comment, Group, Post, get_user_model
+from posts.tests.utils import image_for_test
 
 
 User = get_user_model()
@@ -22,15 +21,7 @@ TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 class PostFormTests(TestCase):
     @staticmethod
     def get_image_for_test(name: str) -> SimpleUploadedFile:
-        with BytesIO() as output:
-            Image.new('RGB', (1280, 1024), color=1).save(output, 'BMP')
-            data = output.getvalue()
-        image = SimpleUploadedFile(
-            name=name,
-            content=data,
-            content_type='image'
-        )
-        return image
+        return image_for_test(name)
 
     @classmethod
     def setUpClass(cls):
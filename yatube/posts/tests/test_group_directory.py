@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import jobs
+from posts.models import Group, GroupStats, Post, User
+
+GROUPS = reverse('posts:groups')
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        cls.busy = Group.objects.create(title='busy', slug='busy')
+        cls.quiet = Group.objects.create(title='quiet', slug='quiet')
+        cls.empty = Group.objects.create(title='empty', slug='empty')
+        for author in (cls.first, cls.first, cls.second):
+            Post.objects.create(author=author, group=cls.busy, text='busy')
+        cls.latest = Post.objects.create(author=cls.first, group=cls.quiet,
+                                         text='quiet')
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self, group):
+        stats = GroupStats.objects.get(group=group)
+        return stats.posts_count, stats.authors_count, stats.latest_post
+
+    def test_stats_follow_posts(self):
+        """Сводки меняются при создании, переносе и удалении записей."""
+        self.assertEqual(self.stats(self.busy)[:2], (3, 2))
+        self.assertEqual(self.stats(self.quiet),
+                         (1, 1, self.latest.pub_date))
+        self.assertEqual(self.stats(self.empty)[:2], (0, 0))
+        self.latest.group = self.busy
+        self.latest.save()
+        self.assertEqual(self.stats(self.busy)[:2], (4, 2))
+        self.assertEqual(self.stats(self.quiet)[:2], (0, 0))
+        self.assertEqual(self.stats(self.busy)[2], self.latest.pub_date)
+        self.latest.delete()
+        self.assertEqual(self.stats(self.busy)[:2], (3, 2))
+        self.assertLess(self.stats(self.busy)[2], self.latest.pub_date)
+
+    def test_deleting_author_updates_authors(self):
+        """
+        Удаление пользователя убирает его из авторов группы, хотя
+        GroupAuthor удаляется каскадом раньше его записей.
+        """
+        self.second.delete()
+        self.assertEqual(self.stats(self.busy)[:2], (2, 1))
+
+    def test_post_does_not_recount_authors(self):
+        """Запись автора группы не пересчитывает авторов по таблице."""
+        with CaptureQueriesContext(connection) as queries:
+            post = Post.objects.create(author=self.first, group=self.busy,
+                                       text='busy')
+            post.delete()
+        self.assertFalse([query['sql'] for query in queries
+                          if 'COUNT(' in query['sql']])
+        self.assertEqual(self.stats(self.busy)[:2], (3, 2))
+
+    def test_bulk_move_refreshes_stats(self):
+        """Массовый перенос пересчитывает сводки обеих групп."""
+        ids = list(self.busy.posts.values_list('pk', flat=True))
+        jobs.move_to_group(None, ids, self.empty.pk)
+        self.assertEqual(self.stats(self.empty)[:2], (3, 2))
+        self.assertEqual(self.stats(self.busy)[:2], (0, 0))
+
+    def test_sorting(self):
+        """Каталог сортируется по активности, записям и авторам."""
+        cases = {
+            'activity': ['quiet', 'busy', 'empty'],
+            'posts': ['busy', 'quiet', 'empty'],
+            'authors': ['busy', 'quiet', 'empty'],
+        }
+        for sort, titles in cases.items():
+            with self.subTest(sort=sort):
+                response = Client().get(GROUPS, {'sort': sort})
+                self.assertEqual(
+                    [item.group.title for item in response.context['stats']],
+                    titles)
+
+    @override_settings(GROUPS_PER_PAGE=2)
+    def test_keyset_pages(self):
+        """Следующая страница каталога подгружается по курсору."""
+        response = Client().get(GROUPS, {'sort': 'posts'})
+        more = Client().get(response.context['more_url'],
+                            {'after': response.context['next_cursor']})
+        self.assertEqual([item.group.title for item in more.context['stats']],
+                         ['empty'])
+        self.assertIsNone(more.context['next_cursor'])
+
+    def test_directory_does_not_scan_posts(self):
+        """Каталог читает только сводки, без запросов к записям."""
+        with CaptureQueriesContext(connection) as queries:
+            Client().get(GROUPS)
+        self.assertFalse([query for query in queries
+                          if 'posts_post' in query['sql']])
+
+    def test_rebuild_command(self):
+        """Команда восстанавливает испорченные сводки."""
+        GroupStats.objects.update(posts_count=0, authors_count=0)
+        call_command('rebuild_group_stats', stdout=StringIO())
+        self.assertEqual(self.stats(self.busy)[:2], (3, 2))
@@ -0,0 +1,105 @@
+import re
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import (Comment, Post, PostTag, Tag, User,
+                          extract_tags, render_text)
+
+
+class HashtagTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_extract_tags(self):
+        """Теги в нижнем регистре, без цифр в начале и сущностей HTML."""
+        self.assertEqual(
+            extract_tags('#Котики и #котики, #2023, a#b, &#39; #кот_2'),
+            {'котики', 'кот_2'})
+
+    def test_counts_follow_edits_and_deletes(self):
+        """Счетчики тегов меняются при правке и удалении записи."""
+        post = Post.objects.create(author=self.user, text='#cats #dogs')
+        Post.objects.create(author=self.user, text='#cats')
+        self.assertEqual(Tag.objects.get(name='cats').posts_count, 2)
+        post.text = '#cats #birds'
+        post.save()
+        counts = dict(Tag.objects.values_list('name', 'posts_count'))
+        self.assertEqual(counts, {'cats': 2, 'dogs': 0, 'birds': 1})
+        post.delete()
+        counts = dict(Tag.objects.values_list('name', 'posts_count'))
+        self.assertEqual(counts, {'cats': 1, 'dogs': 0, 'birds': 0})
+
+    def test_text_links_to_tag(self):
+        """Хештег в тексте записи - ссылка на ленту тега."""
+        post = Post.objects.create(author=self.user, text='Смотрите #Кот')
+        self.assertIn(f'<a href="{reverse("posts:tag", args=["кот"])}">'
+                      '#Кот</a>', post.text_html)
+
+    @override_settings(POSTS_PER_PAGE=2)
+    def test_tag_feed_is_paginated_by_cursor(self):
+        """Лента тега отдается порциями от новых записей к старым."""
+        posts = [Post.objects.create(author=self.user, text=f'{n} #feed')
+                 for n in range(3)]
+        Post.objects.create(author=self.user, text='без тега')
+        response = Client().get(reverse('posts:tag', args=['FEED']))
+        self.assertEqual(response.context['posts'], posts[:0:-1])
+        more = Client().get(response.context['more_url'],
+                            {'after': response.context['next_cursor']})
+        self.assertEqual(more.context['posts'], [posts[0]])
+        self.assertIsNone(more.context['next_cursor'])
+
+    def test_tag_feed_query_count(self):
+        """Число запросов ленты тега не зависит от числа записей."""
+        for n in range(5):
+            Post.objects.create(author=self.user, text=f'{n} #many')
+        Client().get(reverse('posts:tag', args=['many']))
+        with CaptureQueriesContext(connection) as queries:
+            Client().get(reverse('posts:tag', args=['many']))
+        self.assertLessEqual(len(queries), 3)
+
+    def test_leaderboard(self):
+        """Список тегов отсортирован по числу записей."""
+        Post.objects.create(author=self.user, text='#a #b')
+        Post.objects.create(author=self.user, text='#b')
+        response = Client().get(reverse('posts:tags'))
+        self.assertEqual([tag.name for tag in response.context['tags']],
+                         ['b', 'a'])
+
+    def test_links_match_extracted_tags(self):
+        """Ссылки в HTML - ровно те теги, что разобраны из текста."""
+        for text in ('&#amp и #cats', "'#cats' <#dogs>", 'a#b #x&#y',
+                     '"#quoted"\n#next'):
+            with self.subTest(text=text):
+                linked = {name.lower() for name in re.findall(
+                    r'>#(\w+)</a>', render_text(text))}
+                self.assertEqual(linked, extract_tags(text))
+
+    def test_index_command_rebuilds_tags(self):
+        """
+        Команда восстанавливает теги и счетчики существующих записей и
+        ссылки в HTML записей и комментариев.
+        """
+        Post.objects.bulk_create([Post(author=self.user, text='#old #tag'),
+                                  Post(author=self.user, text='#old')])
+        post = Post.objects.get(text='#old')
+        Comment.objects.bulk_create([
+            Comment(post=post, author=self.user, text='#old @auth')])
+        out = StringIO()
+        call_command('index_hashtags', chunk_size=1, stdout=out)
+        self.assertIn('комментариев: 1', out.getvalue())
+        self.assertEqual(Tag.objects.get(name='old').posts_count, 2)
+        self.assertEqual(PostTag.objects.count(), 3)
+        self.assertIn('#old</a>', Post.objects.get(pk=post.pk).text_html)
+        comment_html = Comment.objects.get().text_html
+        self.assertIn('#old</a>', comment_html)
+        self.assertIn('@auth</a>', comment_html)
@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import tasks
+from posts import inbox
+from posts.models import Comment, Follow, InboxSegment, Post, get_user_model
+
+User = get_user_model()
+
+NOTIFICATIONS = reverse('posts:notifications')
+UNREAD = reverse('posts:unread_notifications')
+
+
+class InboxTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_events_reach_inbox(self):
+        """Подписка, запись и комментарий попадают в ленты уведомлений."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='post')
+        tasks.run_pending()
+        tasks.run_pending()
+        Comment.objects.create(post=post, author=self.reader, text='hi')
+        self.assertEqual(inbox.unread_count(self.reader.id), 1)
+        self.assertEqual(inbox.unread_count(self.author.id), 2)
+        kinds = [item.kind for item in inbox.latest(self.author.id, 10)]
+        self.assertEqual(kinds, [inbox.NEW_COMMENT, inbox.NEW_FOLLOWER])
+
+    def test_batch_delivery_uses_constant_queries(self):
+        """Пачка получателей записывается фиксированным числом запросов."""
+        users = [User.objects.create_user(username=f'user_{i}')
+                 for i in range(20)]
+        inbox.deliver([user.id for user in users], inbox.NEW_POST, 1,
+                      self.author.id)
+        with CaptureQueriesContext(connection) as small:
+            inbox.deliver([user.id for user in users[:2]], inbox.NEW_POST,
+                          1, self.author.id)
+        with CaptureQueriesContext(connection) as large:
+            inbox.deliver([user.id for user in users], inbox.NEW_POST, 1,
+                          self.author.id)
+        self.assertEqual(len(large), len(small))
+
+    def test_segments_and_read_bitmap(self):
+        """Уведомления делятся на отрезки, прочитанные отмечаются битами."""
+        for _ in range(inbox.SEGMENT_SIZE + 1):
+            inbox.deliver([self.reader.id], inbox.NEW_FOLLOWER, 1,
+                          self.author.id)
+        self.assertEqual(
+            InboxSegment.objects.filter(user=self.reader).count(), 2)
+        inbox.mark_read(self.reader.id, 3)
+        inbox.mark_read(self.reader.id, 3)
+        self.assertEqual(inbox.unread_count(self.reader.id),
+                         inbox.SEGMENT_SIZE)
+        read = {item.number for item in inbox.latest(self.reader.id, 200)
+                if item.read}
+        self.assertEqual(read, {3})
+
+    def test_unread_endpoint_and_page(self):
+        """Страница показывает уведомления, «Прочитать все» их прочитывает."""
+        inbox.deliver([self.reader.id], inbox.NEW_FOLLOWER, 1,
+                      self.author.id)
+        response = self.reader_client.get(UNREAD)
+        self.assertEqual(response.json(), {'unread': 1})
+        response = self.reader_client.get(NOTIFICATIONS)
+        self.assertEqual(len(response.context['notifications']), 1)
+        self.assertEqual(response.context['NEW_FOLLOWER'],
+                         inbox.NEW_FOLLOWER)
+        self.assertEqual(self.reader_client.get(UNREAD).json(),
+                         {'unread': 1})
+        self.reader_client.post(reverse('posts:read_notifications'))
+        self.assertEqual(self.reader_client.get(UNREAD).json(),
+                         {'unread': 0})
+
+    def test_opening_notification_marks_it_read(self):
+        """Переход по уведомлению отмечает прочитанным только его."""
+        post = Post.objects.create(author=self.author, text='post')
+        inbox.deliver([self.reader.id], inbox.NEW_POST, post.id,
+                      self.author.id)
+        inbox.deliver([self.reader.id], inbox.NEW_FOLLOWER, self.author.id,
+                      self.author.id)
+        response = self.reader_client.get(
+            reverse('posts:open_notification', args=[0]))
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=[post.id]))
+        self.assertEqual(inbox.unread_count(self.reader.id), 1)
+        self.assertEqual([item.read for item in
+                          inbox.latest(self.reader.id, 10)], [False, True])
+        response = self.reader_client.get(
+            reverse('posts:open_notification', args=[2]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import inbox, jobs
+from posts.models import Comment, Mention, Post, User, extract_mentions
+
+
+class MentionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.ivan = User.objects.create_user(username='ivan')
+        cls.users = [User.objects.create_user(username=f'user{n}')
+                     for n in range(10)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_extract_mentions(self):
+        """Точка в конце и адреса почты не попадают в упоминания."""
+        self.assertEqual(
+            extract_mentions('Спасибо, @ivan. Пишите на a@b.ru, @a.b-c'),
+            {'ivan', 'a.b-c'})
+
+    def test_mentions_linked_and_recorded(self):
+        """Существующий пользователь получает ссылку, упоминание и
+        уведомление; несуществующий остается текстом."""
+        post = Post.objects.create(author=self.author,
+                                   text='@ivan и @nobody, @author')
+        self.assertIn('<a href="{}">@ivan</a>'.format(
+            reverse('posts:profile', args=['ivan'])), post.text_html)
+        self.assertIn('@nobody,', post.text_html)
+        self.assertEqual(
+            list(Mention.objects.values_list('user__username', flat=True)),
+            ['ivan'])
+        notification, = inbox.latest(self.ivan.pk, 10)
+        self.assertEqual(notification.kind, inbox.MENTION_IN_POST)
+        self.assertEqual(notification.post, post)
+
+    def test_edit_updates_mentions(self):
+        """Правка текста убирает и добавляет упоминания."""
+        post = Post.objects.create(author=self.author, text='@ivan')
+        post.text = '@user1'
+        post.save()
+        self.assertEqual(
+            list(Mention.objects.values_list('user__username', flat=True)),
+            ['user1'])
+
+    @override_settings(DEDUP_MIN_WORDS=100)
+    def test_query_count_does_not_grow_with_mentions(self):
+        """Запись с девятью упоминаниями стоит столько же запросов, сколько
+        с одним."""
+        counts = []
+        for users in (self.users[:1], self.users[1:]):
+            text = ' '.join(f'@{user.username}' for user in users)
+            with CaptureQueriesContext(connection) as queries:
+                Post.objects.create(author=self.author, text=text)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    @override_settings(POSTS_PER_PAGE=2)
+    def test_feed(self):
+        """Лента упоминаний от новых к старым, с подгрузкой."""
+        post = Post.objects.create(author=self.author, text='@ivan')
+        Comment.objects.create(post=post, author=self.author,
+                               text='еще раз @ivan')
+        Post.objects.create(author=self.author, text='снова @ivan')
+        client = Client()
+        client.force_login(self.ivan)
+        response = client.get(reverse('posts:mentions'))
+        first_page = response.context['mentions']
+        self.assertEqual(len(first_page), 2)
+        self.assertIsNotNone(first_page[1].comment)
+        more = client.get(response.context['more_url'],
+                          {'after': response.context['next_cursor']})
+        self.assertEqual(more.context['mentions'][0].post, post)
+        self.assertIsNone(more.context['mentions'][0].comment)
+        self.assertIsNone(more.context['next_cursor'])
+
+    def test_bulk_comment_delete_removes_mentions(self):
+        """Массовое удаление комментариев удаляет и их упоминания."""
+        post = Post.objects.create(author=self.author, text='текст')
+        comment = Comment.objects.create(post=post, author=self.author,
+                                         text='@ivan')
+        jobs.delete_comments(None, [comment.pk])
+        self.assertFalse(Mention.objects.exists())
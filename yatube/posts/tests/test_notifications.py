@@ -0,0 +1,64 @@
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import tasks
+from core.models import Task
+from posts.models import Comment, Follow, Post, get_user_model
+
+User = get_user_model()
+
+POST_CREATE = reverse('posts:post_create')
+
+FOLLOWERS = 25
+
+
+@override_settings(NOTIFICATION_BATCH_SIZE=10)
+class NotificationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author',
+                                              email='author@test.ru')
+        followers = User.objects.bulk_create(
+            User(username=f'follower_{i}', email=f'follower_{i}@test.ru')
+            for i in range(FOLLOWERS))
+        Follow.objects.bulk_create(
+            Follow(user=follower, author=cls.author)
+            for follower in User.objects.filter(
+                username__in=[user.username for user in followers]))
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_post_create_only_enqueues_one_task(self):
+        """Создание записи ставит одну задачу при любом числе подписчиков."""
+        self.author_client.post(POST_CREATE, {'text': 'new'})
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_new_post_is_sent_to_followers_in_batches(self):
+        """Подписчики получают письма пачками по NOTIFICATION_BATCH_SIZE."""
+        self.author_client.post(POST_CREATE, {'text': 'new'})
+        tasks.run_pending()
+        self.assertEqual(
+            Task.objects.filter(name='posts.send_new_post').count(), 3)
+        tasks.run_pending()
+        self.assertEqual(len(mail.outbox), FOLLOWERS)
+        self.assertFalse(Task.objects.exists())
+
+    def test_new_comment_notifies_author_and_commenters(self):
+        """О комментарии узнают автор записи и другие комментаторы."""
+        post = Post.objects.create(author=self.author, text='post')
+        first, second = User.objects.filter(
+            username__in=('follower_0', 'follower_1')).order_by('username')
+        Comment.objects.create(post=post, author=first, text='first')
+        Task.objects.all().delete()
+        client = Client()
+        client.force_login(second)
+        client.post(reverse('posts:add_comment', kwargs={'post_id': post.id}),
+                    {'text': 'second'})
+        tasks.run_pending()
+        tasks.run_pending()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['author@test.ru', 'follower_0@test.ru'])
@@ -0,0 +1,54 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Recommendation, get_user_model
+from posts.recommendations import FollowGraph, recompute_all
+
+User = get_user_model()
+
+FOLLOW_INDEX = reverse('posts:follow_index')
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.friend, author=cls.author)
+        Follow.objects.create(user=cls.other, author=cls.author)
+
+    def test_graph_suggests_friends_of_friends(self):
+        """Граф рекомендует авторов, на которых подписаны мои авторы."""
+        graph = FollowGraph([(1, 2), (2, 3), (2, 4), (5, 3), (1, 4)])
+        self.assertEqual([author for author, _ in graph.suggest(1, 10)],
+                         [3])
+        self.assertEqual(graph.suggest(42, 10), [])
+
+    def test_follow_refreshes_recommendations(self):
+        """Подписка сразу пересчитывает рекомендации подписчика."""
+        Follow.objects.create(user=self.user, author=self.friend)
+        self.assertEqual(
+            list(Recommendation.objects.filter(user=self.user)
+                 .values_list('author', flat=True)),
+            [self.author.id])
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertFalse(
+            Recommendation.objects.filter(user=self.user).exists())
+
+    def test_recompute_all_matches_graph(self):
+        """Полный пересчет сохраняет рекомендации всех подписчиков."""
+        Follow.objects.create(user=self.user, author=self.friend)
+        Recommendation.objects.all().delete()
+        recompute_all()
+        self.assertTrue(Recommendation.objects.filter(
+            user=self.user, author=self.author).exists())
+
+    def test_recommendations_are_shown_on_follow_index(self):
+        """Рекомендации выводятся на странице подписок."""
+        Follow.objects.create(user=self.user, author=self.friend)
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(FOLLOW_INDEX)
+        self.assertEqual(response.context['recommendations'], [self.author])
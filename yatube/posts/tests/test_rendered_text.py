@@ -0,0 +1,43 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post, get_user_model
+
+User = get_user_model()
+
+
+class RenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user,
+                                       text='<b>первая</b>\nвторая')
+
+    def test_html_rendered_on_save(self):
+        """HTML текста готовится при сохранении и экранирован."""
+        self.assertEqual(self.post.text_html,
+                         '&lt;b&gt;первая&lt;/b&gt;<br>вторая')
+        comment = Comment.objects.create(post=self.post, author=self.user,
+                                         text='a\nb')
+        self.assertEqual(comment.text_html, 'a<br>b')
+
+    def test_html_follows_edit(self):
+        """После правки текста HTML обновляется, в том числе при
+        сохранении с update_fields."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'новый'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, 'новый')
+
+    def test_templates_emit_rendered_html(self):
+        """Ленты и страница записи выводят готовый HTML."""
+        Post.objects.filter(pk=self.post.pk).update(text_html='<i>ready</i>')
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.id]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(Client().get(url), '<i>ready</i>')
@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import trending
+from posts.models import Comment, Follow, Post, get_user_model
+
+User = get_user_model()
+
+TRENDING = reverse('posts:trending')
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='post')
+        cls.other_post = Post.objects.create(author=cls.user, text='other')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_comment_and_follow_raise_post(self):
+        """Комментарий и подписка на автора поднимают запись в рейтинге."""
+        Comment.objects.create(post=self.other_post, author=self.user,
+                               text='comment')
+        self.assertEqual(trending.top(), [self.other_post.id])
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(trending.top()[0], self.post.id)
+
+    def test_old_events_decay(self):
+        """Старые события весят меньше свежих."""
+        now = settings.TRENDING_EPOCH + 10 * settings.TRENDING_HALF_LIFE
+        trending.record({self.post.id: 3},
+                        timestamp=now - 2 * settings.TRENDING_HALF_LIFE)
+        trending.record({self.other_post.id: 1}, timestamp=now)
+        self.assertEqual(trending.top(),
+                         [self.other_post.id, self.post.id])
+
+    @override_settings(TRENDING_SIZE=2)
+    def test_top_is_bounded(self):
+        """В рейтинге хранится не больше TRENDING_SIZE записей."""
+        trending.record({1: 5, 2: 3, 3: 1})
+        trending.record({4: 4})
+        self.assertEqual(trending.top(), [1, 4])
+
+    def test_scores_are_shared_through_database(self):
+        """Рейтинг хранится в базе, а не в кэше процесса."""
+        trending.record({self.post.id: 1})
+        cache.clear()
+        self.assertEqual(trending.top(), [self.post.id])
+
+    def test_trending_page_shows_ranked_posts(self):
+        """Страница популярного выводит записи в порядке рейтинга."""
+        trending.record({self.post.id: 1, self.other_post.id: 2})
+        response = self.guest_client.get(TRENDING)
+        self.assertEqual(list(response.context['page_obj']),
+                         [self.other_post, self.post])
+
+    def test_rebuild_command(self):
+        """Команда rebuild_trending восстанавливает рейтинг по базе."""
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='comment')
+        cache.clear()
+        call_command('rebuild_trending', stdout=StringIO())
+        self.assertEqual(trending.top(), [self.post.id])
@@ -1,6 +1,5 @@
 import shutil
 import tempfile
-from io import BytesIO
 
 from django import forms
 from django.conf import settings
@@ -9,9 +8,9 @@ from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
-from PIL import Image
 
 from posts.models import Group, Post, Follow, Comment
+from posts.tests.utils import image_for_test
 
 
 User = get_user_model()
@@ -29,15 +28,7 @@ FOLLOW_INDEX = reverse('posts:follow_index')
 class PostsPagesTest(TestCase):
     @staticmethod
     def get_image_for_test(name: str) -> SimpleUploadedFile:
-        with BytesIO() as output:
-            Image.new('RGB', (1280, 1024), color=1).save(output, 'BMP')
-            data = output.getvalue()
-        image = SimpleUploadedFile(
-            name=name,
-            content=data,
-            content_type='image'
-        )
-        return image
+        return image_for_test(name)
 
     @classmethod
     def setUpClass(cls):
@@ -345,7 +336,8 @@ class PostsPagesTest(TestCase):
 
 
 @override_settings(CACHES={
-    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache', }})
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache', },
+    'sessions': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache', }})
 class TestPaginatorViews(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,18 @@
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+
+@lru_cache(maxsize=None)
+def image_bytes(size=(1280, 1024), image_format='BMP'):
+    """Картинка генерируется Pillow один раз на процесс."""
+    with BytesIO() as output:
+        Image.new('RGB', size, color=1).save(output, image_format)
+        return output.getvalue()
+
+
+def image_for_test(name):
+    return SimpleUploadedFile(name=name, content=image_bytes(),
+                              content_type='image')
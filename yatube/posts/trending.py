@@ -0,0 +1,122 @@
+"""
+Рейтинг популярных записей с затуханием по времени.
+
+Каждое событие (просмотр, комментарий, подписка на автора) добавляет
+записи вес, который убывает вдвое за TRENDING_HALF_LIFE секунд.
+Чтобы не пересчитывать старые оценки по мере их затухания, оценка
+хранится как логарифм веса, приведенного к моменту TRENDING_EPOCH:
+log(w) + (t - TRENDING_EPOCH) / tau. Порядок записей от этого не
+меняется, а новое событие просто складывается с оценкой через logaddexp.
+
+Оценки лежат в таблице TrendingScore, общей для всех процессов (и для
+команды rebuild_trending), - не больше TRENDING_SIZE кандидатов: после
+записи событий все, кто не вошел в топ, удаляются.
+"""
+import heapq
+import math
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import TrendingScore
+
+
+def log_weight(weight, timestamp=None):
+    if timestamp is None:
+        timestamp = time.time()
+    tau = settings.TRENDING_HALF_LIFE / math.log(2)
+    return math.log(weight) + (timestamp - settings.TRENDING_EPOCH) / tau
+
+
+def logaddexp(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def _trim():
+    """Удаляет оценки ниже TRENDING_SIZE-й - два прохода по индексу."""
+    threshold = (TrendingScore.objects.order_by('-score', '-post_id')
+                 .values_list('score', 'post_id')
+                 [settings.TRENDING_SIZE:settings.TRENDING_SIZE + 1]
+                 .first())
+    if threshold is not None:
+        score, post_id = threshold
+        TrendingScore.objects.filter(score__lte=score).exclude(
+            score=score, post_id__gt=post_id).delete()
+
+
+def record(events, timestamp=None):
+    """
+    Добавляет в рейтинг события вида {post_id: вес}.
+
+    Пачка событий - одно чтение текущих оценок ее записей и запись
+    изменений, под блокировкой строк, чтобы одновременные пачки из
+    разных процессов не теряли события друг друга.
+    """
+    events = {post_id: weight for post_id, weight in events.items()
+              if weight > 0}
+    if not events:
+        return
+    with transaction.atomic():
+        current = {
+            row.post_id: row for row in
+            TrendingScore.objects.select_for_update().filter(
+                post_id__in=events)}
+        created = []
+        for post_id, weight in events.items():
+            score = log_weight(weight, timestamp)
+            if post_id in current:
+                row = current[post_id]
+                row.score = logaddexp(row.score, score)
+            else:
+                created.append(TrendingScore(post_id=post_id, score=score))
+        if current:
+            TrendingScore.objects.bulk_update(current.values(), ['score'])
+        TrendingScore.objects.bulk_create(created, ignore_conflicts=True)
+        _trim()
+
+
+def record_event(post_id, event, timestamp=None):
+    record({post_id: settings.TRENDING_WEIGHTS[event]}, timestamp)
+
+
+def record_views(views, timestamp=None):
+    weight = settings.TRENDING_WEIGHTS['view']
+    record({post_id: count * weight for post_id, count in views.items()},
+           timestamp)
+
+
+def rebuild(events):
+    """
+    Пересобирает рейтинг с нуля из событий (post_id, вес, timestamp).
+    """
+    scores = {}
+    for post_id, weight, timestamp in events:
+        if weight <= 0:
+            continue
+        score = log_weight(weight, timestamp)
+        scores[post_id] = (logaddexp(scores[post_id], score)
+                           if post_id in scores else score)
+    best = heapq.nlargest(settings.TRENDING_SIZE, scores, key=scores.get)
+    with transaction.atomic():
+        TrendingScore.objects.all().delete()
+        TrendingScore.objects.bulk_create(
+            TrendingScore(post_id=post_id, score=scores[post_id])
+            for post_id in best)
+    return len(best)
+
+
+def top(limit=None):
+    """id записей по убыванию оценки."""
+    return list(TrendingScore.objects.order_by('-score', '-post_id')
+                .values_list('post_id', flat=True)
+                [:limit or settings.TRENDING_SIZE])
+
+
+def forget(post_ids):
+    TrendingScore.objects.filter(post_id__in=post_ids).delete()
+
+
+def reset():
+    TrendingScore.objects.all().delete()
@@ -7,21 +7,48 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('more/', views.index_more, name='index_more'),
+    path('trending/', views.trending_posts, name='trending'),
+    path('groups/', views.group_directory, name='groups'),
+    path('groups/more/<str:sort>/', views.group_directory_more,
+         name='groups_more'),
     path('group/<slug:slug>/', views.group_posts,
          name='group_list'),
+    path('group/<slug:slug>/more/', views.group_posts_more,
+         name='group_list_more'),
+    path('tags/', views.tag_list, name='tags'),
+    path('tags/<str:name>/', views.tag_posts, name='tag'),
+    path('tags/<str:name>/more/', views.tag_posts_more, name='tag_more'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/more/', views.profile_more,
+         name='profile_more'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/more/', views.follow_index_more,
+         name='follow_index_more'),
     path('profile/<str:username>/follow/',
          views.profile_follow,
          name='profile_follow'),
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow,
          name='profile_unfollow'),
+    path('mentions/', views.mentions, name='mentions'),
+    path('mentions/more/', views.mentions_more, name='mentions_more'),
+    path('notifications/', views.notifications, name='notifications'),
+    path('notifications/unread/', views.unread_notifications,
+         name='unread_notifications'),
+    path('notifications/read/', views.read_notifications,
+         name='read_notifications'),
+    path('notifications/<int:number>/', views.open_notification,
+         name='open_notification'),
+    path('autocomplete/', views.autocomplete_suggestions,
+         name='autocomplete'),
     path('search/',
          views.get_search_result,
          name='search'),
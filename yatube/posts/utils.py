@@ -1,10 +1,135 @@
+import calendar
+from datetime import datetime, timezone
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import models
+from django.db.models import Q
 
 from yatube.settings import POSTS_PER_PAGE
 
+from .models import Follow
+
+FOLLOW_VERSION_KEY = 'follow_version:{}'
+FOLLOW_STATE_KEY = 'follow_state:{}:{}:{}'
+
 
 def get_paginator(request, items_list):
     paginator = Paginator(items_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def follow_version(user_id):
+    """
+    Версия подписок пользователя. Если ключ вытеснен из кэша или
+    истек, берется новая случайная версия: старые записи состояния с
+    ней не совпадут.
+
+    Версию меняет процесс, обработавший подписку; на кэше процесса
+    (LocMem) остальные увидят изменение, когда истечет
+    FOLLOW_STATE_CACHE_TIMEOUT, на общем кэше - сразу.
+    """
+    key = FOLLOW_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.set(key, version, settings.FOLLOW_STATE_CACHE_TIMEOUT)
+    return version
+
+
+def bump_follow_version(user_id):
+    cache.set(FOLLOW_VERSION_KEY.format(user_id), uuid4().hex,
+              settings.FOLLOW_STATE_CACHE_TIMEOUT)
+
+
+def followed_authors(user, posts):
+    """
+    id авторов записей страницы, на которых подписан user.
+
+    Один IN-запрос на страницу вместо запроса на каждую запись; ответ
+    кэшируется до следующего изменения подписок пользователя.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    author_ids = sorted({post.author_id for post in posts})
+    if not author_ids:
+        return frozenset()
+    key = FOLLOW_STATE_KEY.format(
+        user.id, follow_version(user.id),
+        md5(','.join(map(str, author_ids)).encode()).hexdigest())
+    followed = cache.get(key)
+    if followed is None:
+        followed = frozenset(
+            Follow.objects.filter(user=user, author_id__in=author_ids)
+            .values_list('author_id', flat=True))
+        cache.set(key, followed, settings.FOLLOW_STATE_CACHE_TIMEOUT)
+    return followed
+
+
+def make_cursor(value, pk):
+    """
+    Курсор keyset-пагинации: значение поля сортировки (дата - в
+    микросекундах) и id.
+    """
+    if isinstance(value, datetime):
+        value = (calendar.timegm(value.utctimetuple()) * 10 ** 6
+                 + value.microsecond)
+    return f'{value}_{pk}'
+
+
+def parse_cursor(cursor, numeric=False):
+    """
+    (значение, id) из курсора или None, если курсор испорчен. Значение -
+    дата, а с numeric - целое число.
+    """
+    try:
+        value, pk = (int(part) for part in cursor.split('_'))
+        if numeric:
+            return value, pk
+        created = datetime.fromtimestamp(value // 10 ** 6, tz=timezone.utc)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        return None
+    return created.replace(microsecond=value % 10 ** 6), pk
+
+
+def keyset_page(queryset, cursor, size, field='created', descending=False):
+    """
+    Страница queryset по возрастанию (field, id) после курсора,
+    а с descending - по убыванию.
+
+    В отличие от OFFSET, цена страницы не растет с ее номером: это
+    диапазонный проход по индексу (field, id). Поле - дата или целое.
+    Возвращает объекты страницы и курсор следующей или None.
+    """
+    numeric = isinstance(queryset.model._meta.get_field(field),
+                         models.IntegerField)
+    after = parse_cursor(cursor, numeric) if cursor else None
+    lookup = 'lt' if descending else 'gt'
+    if after is not None:
+        value, pk = after
+        queryset = queryset.filter(
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{field: value, f'pk__{lookup}': pk}))
+    order = ('-' if descending else '') + field
+    items = list(queryset.order_by(order, '-pk' if descending else 'pk')
+                 [:size + 1])
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    return items, cursor_after(items[-1], field)
+
+
+def cursor_after(item, field='pub_date'):
+    return make_cursor(getattr(item, field), item.pk)
+
+
+def feed_cursor(page_obj):
+    """Курсор для подгрузки записей после страницы ленты или None."""
+    if not page_obj.has_next():
+        return None
+    return cursor_after(page_obj.object_list[len(page_obj) - 1])
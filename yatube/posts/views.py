@@ -1,15 +1,65 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.core.cache import cache
 from django.db.models import Q, Count
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 
-from .models import Group, Post, User, Follow
+from core.decorators import private_page, public_for_anonymous, rate_limit
+
+from . import autocomplete, hashtags, inbox, trending
+from .recommendations import recommended_authors
+from .counters import view_counter
+from .models import (Group, GroupStats, Mention, Post, PostTag, Tag, User,
+                     Follow)
 from .forms import PostForm, CommentForm
-from .utils import get_paginator
+from .utils import (feed_cursor, followed_authors, get_paginator,
+                    keyset_page)
+
+POPULAR = 'popular'
+FEED_ORDER = ('-pub_date', '-pk')
+# Сортировки каталога групп: параметр ?sort= -> поле GroupStats
+GROUP_SORTS = {
+    'activity': 'latest_post',
+    'posts': 'posts_count',
+    'authors': 'authors_count',
+}
+
+feed_cache = public_for_anonymous(
+    settings.FEED_CACHE_MAX_AGE,
+    stale_while_revalidate=settings.FEED_STALE_WHILE_REVALIDATE)
 
 
+def feed_fragment(request, post_list, more_url, post_template,
+                  followed=None):
+    """
+    Следующая порция ленты после курсора ?after= без base.html,
+    шапки и пагинатора - для бесконечной прокрутки.
+    """
+    posts, next_cursor = keyset_page(
+        post_list, request.GET.get('after'), settings.POSTS_PER_PAGE,
+        field='pub_date', descending=True)
+    context = {
+        'posts': posts,
+        'post_template': post_template,
+        'next_cursor': next_cursor,
+        'more_url': more_url,
+        'followed_authors': (followed_authors(request.user, posts)
+                             if followed is None else followed),
+    }
+    return render(request, 'includes/post_list.html', context)
+
+
+@feed_cache
 def index(request):
-    post_list = Post.objects.all().order_by('-pub_date')
+    post_list = (Post.objects.select_related('author', 'group')
+                 .order_by(*FEED_ORDER))
+    sort = POPULAR if request.GET.get('sort') == POPULAR else None
+    if sort:
+        post_list = post_list.order_by('-views', '-pub_date')
     posts_list = cache.get('posts_list')
     if not posts_list:
         posts_list = (Post.objects.select_related('author')
@@ -18,51 +68,210 @@ def index(request):
     page_obj = get_paginator(request, post_list)
     context = {
         'page_obj': page_obj,
+        'sort': sort,
+        'followed_authors': followed_authors(request.user, page_obj),
+        'next_cursor': None if sort else feed_cursor(page_obj),
+        'more_url': reverse('posts:index_more'),
     }
     return render(request, 'posts/index.html', context)
 
 
+@feed_cache
+def index_more(request):
+    return feed_fragment(
+        request, Post.objects.select_related('author', 'group'),
+        reverse('posts:index_more'), 'includes/single_post.html')
+
+
+@feed_cache
+def trending_posts(request):
+    post_ids = trending.top()
+    posts = Post.objects.select_related('author', 'group').in_bulk(post_ids)
+    post_list = [posts[post_id] for post_id in post_ids if post_id in posts]
+    page_obj = get_paginator(request, post_list)
+    context = {
+        'page_obj': page_obj,
+        'followed_authors': followed_authors(request.user, page_obj),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@feed_cache
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    post_list = group.posts.select_related('author').order_by(*FEED_ORDER)
     page_obj = get_paginator(request, post_list)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'followed_authors': followed_authors(request.user, page_obj),
+        'next_cursor': feed_cursor(page_obj),
+        'more_url': reverse('posts:group_list_more', args=[slug]),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_cache
+def group_posts_more(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_fragment(
+        request, group.posts.select_related('author', 'group'),
+        reverse('posts:group_list_more', args=[slug]),
+        'includes/single_post.html')
+
+
+def tag_page(request, tag):
+    """Записи тега после курсора ?after= и курсор следующей порции."""
+    entries, next_cursor = keyset_page(
+        PostTag.objects.filter(tag=tag)
+        .select_related('post__author', 'post__group'),
+        request.GET.get('after'), settings.POSTS_PER_PAGE,
+        field='pub_date', descending=True)
+    return [entry.post for entry in entries], next_cursor
+
+
+@feed_cache
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts, next_cursor = tag_page(request, tag)
+    context = {
+        'tag': tag,
+        'posts': posts,
+        'followed_authors': followed_authors(request.user, posts),
+        'next_cursor': next_cursor,
+        'more_url': reverse('posts:tag_more', args=[tag.name]),
+    }
+    return render(request, 'posts/tag.html', context)
+
+
+@feed_cache
+def tag_posts_more(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts, next_cursor = tag_page(request, tag)
+    context = {
+        'posts': posts,
+        'post_template': 'includes/single_post.html',
+        'next_cursor': next_cursor,
+        'more_url': reverse('posts:tag_more', args=[tag.name]),
+        'followed_authors': followed_authors(request.user, posts),
+    }
+    return render(request, 'includes/post_list.html', context)
+
+
+@feed_cache
+def tag_list(request):
+    return render(request, 'posts/tags.html',
+                  {'tags': hashtags.leaders(settings.TAGS_SHOWN)})
+
+
+def group_directory_page(request, sort):
+    """Сводки групп после курсора ?after= по убыванию поля сортировки."""
+    return keyset_page(
+        GroupStats.objects.select_related('group'),
+        request.GET.get('after'), settings.GROUPS_PER_PAGE,
+        field=GROUP_SORTS[sort], descending=True)
+
+
+@feed_cache
+def group_directory(request):
+    sort = request.GET.get('sort')
+    if sort not in GROUP_SORTS:
+        sort = 'activity'
+    stats, next_cursor = group_directory_page(request, sort)
+    context = {
+        'stats': stats,
+        'sort': sort,
+        'next_cursor': next_cursor,
+        'more_url': reverse('posts:groups_more', args=[sort]),
+    }
+    return render(request, 'posts/groups.html', context)
+
+
+@feed_cache
+def group_directory_more(request, sort):
+    if sort not in GROUP_SORTS:
+        raise Http404
+    stats, next_cursor = group_directory_page(request, sort)
+    context = {
+        'stats': stats,
+        'next_cursor': next_cursor,
+        'more_url': reverse('posts:groups_more', args=[sort]),
+    }
+    return render(request, 'includes/group_directory.html', context)
+
+
+def is_following(user, author):
+    return (user.is_authenticated
+            and Follow.objects.filter(user=user, author=author).exists())
+
+
+@feed_cache
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
+    post_list = author.posts.select_related('group').order_by(*FEED_ORDER)
     page_obj = get_paginator(request, post_list)
-    following = (request.user.is_authenticated
-                 and Follow.objects.filter(user=request.user,
-                                           author=author).exists())
+    following = is_following(request.user, author)
     context = {
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'followed_authors': {author.id} if following else frozenset(),
+        'recommendations': recommended_authors(request.user),
+        'next_cursor': feed_cursor(page_obj),
+        'more_url': reverse('posts:profile_more', args=[username]),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@feed_cache
+def profile_more(request, username):
+    author = get_object_or_404(User, username=username)
+    following = is_following(request.user, author)
+    return feed_fragment(
+        request, author.posts.select_related('author', 'group'),
+        reverse('posts:profile_more', args=[username]),
+        'includes/article.html',
+        followed={author.id} if following else frozenset())
+
+
+@feed_cache
 def post_detail(request, post_id):
     post = get_object_or_404(Post.objects.select_related('author')
                              .annotate(count=Count('author__posts')),
                              id=post_id)
+    view_counter.record(post.id)
+    post.views += view_counter.pending(post.id)
     comment_form = CommentForm()
-    comments = post.comments.select_related('author').all()
+    comments, next_cursor = keyset_page(
+        post.comments.select_related('author'), None,
+        settings.COMMENTS_PER_PAGE)
     context = {
         'post': post,
         'comment_form': comment_form,
         'comments': comments,
+        'next_cursor': next_cursor,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@feed_cache
+def post_comments(request, post_id):
+    """Следующая порция комментариев записи для подгрузки."""
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    comments, next_cursor = keyset_page(
+        post.comments.select_related('author'), request.GET.get('after'),
+        settings.COMMENTS_PER_PAGE)
+    context = {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'includes/comments.html', context)
+
+
+@private_page
 @login_required
+@rate_limit('post_create', methods=('POST',))
 def post_create(request):
     form = PostForm(request.POST or None,
                     files=request.FILES or None)
@@ -73,11 +282,13 @@ def post_create(request):
     if form.is_valid():
         post_create = form.save(commit=False)
         post_create.author = request.user
+        post_create.duplicate_of = form.duplicate_of
         post_create.save()
         return redirect('posts:profile', username=post_create.author)
     return render(request, 'posts/post_create.html', context)
 
 
+@private_page
 @login_required
 def post_edit(request, post_id):
     post = Post.objects.get(pk=post_id)
@@ -88,7 +299,9 @@ def post_edit(request, post_id):
         files=request.FILES or None,
         instance=post)
     if form.is_valid():
-        form.save()
+        post = form.save(commit=False)
+        post.duplicate_of = form.duplicate_of
+        post.save()
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'form': form,
@@ -99,9 +312,11 @@ def post_edit(request, post_id):
     return render(request, 'posts/post_create.html', context)
 
 
+@never_cache
 @login_required
+@rate_limit('add_comment', methods=('POST',))
 def add_comment(request, post_id):
-    post = Post.objects.get()
+    post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -111,21 +326,39 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@private_page
 @login_required
 def follow_index(request):
     follow_posts = cache.get('follow_posts')
     if not follow_posts:
         follow_posts = (
             (Post.objects.select_related('author').select_related('group')
-             .filter(author__following__user=request.user)))
+             .filter(author__following__user=request.user)
+             .order_by(*FEED_ORDER)))
     page_obj = get_paginator(request, follow_posts)
     context = {
         'page_obj': page_obj,
+        'followed_authors': followed_authors(request.user, page_obj),
+        'recommendations': recommended_authors(request.user),
+        'next_cursor': feed_cursor(page_obj),
+        'more_url': reverse('posts:follow_index_more'),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@private_page
+@login_required
+def follow_index_more(request):
+    return feed_fragment(
+        request,
+        Post.objects.select_related('author', 'group')
+        .filter(author__following__user=request.user),
+        reverse('posts:follow_index_more'), 'includes/single_post.html')
+
+
+@never_cache
 @login_required
+@rate_limit('profile_follow')
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     user = request.user
@@ -134,6 +367,7 @@ def profile_follow(request, username):
     return render(request, 'posts/follow.html')
 
 
+@never_cache
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
@@ -142,6 +376,8 @@ def profile_unfollow(request, username):
     return redirect('posts:index')
 
 
+@feed_cache
+@rate_limit('search')
 def get_search_result(request):
     text = request.GET.get('text')
     if not text:
@@ -154,9 +390,98 @@ def get_search_result(request):
                 | Q(text__contains=text.capitalize())
                 | Q(author__username__contains=text)
                 | Q(author__first_name__contains=text)))
-    context = get_paginator(request, posts_search)
-    count_posts = context['page_obj'].paginator.count
-    title = 'Результаты поиска' if count_posts else 'Ничего не найдено'
-    context.update({'title': title})
-    cache.clear()
+    page_obj = get_paginator(request, posts_search.order_by(*FEED_ORDER))
+    count_posts = page_obj.paginator.count
+    context = {
+        'page_obj': page_obj,
+        'title': 'Результаты поиска' if count_posts else 'Ничего не найдено',
+        'followed_authors': followed_authors(request.user, page_obj),
+    }
     return render(request, 'posts/index.html', context)
+
+
+def mention_page(request):
+    """Упоминания пользователя после курсора ?after=, от новых."""
+    return keyset_page(
+        Mention.objects.filter(user=request.user)
+        .select_related('post__author', 'post__group', 'comment__author'),
+        request.GET.get('after'), settings.POSTS_PER_PAGE,
+        descending=True)
+
+
+@private_page
+@login_required
+def mentions(request):
+    mention_list, next_cursor = mention_page(request)
+    context = {
+        'mentions': mention_list,
+        'next_cursor': next_cursor,
+        'more_url': reverse('posts:mentions_more'),
+    }
+    return render(request, 'posts/mentions.html', context)
+
+
+@private_page
+@login_required
+def mentions_more(request):
+    mention_list, next_cursor = mention_page(request)
+    context = {
+        'mentions': mention_list,
+        'next_cursor': next_cursor,
+        'more_url': reverse('posts:mentions_more'),
+    }
+    return render(request, 'includes/mention_list.html', context)
+
+
+@public_for_anonymous(settings.AUTOCOMPLETE_MAX_AGE)
+def autocomplete_suggestions(request):
+    """Подсказки по префиксу ?q=, только пользователи или группы при
+    ?type=user или ?type=group."""
+    kind = request.GET.get('type')
+    if kind not in (autocomplete.USER, autocomplete.GROUP):
+        kind = None
+    return JsonResponse({'results': autocomplete.index.lookup(
+        request.GET.get('q', ''), kind)})
+
+
+@private_page
+@login_required
+def notifications(request):
+    context = {
+        'notifications': inbox.latest(request.user.id,
+                                      settings.INBOX_PAGE_SIZE),
+        'NEW_POST': inbox.NEW_POST,
+        'NEW_COMMENT': inbox.NEW_COMMENT,
+        'NEW_FOLLOWER': inbox.NEW_FOLLOWER,
+        'MENTION_IN_POST': inbox.MENTION_IN_POST,
+        'MENTION_IN_COMMENT': inbox.MENTION_IN_COMMENT,
+    }
+    return render(request, 'posts/notifications.html', context)
+
+
+@never_cache
+@login_required
+def open_notification(request, number):
+    """Отмечает уведомление прочитанным и ведет к его объекту."""
+    notification = inbox.get(request.user.id, number)
+    if notification is None:
+        raise Http404
+    inbox.mark_read(request.user.id, number)
+    if notification.kind == inbox.NEW_FOLLOWER and notification.actor:
+        return redirect('posts:profile', notification.actor.username)
+    if notification.post:
+        return redirect('posts:post_detail', notification.post.id)
+    return redirect('posts:notifications')
+
+
+@require_POST
+@login_required
+def read_notifications(request):
+    inbox.mark_all_read(request.user.id)
+    return redirect('posts:notifications')
+
+
+@never_cache
+@login_required
+def unread_notifications(request):
+    return JsonResponse({'unread': inbox.unread_count(request.user.id)})
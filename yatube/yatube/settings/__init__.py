@@ -0,0 +1,21 @@
+"""
+Профили настроек выбираются переменной окружения DJANGO_ENV:
+
+* dev (по умолчанию) - DEBUG и debug_toolbar;
+* test - для прогона тестов;
+* prod - без отладочных приложений, с кэшем шаблонов.
+
+Профиль можно указать и напрямую: DJANGO_SETTINGS_MODULE=yatube.settings.prod.
+"""
+import os
+
+ENV = os.environ.get('DJANGO_ENV', 'dev')
+
+if ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif ENV == 'test':
+    from .test import *  # noqa: F401,F403
+elif ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ValueError(f'Неизвестный профиль настроек DJANGO_ENV={ENV}')
@@ -0,0 +1,320 @@
+"""
+Общие настройки всех профилей (см. yatube/settings/__init__.py).
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'obm=a-ph*u-3tm9ez(+yoh)%rl70)bu4+x-=3hsc2!0&-po*tx'
+
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+# Замер времени отрисовки шаблонов (core.profiling): YATUBE_TEMPLATE_PROFILING=1
+TEMPLATE_PROFILING = os.environ.get('YATUBE_TEMPLATE_PROFILING') == '1'
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ProfilerMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    'core.middleware.PrerenderedPageMiddleware',
+    'core.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TemplateProfilingMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.inbox.unread_notifications',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+# DJANGO_DB_NAME - другой файл базы, например для замеров
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DJANGO_DB_NAME',
+                               os.path.join(BASE_DIR, 'db.sqlite3')),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+# Сколько хранить в кэше подписки пользователя на авторов страницы: без
+# общего кэша столько же другие процессы не видят новых подписок
+FOLLOW_STATE_CACHE_TIMEOUT = 60
+
+# Как часто просмотры записей из памяти записываются в базу (секунды)
+VIEW_COUNTER_FLUSH_INTERVAL = 10
+
+# Рейтинг популярных записей: период полураспада веса события (секунды),
+# точка отсчета (1 января 2023, UTC), размер топа и веса событий
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_EPOCH = 1672531200
+TRENDING_SIZE = 100
+TRENDING_WEIGHTS = {
+    'view': 1,
+    'comment': 10,
+    'follow': 20,
+}
+
+# Рекомендации авторов: сколько хранить и сколько показывать
+RECOMMENDATIONS_PER_USER = 10
+RECOMMENDATIONS_SHOWN = 5
+
+# Подсказки имен и групп (posts.autocomplete): число подсказок, предел
+# ключей индекса в памяти процесса, период полной перестройки индекса
+# и время кэширования ответа (секунды)
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_KEYS = 500000
+AUTOCOMPLETE_REBUILD_INTERVAL = 10 * 60
+AUTOCOMPLETE_MAX_AGE = 60
+
+# Групп на странице каталога
+GROUPS_PER_PAGE = 20
+
+# Сколько тегов показывать в списке популярных
+TAGS_SHOWN = 50
+
+# Почти повторы записей (posts.dedup): длина шингла и минимум слов для
+# проверки, порог сходства Жаккара и что делать с повтором: 'block' -
+# отклонить форму, 'flag' - опубликовать с отметкой duplicate_of
+DEDUP_SHINGLE_SIZE = 3
+DEDUP_MIN_WORDS = 8
+DEDUP_THRESHOLD = 0.8
+DEDUP_ACTION = 'block'
+
+# Политика HTTP-кэширования (секунды)
+ABOUT_CACHE_MAX_AGE = 60 * 60 * 24
+FEED_CACHE_MAX_AGE = 20
+FEED_STALE_WHILE_REVALIDATE = 60
+
+# Заранее отрисованные страницы для гостей (manage.py prerender)
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Очередь задач (manage.py run_tasks)
+TASK_BATCH_SIZE = 50
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 30
+TASK_TIMEOUT = 5 * 60
+# Массовые операции админки (core.jobs): размер порции и куда
+# складываются выгрузки
+BULK_JOB_CHUNK_SIZE = 500
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+NOTIFICATION_BATCH_SIZE = 100
+INBOX_PAGE_SIZE = 50
+# Сколько хранить в кэше счетчик непрочитанных уведомлений
+INBOX_UNREAD_CACHE_TIMEOUT = 60
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Без DJANGO_CACHE_LOCATION кэш у каждого процесса свой (LocMem); при
+# нескольких процессах задайте общий memcached: DJANGO_CACHE_LOCATION=host:port
+CACHE_LOCATION = os.environ.get('DJANGO_CACHE_LOCATION')
+if CACHE_LOCATION:
+    CACHES = {
+        alias: {
+            'BACKEND': 'core.cache.InstrumentedMemcachedCache',
+            'LOCATION': CACHE_LOCATION,
+            'KEY_PREFIX': alias,
+            'METRICS_LABEL': alias,
+        }
+        for alias in ('default', 'sessions')
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.InstrumentedLocMemCache',
+        },
+        'sessions': {
+            'BACKEND': 'core.cache.InstrumentedLocMemCache',
+            'LOCATION': 'sessions',
+        },
+    }
+# Бэкенды, которые видят все процессы
+SHARED_CACHE_BACKENDS = (
+    'core.cache.InstrumentedMemcachedCache',
+    'django.core.cache.backends.memcached.MemcachedCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django_redis.cache.RedisCache',
+)
+
+# Ограничение частоты (core.ratelimit): имя лимита -> (запросов, секунд).
+# Счетчики общие для процессов только на общем кэше (DJANGO_CACHE_LOCATION)
+RATE_LIMIT_CACHE = 'default'
+# Сколько доверенных обратных прокси дописывают адрес в X-Forwarded-For;
+# 0 - клиент подключается напрямую, его адрес в REMOTE_ADDR
+TRUSTED_PROXY_HOPS = int(os.environ.get('DJANGO_TRUSTED_PROXY_HOPS', 0))
+RATE_LIMITS = {
+    'post_create': (10, 600),
+    'add_comment': (20, 300),
+    'profile_follow': (30, 300),
+    'search': (30, 60),
+}
+
+# Метрики (core.metrics) на /metrics/ отдаются персоналу и сборщику с
+# заголовком Authorization: Bearer <METRICS_TOKEN>. Адрес клиента не
+# проверяется: за обратным прокси все запросы приходят с 127.0.0.1.
+METRICS_TOKEN = os.environ.get('DJANGO_METRICS_TOKEN', '')
+
+# Профили запросов (core.profiler): доля запросов под cProfile, порог
+# медленного запроса (секунды, None - не следить) и период выборки
+# стеков, которая следит за всеми запросами
+PROFILER_SAMPLE_RATE = 0
+PROFILER_SLOW_THRESHOLD = None
+PROFILER_SAMPLE_INTERVAL = 0.005
+PROFILER_ROOT = os.path.join(BASE_DIR, 'profiles')
+PROFILER_MAX_FILES = 200
+
+THUMBNAIL_BACKEND = 'core.thumbnail.InstrumentedThumbnailBackend'
+
+# Сессии: db (по умолчанию), cached_db (кэш, база - только при промахе и
+# записи; только с общим кэшем, иначе выход из аккаунта в одном процессе
+# не виден остальным) или signed_cookies (данные в подписанной cookie)
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[
+    os.environ.get('DJANGO_SESSION_MODE', 'db')]
+SESSION_CACHE_ALIAS = 'sessions'
+if (SESSION_ENGINE == SESSION_ENGINES['cached_db']
+        and CACHES[SESSION_CACHE_ALIAS]['BACKEND']
+        not in SHARED_CACHE_BACKENDS):
+    raise ImproperlyConfigured(
+        'DJANGO_SESSION_MODE=cached_db требует общего кэша: '
+        'задайте DJANGO_CACHE_LOCATION')
+# Когда сохранять сессию (core.middleware.SessionMiddleware):
+# modified - только если изменилась, refresh - еще и раз в
+# SESSION_REFRESH_INTERVAL секунд, продлевая срок, every_request - всегда
+SESSION_WRITE_POLICY = os.environ.get('DJANGO_SESSION_WRITE_POLICY',
+                                      'modified')
+SESSION_SAVE_EVERY_REQUEST = SESSION_WRITE_POLICY == 'every_request'
+SESSION_REFRESH_INTERVAL = 60 * 60 * 24
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# Списки админки больше этого числа строк не пересчитываются точно
+ADMIN_COUNT_LIMIT = 10000
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
@@ -0,0 +1,45 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Задайте DJANGO_SECRET_KEY')
+
+ALLOWED_HOSTS = (os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+                 if os.environ.get('DJANGO_ALLOWED_HOSTS')
+                 else ALLOWED_HOSTS)
+
+TEMPLATE_PROFILING = False
+
+PROFILER_SLOW_THRESHOLD = float(
+    os.environ.get('DJANGO_PROFILER_SLOW_THRESHOLD', 1))
+PROFILER_SAMPLE_RATE = float(os.environ.get('DJANGO_PROFILER_SAMPLE_RATE', 0))
+
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE
+              if middleware != 'core.middleware.TemplateProfilingMiddleware']
+
+# Шаблоны читаются и компилируются один раз на процесс
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.template.context_processors.debug'],
+    },
+}]
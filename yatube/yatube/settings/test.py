@@ -0,0 +1,30 @@
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, LOGGING
+
+DEBUG = False
+
+# База тестов в памяти; параллельные процессы получают ее копию при fork
+DATABASES = {
+    'default': {**DATABASES['default'], 'TEST': {'NAME': ':memory:'}},
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+DEFAULT_FILE_STORAGE = 'core.storage.InMemoryStorage'
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+TEST_RUNNER = 'core.test_runner.TimedTestRunner'
+
+# Все тесты идут с одного адреса: лимиты включают только тесты лимитов
+RATE_LIMITS = {}
+
+# Профиль шаблонов не пишет в консоль вывод тестов
+LOGGING = {
+    **LOGGING,
+    'handlers': {**LOGGING['handlers'],
+                 'null': {'class': 'logging.NullHandler'}},
+    'loggers': {**LOGGING['loggers'],
+                'core.profiling': {'handlers': ['null'],
+                                   'propagate': False}},
+}
@@ -3,6 +3,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import metrics_view, template_profile
+
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
@@ -10,6 +12,8 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('debug/templates/', template_profile, name='template_profile'),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 handler404 = 'core.views.page_not_found'
@@ -19,5 +23,6 @@ if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
@@ -1,3 +1,4 @@
+import atexit
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -5,3 +6,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from posts.autocomplete import index as autocomplete_index  # noqa: E402
+from posts.counters import view_counter  # noqa: E402
+
+# Просмотры, накопленные в памяти воркера, записываются при его остановке.
+atexit.register(view_counter.flush)
+# Индекс подсказок строится в фоне, пока воркер принимает запросы.
+autocomplete_index.warm()